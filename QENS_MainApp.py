@@ -13,20 +13,28 @@ Description:
 
 License: GLP  
 Contact: broblesher@gmail.com  
-Dependencies: sys, FuncionesIntegrar, PyQt5, load_Dlg
+Dependencies: sys, weakref, FuncionesIntegrar, FuncionesLeer, QENSData,
+    PlotCache, SQEMap, FourierTransform, pyqtgraph, PyQt5, load_Dlg
 """
 # mypy --check-untyped-defs
 # Import statements
 import sys
+import weakref
 from typing_extensions import Self
 from loadWindow import load_Dlg
+from loadWindow.FuncionesLeer import FuncionesLeer as fl
+from loadWindow.QENSData import QENSData
 from utilities.FuncionesIntegrar import FuncionesMenuIntegrar as fmi
+from utilities.PlotCache import PlotCache
+from utilities.SQEMap import SQEMap
+from utilities.FourierTransform import FourierTransform
+import pyqtgraph as pg
 # import csv
 # from copy import deepcopy
 
 from PyQt5.QtWidgets import (
-    QApplication, QMainWindow)  # QMessageBox, QDialog, QFileDialog,
-# from PyQt5.QtCore import QDateTime  # , Qt
+    QApplication, QMainWindow, QFileDialog)  # QMessageBox, QDialog,
+from PyQt5.QtCore import QTimer  # QDateTime, Qt
 # from PyQt5.QtGui import QColor
 
 # from QENStoCSV_Dlg import Ui_Dialog_QENStoCSV
@@ -45,10 +53,28 @@ class MainWin(QMainWindow, Ui_MainWindow):
         to set the plotItem.
     _cur_plot: pg.plotItem
         to save the current plot item.
+    _plotCache: PlotCache
+        the plot items of the last Q-values shown, to change the
+        Q-value without drawing the data again.
+    _sqeMap: SQEMap | None
+        the S(Q, E) data of all the Q-values resampled onto a regular
+        grid, made the first time the map is shown (None until then).
+    _mapWin: pg.GraphicsLayoutWidget | None
+        the window with the S(Q, E) map.
+    _fourier: FourierTransform | None
+        the I(Q, t) of all the Q-values, calculated the first time it is
+        shown (None until then).
+    _fourierWin: pg.GraphicsLayoutWidget | None
+        the window with the I(Q, t) of the current Q-value.
     _dataDic: dict
-        to save, for each Q-value, the measured data, the calculated
-        areas (list), the pg.LinearRegionItems for each plot (list),
-        and the linear region limits (list).
+        to save, for each Q-value, the measured data (the energy,
+        intensity and error arrays), the label of the intensity, the
+        calculated areas (list), the pg.LinearRegionItems for each plot
+        (list), and the linear region limits (list).
+    _dataFile: str
+        the exported file the data was loaded from, to read the
+        measured data of each Q-value when it is needed ('' if the
+        data was loaded from source files).
     _popup_win_visible: bool
         to know it the pop-up window to browse the data files is
         visible (True) or not (False).
@@ -58,6 +84,15 @@ class MainWin(QMainWindow, Ui_MainWindow):
     _nroiChangeFromCode: bool
         to know if the no. of ROIs in the spinBox in changed from the
         spinBox itself (True) or from code (False).
+    _connectedRois: weakref.WeakSet
+        the pg.LinearRegionItems already connected to roiMoved, so
+        that they are connected only once.
+    _pendingRois: set
+        the indices of the ROIs moved since the last update of the
+        lineEdits and the areas.
+    _roiTimer: QTimer
+        to update the lineEdits and the areas at most once per frame
+        of the screen while a ROI is dragged.
 
     Methods
     -------
@@ -65,6 +100,14 @@ class MainWin(QMainWindow, Ui_MainWindow):
         Connects signals and slots.
     loadFromSource()
         Loads the data form source files.
+    loadFromExport()
+        Loads the data from a file exported before (csv or binary).
+    clearData()
+        Removes the data loaded before, to load new data.
+    loadQData(qvalue)
+        Reads the measured data of a Q-value from the exported file.
+    loadAllQData()
+        Reads the measured data of all the Q-values not read yet.
     main_win_visibility()
         Sets the main window visibility.
     changeQ_p()
@@ -73,6 +116,10 @@ class MainWin(QMainWindow, Ui_MainWindow):
         Changes the Q-value to a lower one when pressing button Q-.
     comboChangePlot()
         Changes the data plot when the Q-value in the comboBox changes.
+    prefetchPlots()
+        Prepares the plots of the Q-values next to the current one.
+    updatePlotDetail()
+        Updates the points plotted for the current view.
     nRoi_change()
         Adds or removes Linear ROIs from graph and the coresponding lineEdits.
     show_groupBoxRois(lroi_n)
@@ -110,8 +157,17 @@ class MainWin(QMainWindow, Ui_MainWindow):
     displayArea(lroi_n)
         Displays de value of the area for the ROI in the lineEdit.
     connect_ROI_callback(lroi_n)
-        Connects the linear ROI callback with the update_edit_x_Rois()
-        function.
+        Connects the linear ROI callback with the roiMoved() function.
+    roiMoved(lroi)
+        Takes note of a moved ROI, to update it in the next frame.
+    roiMoveFinished(lroi)
+        Updates a ROI as soon as it is dropped.
+    flushRoiUpdates()
+        Updates the lineEdits and the areas of the moved ROIs.
+    showMap()
+        Shows the S(Q, E) data of all the Q-values as a colour map.
+    showFourier()
+        Shows the I(Q, t) of the current Q-value.
     """
 
     def __init__(self: Self, parent=None):
@@ -139,27 +195,54 @@ class MainWin(QMainWindow, Ui_MainWindow):
         self.widget.hide()
         self.loadDLG = load_Dlg.DLG()
         self.fmi = fmi()
+        self.fl = fl()
         self.connectSignalsSlots()
         # Lo siguiente es para plotear. Defino las características por defecto
         self._dataPlot = self.graphicsView
         self._cur_plot = self.fmi.plot_init(self._dataPlot)
+        self._plotCache = PlotCache(self._cur_plot, self.fmi.curPlot)
+        # Los espectros grandes se redibujan según la vista
+        self._cur_plot.sigXRangeChanged.connect(self.updatePlotDetail)
+        self._cur_plot.vb.sigResized.connect(self.updatePlotDetail)
+        self._sqeMap: SQEMap | None
+        self._mapWin: pg.GraphicsLayoutWidget | None
+        self._sqeMap = None
+        self._mapWin = None
+        self._fourier: FourierTransform | None
+        self._fourierWin: pg.GraphicsLayoutWidget | None
+        self._fourier = None
+        self._fourierWin = None
         self._popup_win_visible: bool
         self._popup_win_visible = False
         self._dataDic: dict
+        self._dataFile: str
         self._saveDic: dict
         self._qChangeFromButton: bool
         self._nroiChangeFromCode: bool
         self._dataDic = dict()
+        self._dataFile = ''
         self._qChangeFromButton = False
         self._nroiChangeFromCode = False
         self._saveDic = dict()
+        # Al arrastrar un ROI, actualizo como mucho una vez por frame
+        self._connectedRois: weakref.WeakSet
+        self._pendingRois: set
+        self._connectedRois = weakref.WeakSet()
+        self._pendingRois = set()
+        self._roiTimer = QTimer(self)
+        self._roiTimer.setSingleShot(True)
+        self._roiTimer.setInterval(
+            int(1000 / (QApplication.primaryScreen().refreshRate() or 60)))
+        self._roiTimer.timeout.connect(self.flushRoiUpdates)
 
     def connectSignalsSlots(self):
         """Connect signals and slots."""
         self.actionExit.triggered.connect(self.close)
         self.actionFrom_source.triggered.connect(self.loadFromSource)
-        self.actionFrom_csv.triggered.connect(self.main_win_visibility)
+        self.actionFrom_csv.triggered.connect(self.loadFromExport)
         self.actionIntegrate.triggered.connect(self.integrate)
+        self.actionSQE_map.triggered.connect(self.showMap)
+        self.actionFourier_transform.triggered.connect(self.showFourier)
         self.pushButton_Q_p.clicked.connect(self.changeQ_p)
         self.pushButton_Q_m.clicked.connect(self.changeQ_m)
         self.comboBox_Q.currentIndexChanged.connect(self.comboChangePlot)
@@ -202,14 +285,19 @@ class MainWin(QMainWindow, Ui_MainWindow):
             # Hago visible el widget de plotear
             self.widget.show()
             self.groupBox_area.hide()
+            # Los datos, los plots y las Qs que tenga son de otros datos
+            self.clearData()
             # voy a hacer un diccionario para meter los datos
             qlist: list
-            qlist = self.fmi.fillqlist(self.loadDLG._dfS)
+            qlist = self.loadDLG._data.qlist()
             i: int
             q: str
+            # Los datos de cada Q son vistas de los arrays del QENSData
             for i, q in enumerate(qlist):
-                self._dataDic[q] = {"measData":
-                                    self.loadDLG._dfS.iloc[:, 3 * i:3 * i + 3]}
+                self._dataDic[q] = {"measData": self.loadDLG._data.group(i),
+                                    "label": self.loadDLG._data.labels[i]}
+                # Para calcular las áreas de los ROIs
+                self.fmi.index_data(q, self._dataDic)
             # Pongo las Qs en el combo box
             self.comboBox_Q.addItems(qlist)
             # Al poner el valor del combo, me crea la gráfica,
@@ -220,6 +308,140 @@ class MainWin(QMainWindow, Ui_MainWindow):
         self._popup_win_visible = False
         self.main_win_visibility()
 
+    def loadFromExport(self: Self):
+        """Load the data from a file exported before (csv or binary).
+
+        Only the column labels are read here, and the measured data of
+        the first Q-value. The data of the other Q-values is read when
+        they are shown (see loadQData).
+
+        Other Parameters
+        ----------------
+        fileName: str
+            the exported file selected in the dialog.
+        header: pd.DataFrame
+            an empty DataFrame with the columns of the file.
+        labels: list
+            the labels of the intensity of each Q-value.
+        qlist: list
+            to save the list of Q-values (str) in the data file.
+        """
+        fileName: str
+        fileName, _ = QFileDialog.getOpenFileName(
+            self, 'Open exported data', '',
+            'Exported data (*.csv *.parquet *.h5 *.hdf5 *.npz)')
+        if fileName == '':
+            return
+        try:
+            header = self.fl.read_exported_header(fileName)
+        except (OSError, ImportError, ValueError) as error:
+            self.statusbar.showMessage('Failed to Load: ' + str(error))
+            return
+        qlist: list
+        qlist = self.fmi.fillqlist(header)
+        # Empiezo de cero: borro los datos, los plots y las Qs que hubiera
+        self.clearData()
+        self._dataFile = fileName
+        labels: list
+        labels = list(header.columns[1::3])
+        i: int
+        q: str
+        for i, q in enumerate(qlist):
+            self._dataDic[q] = {"measData": None, "label": labels[i]}
+        self.widget.show()
+        self.groupBox_area.hide()
+        self.comboBox_Q.addItems(qlist)
+        # Al poner el valor del combo se leen los datos de esa Q
+        self.comboBox_Q.setCurrentIndex(0)
+        self.statusbar.showMessage('Data succesfully loaded')
+
+    def clearData(self: Self):
+        """Remove the data loaded before, to load new data.
+
+        Empties _dataDic, the Q-values of the combo box and the plots,
+        map and I(Q, t) calculated, and forgets the exported file, so
+        that nothing is read from it any more.
+        """
+        self._dataFile = ''
+        self._dataDic = dict()
+        self._plotCache.clear()
+        self._sqeMap = None
+        self._fourier = None
+        # Sin señales, para que no intente plotear una Q que ya no está
+        self.comboBox_Q.blockSignals(True)
+        self.comboBox_Q.clear()
+        self.comboBox_Q.blockSignals(False)
+
+    def loadQData(self: Self, qvalue: str) -> bool:
+        """Read the measured data of a Q-value from the exported file.
+
+        Does nothing if the data of that Q-value is already in
+        _dataDic. If the file can not be read (e.g. it has been deleted
+        or changed since it was opened), the error is shown in the
+        status bar.
+
+        Parameters
+        ----------
+        qvalue: str
+            the Q-value (str), the key of the _dataDic dictionary.
+
+        Returns
+        -------
+        False if the data could not be read, True otherwise.
+        """
+        if self._dataDic[qvalue]["measData"] is not None:
+            return True
+        try:
+            self._dataDic[qvalue]["measData"] = QENSData.from_dataframe(
+                self.fl.read_exported(
+                    self._dataFile, [list(self._dataDic).index(qvalue)])
+            ).group(0)
+        except (OSError, ValueError, KeyError, IndexError,
+                ImportError) as error:
+            self.statusbar.showMessage('Failed to Load: ' + str(error))
+            return False
+        self.fmi.index_data(qvalue, self._dataDic)
+        return True
+
+    def loadAllQData(self: Self) -> bool:
+        """Read the measured data of all the Q-values not read yet.
+
+        The data of all of them is read from the exported file at once.
+        If the file can not be read, the error is shown in the status
+        bar.
+
+        Returns
+        -------
+        False if the data could not be read, True otherwise.
+
+        Other Parameters
+        ----------------
+        missing: list
+            the Q-values whose data has not been read yet.
+        data: QENSData
+            the data of the missing Q-values.
+        """
+        missing: list
+        missing = [q for q in self._dataDic
+                   if self._dataDic[q]["measData"] is None]
+        if not missing:
+            return True
+        data: QENSData
+        try:
+            data = QENSData.from_dataframe(self.fl.read_exported(
+                self._dataFile,
+                [list(self._dataDic).index(q) for q in missing]))
+        except (OSError, ValueError, KeyError, IndexError,
+                ImportError) as error:
+            self.statusbar.showMessage('Failed to Load: ' + str(error))
+            return False
+        i: int
+        q: str
+        for i, q in enumerate(missing):
+            self._dataDic[q]["measData"] = data.group(i)
+            self.fmi.index_data(q, self._dataDic)
+        return True
+
     def main_win_visibility(self):
         """Set the main window visibility."""
         if self._popup_win_visible is True:
@@ -413,8 +635,6 @@ class MainWin(QMainWindow, Ui_MainWindow):
 
         Other Parameters
         ----------------
-        cur_index: int
-            to save the index of the current item (Q) in the comboBox.
         cur_qvalue: str
             to save the text value of the current item of the comboBox
             the Q-value (str) is the key of the _dataDic dictionary.
@@ -426,14 +646,22 @@ class MainWin(QMainWindow, Ui_MainWindow):
             as the change in the spinBox is made from here ("code"),
             it is set to True.
         """
-        cur_index: int
         cur_qvalue: str
-        cur_index = self.comboBox_Q.currentIndex()
         cur_qvalue = self.comboBox_Q.currentText()
-        # Primero llamo a la función de dibujar los datos medidos
-        self._cur_plot.clear()
-        self.fmi.curPlot(self._cur_plot, self.loadDLG._dfS,
-                         cur_index)
+        # Primero llamo a la función de dibujar los datos medidos, que
+        # si vienen de un fichero exportado puede que aún no estén leídos
+        if not self.loadQData(cur_qvalue):
+            return
+        # Si ya la he dibujado, solo cambio qué items se ven
+        self._plotCache.show(cur_qvalue, self._dataDic[cur_qvalue]["measData"],
+                             self._dataDic[cur_qvalue]["label"])
+        # Los items guardados pueden estar hechos para otra vista
+        self.updatePlotDetail()
+        # Si se está viendo la I(Q, t), paso a la de esta Q
+        if self._fourierWin is not None and self._fourierWin.isVisible():
+            self.showFourier()
+        # Cuando no haya nada más que hacer, preparo las Qs de al lado
+        QTimer.singleShot(0, self.prefetchPlots)
         # Si estoy en la pantalla de calcular las áreas y además el cambio
         # de Q en el comboBox no viene dado por los botones Q_p y Q_m
         if (
@@ -480,6 +708,53 @@ class MainWin(QMainWindow, Ui_MainWindow):
         else:
             self._qChangeFromButton = False
 
+    def prefetchPlots(self: Self):
+        """Prepare the plots of the Q-values next to the current one.
+
+        Only the Q-values whose data is already in memory are prepared,
+        so that no file is read here.
+
+        Other Parameters
+        ----------------
+        cur_item: int
+            the index of the current item (Q) in the comboBox.
+        next_qvalue: str
+            the Q-value next to the current one.
+        """
+        cur_item: int
+        cur_item = self.comboBox_Q.currentIndex()
+        i: int
+        for i in (cur_item + 1, cur_item - 1):
+            if not 0 <= i < self.comboBox_Q.count():
+                continue
+            next_qvalue: str
+            next_qvalue = self.comboBox_Q.itemText(i)
+            if (next_qvalue in self._dataDic
+                    and self._dataDic[next_qvalue]["measData"] is not None):
+                self._plotCache.prefetch(
+                    next_qvalue, self._dataDic[next_qvalue]["measData"],
+                    self._dataDic[next_qvalue]["label"])
+
+    def updatePlotDetail(self: Self):
+        """Update the points plotted for the current view.
+
+        The spectra with more than LOD_MIN_POINTS points are plotted
+        with only the points needed for the current view (see
+        FuncionesMenuIntegrar.decimate), so they are updated when the
+        view is moved, zoomed or resized.
+
+        Other Parameters
+        ----------------
+        cur_qvalue: str | None
+            the Q-value shown in the plot.
+        """
+        cur_qvalue: str | None
+        cur_qvalue = self._plotCache.current
+        if cur_qvalue is None or cur_qvalue not in self._dataDic:
+            return
+        self.fmi.plotDetail(self._cur_plot, self._plotCache.get(cur_qvalue),
+                            self._dataDic[cur_qvalue]["measData"])
+
     def nRoi_change(self: Self):
         """Add or remove Linear ROIs from graph and the coresponding lineEdits.
 
@@ -517,6 +792,7 @@ class MainWin(QMainWindow, Ui_MainWindow):
                 del self._dataDic[cur_qvalue]["lrois"][cur_nRois:]
                 del self._dataDic[cur_qvalue]["lroisLimits"][cur_nRois:]
                 del self._dataDic[cur_qvalue]["lareas"][cur_nRois:]
+                del self._dataDic[cur_qvalue]["lerrors"][cur_nRois:]
             else:
                 for lroi_n in range(len(self._dataDic[cur_qvalue]["lrois"]),
                                     cur_nRois):
@@ -585,6 +861,12 @@ class MainWin(QMainWindow, Ui_MainWindow):
             to save the text value of the current item of the comboBox
             the Q-value (str) is the key of the _dataDic dictionary.
         """
+        cur_qvalue: str
+        cur_qvalue = self.comboBox_Q.currentText()
+        # Los ROIs se ponen sobre los datos de la Q actual, que puede que
+        # no se hayan podido leer del fichero exportado
+        if cur_qvalue in self._dataDic and not self.loadQData(cur_qvalue):
+            return
         self.groupBox_area.show()
         # Escondo todos menos el primero, porque el spinbox estará en 1
         self.groupBox_ROI2.hide()
@@ -596,6 +878,7 @@ class MainWin(QMainWindow, Ui_MainWindow):
         for qvalue in self._dataDic:
             self._dataDic[qvalue]["lrois"] = list()
             self._dataDic[qvalue]["lareas"] = list()
+            self._dataDic[qvalue]["lerrors"] = list()
             self._dataDic[qvalue]["lroisLimits"] = list()
         # Aquí voy ha hacer como si cambiase el número de ROIs DESDE EL SPINBOX
         # y llamo a esa función
@@ -944,6 +1227,7 @@ class MainWin(QMainWindow, Ui_MainWindow):
         cur_qvalue = self.comboBox_Q.currentText()
         # voy a borrar las áreas del diccionario
         self._dataDic[cur_qvalue]["lareas"].clear()
+        self._dataDic[cur_qvalue]["lerrors"].clear()
         self.fmi.calcArea(cur_qvalue, self._dataDic)
         for lroi_n in range(len(self._dataDic[cur_qvalue]["lrois"])):
             self.displayArea(lroi_n)
@@ -981,10 +1265,12 @@ class MainWin(QMainWindow, Ui_MainWindow):
                 self.lineEdit_area_ROI5.setText(f"{area:0.4f}")
 
     def connect_ROI_callback(self: Self, lroi_n: int):
-        """Connect the linear ROI callback with the update_edit_x function.
+        """Connect the linear ROI callback with the roiMoved function.
+
+        Each pg.LinearRegionItem is connected only once, even if it is
+        added again to the plot when coming back to its Q-value. The
+        item is passed by the signal, so roiMoved finds its index.
 
-        I need to do this connection in a match/case because if I pass
-        a parameter to the function the callback does not work.
         Parameters
         ----------
         lroi_n: int
@@ -994,39 +1280,205 @@ class MainWin(QMainWindow, Ui_MainWindow):
         cur_qvalue: str
             to save the text value of the current item of the comboBox
             the Q-value (str) is the key of the _dataDic dictionary.
+        lroi: pg.LinearRegionItem
+            the ROI to be connected.
         """
+        cur_qvalue: str
         cur_qvalue = self.comboBox_Q.currentText()
-        match lroi_n:
-            case 0:
-                self._dataDic[cur_qvalue]["lrois"][0].\
-                    sigRegionChanged.connect(
-                        lambda: self.update_edit_x_Rois(0))
-            case 1:
-                self._dataDic[cur_qvalue]["lrois"][1].\
-                    sigRegionChanged.connect(
-                        lambda: self.update_edit_x_Rois(1))
-            case 2:
-                self._dataDic[cur_qvalue]["lrois"][2].\
-                    sigRegionChanged.connect(
-                        lambda: self.update_edit_x_Rois(2))
-            case 3:
-                self._dataDic[cur_qvalue]["lrois"][3].\
-                    sigRegionChanged.connect(
-                        lambda: self.update_edit_x_Rois(3))
-            case 4:
-                self._dataDic[cur_qvalue]["lrois"][4].\
-                    sigRegionChanged.connect(
-                        lambda: self.update_edit_x_Rois(4))
+        lroi = self._dataDic[cur_qvalue]["lrois"][lroi_n]
+        if lroi in self._connectedRois:
+            return
+        lroi.sigRegionChanged.connect(self.roiMoved)
+        lroi.sigRegionChangeFinished.connect(self.roiMoveFinished)
+        self._connectedRois.add(lroi)
+
+    def roiMoved(self: Self, lroi):
+        """Take note of a moved ROI, to update it in the next frame.
+
+        The lineEdits and the areas are not updated for every movement
+        of the mouse, but at most once per frame of the screen (see
+        flushRoiUpdates).
+
+        Parameters
+        ----------
+        lroi: pg.LinearRegionItem
+            the ROI that has been moved.
+        """
+        cur_qvalue: str
+        cur_qvalue = self.comboBox_Q.currentText()
+        lroi_n: int
+        for lroi_n, item in enumerate(self._dataDic[cur_qvalue]["lrois"]):
+            if item is lroi:
+                self._pendingRois.add(lroi_n)
+                break
+        if not self._roiTimer.isActive():
+            self._roiTimer.start()
+
+    def roiMoveFinished(self: Self, lroi):
+        """Update a ROI as soon as it is dropped.
+
+        Parameters
+        ----------
+        lroi: pg.LinearRegionItem
+            the ROI that has been moved.
+        """
+        self.roiMoved(lroi)
+        self._roiTimer.stop()
+        self.flushRoiUpdates()
+
+    def flushRoiUpdates(self: Self):
+        """Update the lineEdits and the areas of the moved ROIs.
+
+        Other Parameters
+        ----------------
+        cur_qvalue: str
+            to save the text value of the current item of the comboBox
+            the Q-value (str) is the key of the _dataDic dictionary.
+        lroi_n: int
+            the index (0-4) of the linear ROI (1-5).
+        """
+        if not self._pendingRois:
+            return
+        cur_qvalue: str
+        cur_qvalue = self.comboBox_Q.currentText()
+        lroi_n: int
+        for lroi_n in sorted(self._pendingRois):
+            if lroi_n < len(self._dataDic[cur_qvalue]["lrois"]):
+                self.update_edit_x_Rois(lroi_n)
+        self._pendingRois.clear()
+        # Las áreas se calculan con los límites nuevos, en vivo
+        self.getAreas()
+
+    def getAllAreas(self: Self):
+        """Calculate the areas below the curve for all the Q-values.
+
+        The Q-values already visited keep their own ROIs, and the others
+        get the ROIs of the current Q-value, as when moving to them with
+        the Q+ and Q- buttons. The data of the Q-values not read yet from
+        an exported file is read all at once.
+
+        Other Parameters
+        ----------------
+        cur_qvalue: str
+            to save the text value of the current item of the comboBox
+            the Q-value (str) is the key of the _dataDic dictionary.
+        limits: dict
+            the limits of the ROIs for each Q-value.
+        """
+        cur_qvalue: str
+        cur_qvalue = self.comboBox_Q.currentText()
+        if not self.loadAllQData():
+            return
+        limits: dict
+        limits = {}
+        for q in self._dataDic:
+            if len(self._dataDic[q]["lrois"]) != 0:
+                limits[q] = self._dataDic[q]["lroisLimits"][
+                    :len(self._dataDic[q]["lrois"])]
+            else:
+                limits[q] = self._dataDic[cur_qvalue]["lroisLimits"]
+        self.fmi.batch_areas(self._dataDic, limits)
+        for lroi_n in range(len(self._dataDic[cur_qvalue]["lrois"])):
+            self.displayArea(lroi_n)
 
     def exportAreas(self: Self):
-        """Export the results as a table to a csv file."""
+        """Export the results as a table to a csv file.
+
+        The areas are calculated first for all the Q-values (see
+        getAllAreas), so there is no need to go through them.
+        """
+        self.getAllAreas()
         # self._saveDic = deepcopy(self._dataDic)
         for q_value in self._dataDic.keys():
             self._saveDic[q_value] = \
                 {"lareas": self._dataDic[q_value]["lareas"].copy(),
+                 "lerrors": self._dataDic[q_value]["lerrors"].copy(),
                  "lroisLimits": self._dataDic[q_value]["lroisLimits"].copy()}
         self.fmi.dict_to_csv(self._saveDic)
 
+    def showMap(self: Self):
+        """Show the S(Q, E) data of all the Q-values as a colour map.
+
+        The data is resampled onto a regular grid the first time the map
+        of a dataset is shown (see SQEMap), and the whole map is drawn
+        as a single image, in its own window.
+
+        Other Parameters
+        ----------------
+        pitem: pg.PlotItem
+            the plot where the map is shown.
+        """
+        if not self._dataDic:
+            self.statusbar.showMessage('Load data first')
+            return
+        if self._sqeMap is None:
+            if not self.loadAllQData():
+                return
+            self._sqeMap = SQEMap(
+                [float(q) for q in self._dataDic],
+                [self._dataDic[q]["measData"] for q in self._dataDic])
+        if self._mapWin is None:
+            self._mapWin = pg.GraphicsLayoutWidget(title='S(Q, E) map')
+            self._mapWin.resize(800, 600)
+        self._mapWin.clear()
+        pitem: pg.PlotItem
+        pitem = self._mapWin.addPlot()
+        pitem.setLabel('left', "Q (\u00c5\u00af\u00b9)")
+        pitem.setLabel('bottom', "Energy", units='meV')
+        self._sqeMap.plot(pitem)
+        self._mapWin.show()
+        self._mapWin.raise_()
+
+    def showFourier(self: Self):
+        """Show the I(Q, t) of the current Q-value.
+
+        The Fourier transform of all the Q-values is calculated at once
+        the first time it is shown for a dataset (see FourierTransform),
+        and the I(Q, t) of the current Q-value is plotted in its own
+        window, which follows the Q-value selected in the comboBox.
+
+        Other Parameters
+        ----------------
+        cur_qvalue: str
+            the Q-value (str), the key of the _dataDic dictionary.
+        pitem: pg.PlotItem
+            the plot where I(Q, t) is shown.
+        curve: pg.PlotDataItem
+            the points of I(Q, t) in the plot.
+        """
+        if not self._dataDic:
+            self.statusbar.showMessage('Load data first')
+            return
+        if self._fourier is None:
+            if not self.loadAllQData():
+                return
+            self._fourier = FourierTransform(
+                [float(q) for q in self._dataDic],
+                [self._dataDic[q]["measData"] for q in self._dataDic])
+        pitem: pg.PlotItem
+        if self._fourierWin is None:
+            self._fourierWin = pg.GraphicsLayoutWidget(title='I(Q, t)')
+            self._fourierWin.resize(800, 600)
+            pitem = self._fourierWin.addPlot()
+            pitem.addLegend()
+            pitem.setLogMode(x=True)
+            pitem.setLabel('left', "I(Q, t)")
+            pitem.setLabel('bottom', "Fourier time (ps)")
+            pitem.plot(pen=None, symbol='o', symbolPen=None, symbolSize=5)
+        cur_qvalue: str
+        cur_qvalue = self.comboBox_Q.currentText()
+        # Solo cambio los datos de la curva que ya está en la ventana
+        pitem = self._fourierWin.getItem(0, 0)
+        curve: pg.PlotDataItem
+        curve = pitem.listDataItems()[0]
+        # En escala logarítmica me salto t = 0
+        curve.setData(self._fourier.time[1:], self._fourier.intensity[
+            list(self._dataDic).index(cur_qvalue), 1:])
+        pitem.legend.clear()
+        pitem.legend.addItem(curve, self._dataDic[cur_qvalue]["label"])
+        self._fourierWin.show()
+        self._fourierWin.raise_()
+
 
 if __name__ == "__main__":
     app: QApplication
@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Command line converter of QENS data files.
+
+Filename: QENS_convert.py  
+Author: Beatriz Robles Hernández  
+Date: 2026-10-18  
+Version: 1.0  
+Description:
+    This script converts QENS data files to csv without the GUI
+    (PyQt5 is not imported), so whole experiments can be converted
+    in a cluster node. The files are converted in parallel, and
+    Chi(Q, E) is also saved when a temperature is given. With one
+    temperature per file (a temperature scan), the Chi(Q, E) of all
+    the files is saved together in a single _scan_Chi file. The output
+    can also be written in binary formats (Parquet, HDF5 or NPZ),
+    with the metadata of the measurement. e.g.:
+        python QENS_convert.py data/*.inx -t 50 -j 8 -f parquet
+        python QENS_convert.py a.inx b.inx c.inx -t 10 50 100
+        python QENS_convert.py "let/run123_*.txt" -i LET
+
+License: GLP  
+Contact: broblesher@gmail.com  
+Dependencies: os, io, sys, glob, argparse, contextlib, numpy,
+    concurrent.futures, FuncionesLeer, QENSData
+"""
+# Import statements
+import os
+import io
+import sys
+import glob
+import argparse
+import contextlib
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from loadWindow.FuncionesLeer import FuncionesLeer, EXPORT_EXTENSIONS
+from loadWindow.QENSData import QENSData
+
+
+def expand_inputs(patterns: list[str]) -> list[str]:
+    """Expand the glob patterns of the input files.
+
+    Parameters
+    ----------
+    patterns: list[str]
+        the input files, or glob patterns
+
+    Returns
+    -------
+    fileNames: list[str]
+        the input files, without repetitions and in the given order.
+        The patterns that match no file are kept, so that the error
+        is reported when converting them
+    """
+    fileNames: list[str]
+    fileNames = []
+    pattern: str
+    for pattern in patterns:
+        matches: list[str]
+        matches = sorted(glob.glob(pattern)) or [pattern]
+        fileNames.extend(f for f in matches if f not in fileNames)
+    return fileNames
+
+
+def plan_jobs(funcionesLeer: FuncionesLeer, fileNames: list[str],
+              instrument: str) -> list[tuple[str, str]]:
+    """Find the instrument of each file and group the LET files.
+
+    LET saves each Q in its own file, so only one file of each LET
+    measurement is converted (it reads all the others).
+
+    Parameters
+    ----------
+    funcionesLeer: FuncionesLeer
+        to detect the instrument of the files
+    fileNames: list[str]
+        the input files
+    instrument: str
+        the instrument of all the files, or 'auto' to detect it from
+        each file
+
+    Returns
+    -------
+    jobs: list[tuple[str, str]]
+        the (fileName, instrument) of each conversion. The instrument
+        is None if the file does not exist or its format is unknown
+    """
+    jobs: list[tuple[str, str]]
+    jobs = []
+    seenLET: set[str]
+    seenLET = set()
+    fileName: str
+    for fileName in fileNames:
+        fileInstrument: str | None
+        fileInstrument = instrument
+        if instrument == 'auto':
+            try:
+                fileInstrument = funcionesLeer.detect_instrument(fileName)
+            except OSError:
+                fileInstrument = None
+        if fileInstrument == 'LET':
+            measurement: str
+            measurement = os.path.join(
+                os.path.dirname(os.path.abspath(fileName)),
+                funcionesLeer.fileNameDropLET(fileName))
+            if measurement in seenLET:
+                continue
+            seenLET.add(measurement)
+        jobs.append((fileName, fileInstrument))
+    return jobs
+
+
+def convert(fileName: str, instrument: str | None, temp: float | None,
+            outDir: str | None, engine: str = 'numpy',
+            fmt: str = 'csv', float32: bool = False,
+            scan: bool = False) -> tuple[list[str], QENSData | None]:
+    """Convert one data file (or LET measurement) to csv or binary.
+
+    Runs in the worker processes, so it creates its own FuncionesLeer.
+
+    Parameters
+    ----------
+    fileName: str
+        the data file, with path included
+    instrument: str | None
+        the instrument where the data was recorded
+    temp: float | None
+        the temperature of the measurement, to save also Chi(Q, E), or
+        None to save only S(Q, E)
+    outDir: str | None
+        the folder of the csv files, or None to save them next to the
+        data file
+    engine: str
+        the parsing engine (see FuncionesLeer.read_from_ifile)
+    fmt: str
+        the output format: 'csv', 'parquet', 'hdf5' or 'npz'
+    float32: bool
+        store E, S(Q, E) and err as float32 instead of float64, to
+        halve the memory. Chi(Q, E) is still calculated in float64
+    scan: bool
+        the file is part of a temperature scan: Chi(Q, E) is not saved
+        here, but for the whole scan in save_scan, so the data is
+        returned
+
+    Returns
+    -------
+    oFileNames: list[str]
+        the files written
+    data: QENSData | None
+        the S(Q, E) data if scan is True, None otherwise
+
+    Raises
+    ------
+    OSError
+        if the data file does not exist
+    ValueError
+        if the format of the data file is unknown
+    """
+    if instrument is None:
+        if not os.path.isfile(fileName):
+            raise OSError(2, 'Input file does not exist. ')
+        raise ValueError('Unknown data format')
+
+    # Los parsers ya dan float64 si no se les pide otro tipo
+    dtype = np.float32 if float32 else None
+    funcionesLeer: FuncionesLeer
+    # FuncionesLeer escribe mensajes en stdout, que es la salida del script
+    with contextlib.redirect_stdout(io.StringIO()):
+        funcionesLeer = FuncionesLeer()
+    if instrument == 'LET':
+        # Ya estoy en un proceso del pool: leo los ficheros en serie
+        qvalue, energy, scatInt, err = funcionesLeer.leer_de_LET(
+            fileName, engine, maxWorkers=1, dtype=dtype)
+        # Nombro las columnas con el nombre de la medida, sin el (n)
+        fileName = os.path.join(
+            os.path.dirname(fileName),
+            funcionesLeer.fileNameDropLET(fileName) + '.txt')
+    else:
+        iFile = funcionesLeer.open_iFile(fileName)
+        qvalue, energy, scatInt, err = funcionesLeer.read_from_ifile(
+            iFile, instrument, engine, dtype)
+        with contextlib.redirect_stdout(io.StringIO()):
+            funcionesLeer.close_iFile(iFile)
+
+    data: QENSData
+    data = QENSData.from_lists(
+        fileName, qvalue, energy, scatInt, err,
+        {'instrument': instrument, 'temperature': temp,
+         'source': os.path.abspath(fileName)},
+        np.float32 if float32 else np.float64)
+    # El DataFrame solo se hace para escribir los ficheros
+    dfS = data.to_dataframe()
+
+    oFileName: str
+    oFileName = os.path.splitext(fileName)[0]
+    if outDir is not None:
+        oFileName = os.path.join(outDir, os.path.basename(oFileName))
+    oFileNames: list[str]
+    oFileNames = [oFileName + EXPORT_EXTENSIONS[fmt]]
+
+    dfchiSorted = None
+    if temp is not None and not scan:
+        dfchiSorted = funcionesLeer.chi_from_data(temp, data)
+        oFileNames.append(oFileName + '_Chi' + EXPORT_EXTENSIONS[fmt])
+
+    if fmt == 'csv':
+        if dfchiSorted is not None:
+            funcionesLeer.save_chi_data_to_csv(oFileNames[0], dfchiSorted)
+        funcionesLeer.save_data_to_csv(oFileNames[0], dfS)
+        return oFileNames, data if scan else None
+
+    save = {'parquet': funcionesLeer.save_data_to_parquet,
+            'hdf5': funcionesLeer.save_data_to_hdf5,
+            'npz': funcionesLeer.save_data_to_npz}[fmt]
+    metadata: dict
+    metadata = dict(data.metadata, data='S(Q, E)')
+    save(oFileNames[0], dfS, metadata)
+    if dfchiSorted is not None:
+        save(oFileNames[1], dfchiSorted, dict(metadata, data='Chi(Q, E)'))
+    return oFileNames, data if scan else None
+
+
+def save_scan(funcionesLeer: FuncionesLeer, oFileName: str, fmt: str,
+              datasets: list[QENSData]) -> str:
+    """Save the Chi(Q, E) of a temperature scan in one file.
+
+    Chi(Q, E) is calculated for all the datasets at once with
+    FuncionesLeer.chi_from_S_batch, and the datasets are put side by
+    side in the input order.
+
+    Parameters
+    ----------
+    funcionesLeer: FuncionesLeer
+        to calculate and save Chi(Q, E)
+    oFileName: str
+        the output file, without extension
+    fmt: str
+        the output format: 'csv', 'parquet', 'hdf5' or 'npz'
+    datasets: list[QENSData]
+        the S(Q, E) data of each file, with the temperature in its
+        metadata
+
+    Returns
+    -------
+    oFileName: str
+        the file written
+    """
+    temps: list[float]
+    temps = [data.metadata['temperature'] for data in datasets]
+    dfchiBatch = funcionesLeer.chi_from_S_batch(
+        temps, [data.qvalue for data in datasets],
+        [data.to_dataframe() for data in datasets])
+
+    if fmt == 'csv':
+        # save_chi_data_to_csv ya añade el _Chi al nombre
+        funcionesLeer.save_chi_data_to_csv(oFileName + '.csv', dfchiBatch)
+        return oFileName + '_Chi.csv'
+
+    save = {'parquet': funcionesLeer.save_data_to_parquet,
+            'hdf5': funcionesLeer.save_data_to_hdf5,
+            'npz': funcionesLeer.save_data_to_npz}[fmt]
+    oFileName += '_Chi' + EXPORT_EXTENSIONS[fmt]
+    save(oFileName, dfchiBatch,
+         {'data': 'Chi(Q, E)', 'temperature': temps,
+          'source': [data.metadata['source'] for data in datasets]})
+    return oFileName
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parse the command line arguments."""
+    parser = argparse.ArgumentParser(
+        description='Convert QENS data files to csv, without the GUI.')
+    parser.add_argument(
+        'inputs', nargs='+',
+        help='data files or glob patterns (quote them to let the script '
+             'expand them)')
+    parser.add_argument(
+        '-i', '--instrument', default='auto',
+        choices=['auto'] + list(FuncionesLeer._parsers),
+        help='instrument of all the files (default: detect it from each '
+             'file)')
+    parser.add_argument(
+        '-t', '--temperature', type=float, nargs='+', default=None,
+        help='temperature (K) to save also Chi(Q, E): one for all the '
+             'files, or one per converted file (a temperature scan, '
+             'saved in a single _scan_Chi file)')
+    parser.add_argument(
+        '-o', '--output-dir', default=None,
+        help='folder of the csv files (default: next to the data files)')
+    parser.add_argument(
+        '-j', '--jobs', type=int, default=os.cpu_count() or 1,
+        help='number of worker processes (default: number of CPUs)')
+    parser.add_argument(
+        '-e', '--engine', default='numpy',
+        choices=['numpy', 'mmap', 'reference'],
+        help='parsing engine (default: numpy)')
+    parser.add_argument(
+        '-f', '--format', default='csv', choices=list(EXPORT_EXTENSIONS),
+        help='output format (default: csv)')
+    parser.add_argument(
+        '--float32', action='store_true',
+        help='store the data as float32, to halve the memory of big '
+             'files')
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the converter.
+
+    Returns
+    -------
+    The exit code: 0 if all the files were converted, 1 otherwise
+    """
+    args = parse_args(argv)
+
+    funcionesLeer: FuncionesLeer
+    with contextlib.redirect_stdout(io.StringIO()):
+        funcionesLeer = FuncionesLeer()
+    jobs: list[tuple[str, str]]
+    jobs = plan_jobs(funcionesLeer, expand_inputs(args.inputs),
+                     args.instrument)
+
+    temps: list[float | None]
+    if args.temperature is None:
+        temps = [None] * len(jobs)
+    elif len(args.temperature) == 1:
+        temps = args.temperature * len(jobs)
+    elif len(args.temperature) == len(jobs):
+        temps = args.temperature
+    else:
+        print(f'Error: {len(args.temperature)} temperatures for '
+              f'{len(jobs)} files', file=sys.stderr)
+        return 1
+
+    if args.output_dir is not None:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    # Con una temperatura por fichero, Chi se calcula para todos juntos
+    scan: bool
+    scan = args.temperature is not None and len(args.temperature) > 1
+    datasets: list[QENSData]
+    datasets = []
+    scanFileName: str | None
+    scanFileName = None
+    failed: int
+    failed = 0
+    with ProcessPoolExecutor(
+            max_workers=max(1, min(args.jobs, len(jobs)))) as executor:
+        futures = [executor.submit(convert, fileName, instrument, temp,
+                                   args.output_dir, args.engine,
+                                   args.format, args.float32, scan)
+                   for (fileName, instrument), temp in zip(jobs, temps)]
+        for (fileName, _), future in zip(jobs, futures):
+            try:
+                oFileNames, data = future.result()
+            except (OSError, ValueError, ImportError) as error:
+                failed += 1
+                print(f'Error: {fileName}: {error}', file=sys.stderr)
+            except Exception as error:
+                # Cualquier otro fallo de un fichero (p.ej. uno cortado,
+                # o un proceso del pool que se muere) no para el resto
+                failed += 1
+                print(f'Error: {fileName}: {type(error).__name__}: {error}',
+                      file=sys.stderr)
+            else:
+                print(f'{fileName} -> {", ".join(oFileNames)}')
+                if scan:
+                    datasets.append(data)
+                    if scanFileName is None:
+                        scanFileName = os.path.splitext(
+                            oFileNames[0])[0] + '_scan'
+
+    if datasets:
+        scanFileName = save_scan(funcionesLeer, scanFileName, args.format,
+                                 datasets)
+        print(f'Chi(Q, E) of the scan -> {scanFileName}')
+    print(f'{len(jobs) - failed} of {len(jobs)} files converted')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Benchmarks of the export formats.
+
+Filename: bench_export.py  
+Author: Beatriz Robles Hernández  
+Date: 2026-10-18  
+Version: 1.0  
+Description:
+    This script compares the csv export of FuncionesLeer with the
+    binary ones (Parquet, HDF5 and NPZ): write time, read time and
+    file size, with synthetic S(Q, E) data. The formats whose
+    library is not installed are skipped. Run it from the root
+    folder of the repository:
+        python -m benchmarks.bench_export
+
+License: GLP  
+Contact: broblesher@gmail.com  
+Dependencies: os, io, tempfile, contextlib, numpy, pandas,
+    FuncionesLeer, bench_loading
+"""
+# Import statements
+import os
+import io
+import tempfile
+import contextlib
+import numpy as np
+import pandas as pd
+from loadWindow.FuncionesLeer import FuncionesLeer
+from benchmarks.bench_loading import synthetic_data, timeit
+
+
+def read_npz(fileName: str) -> dict:
+    """Read all the columns of a NPZ export."""
+    with np.load(fileName) as npz:
+        return {name: npz[name] for name in npz.files}
+
+
+def bench_formats(funcionesLeer: FuncionesLeer, nq: int, npoints: int):
+    """Time the export and the import of the S(Q, E) data."""
+    data = synthetic_data(nq, npoints)
+    dfS = funcionesLeer.data_to_pandas_df('data.dat', *data)
+    metadata = {'instrument': 'IN16B', 'temperature': 50.0,
+                'source': 'data.dat'}
+    # save_data_to_csv quita filas de dfS, así que le paso una copia
+    formats = {
+        'csv': ('.csv',
+                lambda f: funcionesLeer.save_data_to_csv(f, dfS.copy()),
+                lambda f: pd.read_csv(f, sep='\t')),
+        'parquet': ('.parquet',
+                    lambda f: funcionesLeer.save_data_to_parquet(
+                        f, dfS, metadata),
+                    pd.read_parquet),
+        'hdf5': ('.h5',
+                 lambda f: funcionesLeer.save_data_to_hdf5(f, dfS, metadata),
+                 lambda f: pd.read_hdf(f, 'data')),
+        'npz': ('.npz',
+                lambda f: funcionesLeer.save_data_to_npz(f, dfS, metadata),
+                read_npz),
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        tcsv = None
+        for name, (extension, write, read) in formats.items():
+            fileName = os.path.join(tmp, 'data' + extension)
+            try:
+                twrite = timeit(lambda: write(fileName), repeat=3)
+            except ImportError as error:
+                print(f'{name + f" ({nq} Q)":<24}skipped: {error}')
+                continue
+            tread = timeit(lambda: read(fileName), repeat=3)
+            size = os.path.getsize(fileName) / 1024 ** 2
+            if tcsv is None:
+                tcsv = twrite + tread
+            print(f'{name + f" ({nq} Q)":<24}{twrite * 1000:>12.1f}'
+                  f'{tread * 1000:>12.1f}{size:>12.2f}'
+                  f'{tcsv / (twrite + tread):>10.1f}x')
+
+
+def main():
+    """Run all the benchmarks."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        funcionesLeer = FuncionesLeer()
+    print(f'{"format":<24}{"write (ms)":>12}{"read (ms)":>12}'
+          f'{"size (MB)":>12}{"vs csv":>11}')
+    for nq in (20, 100, 400):
+        bench_formats(funcionesLeer, nq, 2000)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Benchmarks of the loading pipeline.
+
+Filename: bench_loading.py  
+Author: Beatriz Robles Hernández  
+Date: 2026-10-18  
+Version: 1.0  
+Description:
+    This script times the functions of FuncionesLeer with
+    synthetic data, comparing the 'reference' engines with the
+    'numpy' ones. Run it from the root folder of the repository:
+        python -m benchmarks.bench_loading
+
+License: GLP  
+Contact: broblesher@gmail.com  
+Dependencies: os, time, tempfile, contextlib, io, numpy, pandas,
+    FuncionesLeer
+"""
+# Import statements
+import os
+import io
+import time
+import tempfile
+import contextlib
+import numpy as np
+import pandas as pd
+from loadWindow.FuncionesLeer import FuncionesLeer
+
+
+def synthetic_data(nq: int, npoints: int, seed: int = 0) -> tuple:
+    """Create ragged S(Q, E) data, as returned by the parsers.
+
+    Parameters
+    ----------
+    nq: int
+        the number of Q groups
+    npoints: int
+        the maximum number of points of a Q group
+    seed: int
+        the seed of the random number generator
+
+    Returns
+    -------
+    A tuple with the values:
+    qvalue: list[float]
+    energy: list[npt.NDArray]
+    scatInt: list[npt.NDArray]
+    err: list[npt.NDArray]
+    """
+    rng = np.random.default_rng(seed)
+    qvalue = [0.2 + 0.01 * i for i in range(nq)]
+    sizes = rng.integers(npoints // 2, npoints, nq, endpoint=True)
+    energy = [np.linspace(-5, 5, n) for n in sizes]
+    scatInt = [rng.random(n) for n in sizes]
+    err = [rng.random(n) * 0.1 for n in sizes]
+    return qvalue, energy, scatInt, err
+
+
+def write_IN16B(fileName: str, qvalue: list, energy: list, scatInt: list,
+                err: list):
+    """Write the data to a file with the IN16B format."""
+    with open(fileName, 'w') as oFile:
+        oFile.write('# synthetic IN16B data\n')
+        for i, q in enumerate(qvalue):
+            oFile.write(f'# q(Angstrom^-1) = {q:.4f}\n')
+            for e, s, d in zip(energy[i], scatInt[i], err[i]):
+                oFile.write(f'{e:.6e} {s:.6e} {d:.6e}\n')
+
+
+def timeit(func, repeat: int = 5) -> float:
+    """Return the best time of several calls to func, in seconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def report(name: str, tref: float, tnew: float):
+    """Print one line of the results table."""
+    print(f'{name:<40}{tref * 1000:>12.2f}{tnew * 1000:>12.2f}'
+          f'{tref / tnew:>10.1f}x')
+
+
+def bench_parsers(funcionesLeer: FuncionesLeer, nq: int, npoints: int):
+    """Time read_from_ifile with the two engines."""
+    data = synthetic_data(nq, npoints)
+    with tempfile.TemporaryDirectory() as tmpDir:
+        fileName = os.path.join(tmpDir, 'data.dat')
+        write_IN16B(fileName, *data)
+
+        def parse(engine):
+            with open(fileName) as iFile:
+                return funcionesLeer.read_from_ifile(iFile, 'IN16B', engine)
+        report(f'read_from_ifile IN16B ({nq} Q)',
+               timeit(lambda: parse('reference')),
+               timeit(lambda: parse('numpy')))
+
+
+def bench_data_to_pandas_df(funcionesLeer: FuncionesLeer, nq: int,
+                            npoints: int):
+    """Time data_to_pandas_df with the two engines."""
+    data = synthetic_data(nq, npoints)
+    dfRef = funcionesLeer.data_to_pandas_df('data.dat', *data, 'reference')
+    dfNew = funcionesLeer.data_to_pandas_df('data.dat', *data, 'numpy')
+    pd.testing.assert_frame_equal(dfRef, dfNew)
+    report(f'data_to_pandas_df ({nq} Q)',
+           timeit(lambda: funcionesLeer.data_to_pandas_df(
+               'data.dat', *data, 'reference')),
+           timeit(lambda: funcionesLeer.data_to_pandas_df(
+               'data.dat', *data, 'numpy')))
+
+
+def bench_chi_from_S(funcionesLeer: FuncionesLeer, nq: int, npoints: int):
+    """Time chi_from_S with the two engines."""
+    qvalue, energy, scatInt, err = synthetic_data(nq, npoints)
+    dfS = funcionesLeer.data_to_pandas_df('data.dat', qvalue, energy,
+                                          scatInt, err)
+    pd.testing.assert_frame_equal(
+        funcionesLeer.chi_from_S(50, qvalue, dfS, 'reference'),
+        funcionesLeer.chi_from_S(50, qvalue, dfS, 'numpy'))
+    report(f'chi_from_S ({nq} Q)',
+           timeit(lambda: funcionesLeer.chi_from_S(
+               50, qvalue, dfS, 'reference')),
+           timeit(lambda: funcionesLeer.chi_from_S(
+               50, qvalue, dfS, 'numpy')))
+
+
+def main():
+    """Run all the benchmarks."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        funcionesLeer = FuncionesLeer()
+    print(f'{"benchmark":<40}{"ref (ms)":>12}{"numpy (ms)":>12}'
+          f'{"speedup":>11}')
+    for nq in (20, 100, 400):
+        bench_parsers(funcionesLeer, nq, 500)
+    for nq in (20, 100, 400):
+        bench_data_to_pandas_df(funcionesLeer, nq, 500)
+    for nq in (20, 100):
+        bench_chi_from_S(funcionesLeer, nq, 500)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Benchmarks of the memory of the loaded data.
+
+Filename: bench_memory.py  
+Author: Beatriz Robles Hernández  
+Date: 2026-10-18  
+Version: 1.0  
+Description:
+    This script compares the memory of the S(Q, E) data stored as
+    float64 (default) and as float32, with synthetic data: the size
+    of the QENSData and of the DataFrame, the memory kept and the peak
+    of parsing an IN16B file, and the error of the areas and
+    Chi(Q, E) calculated from the float32 data. Run it from the root
+    folder of the repository:
+        python -m benchmarks.bench_memory
+
+License: GLP  
+Contact: broblesher@gmail.com  
+Dependencies: os, io, tempfile, tracemalloc, contextlib, numpy,
+    FuncionesLeer, QENSData, bench_loading
+"""
+# Import statements
+import os
+import io
+import tempfile
+import tracemalloc
+import contextlib
+import numpy as np
+from loadWindow.FuncionesLeer import FuncionesLeer
+from loadWindow.QENSData import QENSData
+from benchmarks.bench_loading import synthetic_data, write_IN16B
+
+DTYPES = {'float64': np.float64, 'float32': np.float32}
+
+
+def traced_memory(func) -> tuple[float, float]:
+    """Return the memory kept by the result of func and the peak, in MB."""
+    tracemalloc.start()
+    try:
+        result = func()  # noqa: F841 (lo mantengo vivo para medirlo)
+        return tuple(m / 1024 ** 2 for m in tracemalloc.get_traced_memory())
+    finally:
+        tracemalloc.stop()
+
+
+def areas(data: QENSData) -> np.ndarray:
+    """Integrate each Q group in float64, as calcArea does."""
+    return np.array([np.trapezoid(np.asarray(s, dtype=np.float64),
+                                  np.asarray(e, dtype=np.float64))
+                     for e, s, _ in map(data.group, range(len(data)))])
+
+
+def bench_storage(funcionesLeer: FuncionesLeer, nq: int, npoints: int):
+    """Compare the size of the data stored as float64 and float32."""
+    data = synthetic_data(nq, npoints)
+    reference = None
+    for name, dtype in DTYPES.items():
+        qensData = QENSData.from_lists('data.dat', *data, dtype=dtype)
+        nbytes = (qensData.energy.nbytes + qensData.scatInt.nbytes
+                  + qensData.err.nbytes) / 1024 ** 2
+        dfS = funcionesLeer.data_to_pandas_df('data.dat', *data,
+                                              dtype=dtype)
+        dfbytes = dfS.memory_usage(index=False).sum() / 1024 ** 2
+        chi = funcionesLeer.chi_from_data(50.0, qensData).to_numpy()
+        area = areas(qensData)
+        if reference is None:
+            reference = (nbytes + dfbytes, chi, area)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            chiError = np.nanmax(np.abs(chi / reference[1] - 1))
+        areaError = np.max(np.abs(area / reference[2] - 1))
+        print(f'{name + f" ({nq} Q)":<24}{nbytes:>12.1f}{dfbytes:>12.1f}'
+              f'{reference[0] / (nbytes + dfbytes):>8.1f}x'
+              f'{areaError:>12.1e}{chiError:>12.1e}')
+
+
+def bench_parsing(funcionesLeer: FuncionesLeer, nq: int, npoints: int):
+    """Compare the peak memory of parsing a file to float64 and float32."""
+    data = synthetic_data(nq, npoints)
+    with tempfile.TemporaryDirectory() as tmp:
+        fileName = os.path.join(tmp, 'data.dat')
+        write_IN16B(fileName, *data)
+        for name, dtype in DTYPES.items():
+            def load():
+                with open(fileName, 'r') as iFile:
+                    lists = funcionesLeer.read_from_ifile(
+                        iFile, 'IN16B', 'numpy', dtype)
+                return QENSData.from_lists(fileName, *lists, dtype=dtype)
+            kept, peak = traced_memory(load)
+            print(f'{name + f" ({nq} Q)":<24}{kept:>12.1f}{peak:>12.1f}')
+
+
+def main():
+    """Run all the benchmarks."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        funcionesLeer = FuncionesLeer()
+    print(f'{"storage":<24}{"data (MB)":>12}{"df (MB)":>12}{"saving":>9}'
+          f'{"area err":>12}{"chi err":>12}')
+    for nq in (20, 100, 400):
+        bench_storage(funcionesLeer, nq, 2000)
+    print(f'\n{"parsing":<24}{"kept (MB)":>12}{"peak (MB)":>12}')
+    for nq in (20, 100, 400):
+        bench_parsing(funcionesLeer, nq, 2000)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""FuncionesCache class.
+
+Filename: FuncionesCache.py  
+Author: Beatriz Robles Hernández  
+Date: 2026-10-18  
+Version: 1.0  
+Description:
+    This module contains a class with the functions
+    necesary to keep a binary cache of the parsed data
+    files, so that the text files are not parsed again
+    every time they are loaded.
+
+License: GLP  
+Contact: broblesher@gmail.com  
+Dependencies: os, hashlib, tempfile, zipfile, numpy, numpy.typing
+"""
+# Import statements
+import os
+import hashlib
+import tempfile
+import zipfile
+import numpy as np
+import numpy.typing as npt
+
+
+class FuncionesCache:
+    """FuncionesCache class.
+
+    A class used to save the parsed qvalue, energy, scatInt and err of
+    the data files in .npz files, and to load them back. Each entry is
+    identified by the path, size and modification time of the data
+    files (and, optionally, by a hash of their content), so it is not
+    used any more if the files change. When the cache is bigger than
+    maxBytes, the least recently used entries are deleted.
+
+    Attributes
+    ----------
+    _cacheDir: str
+        the folder where the .npz files are saved
+    _maxBytes: int
+        the maximum size of the cache, in bytes
+    _useHash: bool
+        whether the content of the files is hashed in the key
+
+    Methods
+    -------
+    cache_key(fileNames, instrument)
+        Returns the key of the cache entry of some data files
+    cache_path(key)
+        Returns the path of the .npz file of a cache entry
+    load(fileNames, instrument)
+        Loads the parsed data of the files from the cache
+    save(fileNames, instrument, qvalue, energy, scatInt, err)
+        Saves the parsed data of the files in the cache
+    evict(keep)
+        Deletes the least recently used entries
+    """
+
+    def __init__(self, cacheDir: str | None = None,
+                 maxBytes: int = 500 * 1024 ** 2, useHash: bool = False):
+        """Class constructor.
+
+        Parameters
+        ----------
+        cacheDir: str | None
+            the folder where the .npz files are saved. By default,
+            ~/.cache/QENS_data_tools
+        maxBytes: int
+            the maximum size of the cache, in bytes. 500 MB by default
+        useHash: bool
+            whether the content of the files is hashed in the key. It is
+            safer, but the files have to be read to check the cache
+        """
+        if cacheDir is None:
+            cacheDir = os.path.join(os.path.expanduser('~'), '.cache',
+                                    'QENS_data_tools')
+        self._cacheDir = cacheDir
+        self._maxBytes = maxBytes
+        self._useHash = useHash
+
+    def cache_key(self, fileNames: list[str], instrument: str) -> str:
+        """Return the key of the cache entry of some data files.
+
+        Parameters
+        ----------
+        fileNames: list[str]
+            the data files, with path (several for LET)
+        instrument: str
+            name of the instrument where the data was recorded
+
+        Returns
+        -------
+        key: str
+            the hexadecimal digest of the path, size and modification
+            time of every file (and of its content, if _useHash)
+
+        Raises
+        ------
+        OSError
+            if one of the files does not exist
+
+        Other parameters
+        ----------------
+        digest: hashlib.blake2b
+            to calculate the key
+        stat: os.stat_result
+            the size and modification time of a file
+        chunk: bytes
+            a piece of the file, to hash its content
+        """
+        digest: hashlib.blake2b
+        digest = hashlib.blake2b(instrument.encode(), digest_size=20)
+        stat: os.stat_result
+        for fileName in sorted(os.path.abspath(f) for f in fileNames):
+            stat = os.stat(fileName)
+            digest.update(f'{fileName}|{stat.st_size}|{stat.st_mtime_ns}|'
+                          .encode())
+            if self._useHash:
+                with open(fileName, 'rb') as iFile:
+                    for chunk in iter(lambda: iFile.read(1024 ** 2), b''):
+                        digest.update(chunk)
+        return digest.hexdigest()
+
+    def cache_path(self, key: str) -> str:
+        """Return the path of the .npz file of a cache entry."""
+        return os.path.join(self._cacheDir, key + '.npz')
+
+    def load(self, fileNames: list[str], instrument: str) -> tuple | None:
+        """Load the parsed data of the files from the cache.
+
+        Parameters
+        ----------
+        fileNames: list[str]
+            the data files, with path
+        instrument: str
+            name of the instrument where the data was recorded
+
+        Returns
+        -------
+        None if the files are not in the cache, or a tuple with:
+        qvalue: list[float]
+        energy: list[npt.NDArray]
+        scatInt: list[npt.NDArray]
+        err: list[npt.NDArray]
+
+        Other parameters
+        ----------------
+        cacheFile: str
+            the .npz file of the entry
+        offsets: npt.NDArray
+            where the data of each Q starts in the flat arrays
+        """
+        if len(fileNames) == 0:
+            return None
+        cacheFile: str
+        try:
+            cacheFile = self.cache_path(self.cache_key(fileNames, instrument))
+            with np.load(cacheFile) as data:
+                offsets: npt.NDArray
+                offsets = data['offsets']
+                qvalue = data['qvalue'].tolist()
+                energy = np.split(data['energy'], offsets[1:-1])
+                scatInt = np.split(data['scatInt'], offsets[1:-1])
+                err = np.split(data['err'], offsets[1:-1])
+            # Actualizo la fecha para saber cuáles se han usado hace poco
+            os.utime(cacheFile)
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+            # No está en la caché, o el fichero está roto
+            return None
+        return qvalue, energy, scatInt, err
+
+    def save(self, fileNames: list[str], instrument: str,
+             qvalue: list[float], energy: list[npt.ArrayLike],
+             scatInt: list[npt.ArrayLike],
+             err: list[npt.ArrayLike]) -> bool:
+        """Save the parsed data of the files in the cache.
+
+        The ragged arrays of each Q are saved one after another in flat
+        arrays, with the offsets where each Q starts, in the dtype of
+        the first energy array (so float32 data is loaded back as
+        float32). The entry is not saved if it is bigger than
+        _maxBytes, and the other entries are deleted by evict only if
+        the cache becomes too big.
+
+        Parameters
+        ----------
+        fileNames: list[str]
+            the data files, with path
+        instrument: str
+            name of the instrument where the data was recorded
+        qvalue: list[float]
+            the array with the Q values
+        energy: list[npt.ArrayLike]
+            the array with the array of energies for each Q
+        scatInt: list[npt.ArrayLike]
+            the array with the arrays of intensities for each Q
+        err: list[npt.ArrayLike]
+            the array with the arrays of errors for each Q
+
+        Returns
+        -------
+        saved: bool
+            False if the entry could not be written or is too big
+
+        Other parameters
+        ----------------
+        offsets: npt.NDArray
+            where the data of each Q starts in the flat arrays
+        dtype: np.dtype
+            the dtype of the saved arrays
+        cacheFile: str
+            the .npz file of the entry
+        tmpName: str
+            the temporary file, renamed to cacheFile when complete
+        """
+        if len(fileNames) == 0:
+            return False
+        offsets: npt.NDArray
+        offsets = np.concatenate(
+            ([0], np.cumsum([len(e) for e in energy]))).astype(np.int64)
+        dtype: np.dtype
+        dtype = np.dtype(np.float64)
+        if len(energy) > 0:
+            dtype = np.asarray(energy[0]).dtype
+        cacheFile: str
+        tmpName: str | None
+        tmpName = None
+        try:
+            cacheFile = self.cache_path(self.cache_key(fileNames, instrument))
+            os.makedirs(self._cacheDir, exist_ok=True)
+            # Escribo en un fichero temporal y lo renombro, para que
+            # nunca haya un .npz a medio escribir
+            with tempfile.NamedTemporaryFile(
+                    dir=self._cacheDir, suffix='.tmp', delete=False) as oFile:
+                tmpName = oFile.name
+                np.savez(oFile, qvalue=np.asarray(qvalue, dtype=np.float64),
+                         offsets=offsets,
+                         energy=np.concatenate(
+                             [np.asarray(e, dtype=dtype)
+                              for e in energy] + [np.empty(0, dtype)]),
+                         scatInt=np.concatenate(
+                             [np.asarray(s, dtype=dtype)
+                              for s in scatInt] + [np.empty(0, dtype)]),
+                         err=np.concatenate(
+                             [np.asarray(e, dtype=dtype)
+                              for e in err] + [np.empty(0, dtype)]))
+            # Si no cabe en la caché, no lo guardo: evict borraría todas
+            # las demás entradas
+            if os.path.getsize(tmpName) > self._maxBytes:
+                os.remove(tmpName)
+                return False
+            os.replace(tmpName, cacheFile)
+        except OSError:
+            if tmpName is not None and os.path.exists(tmpName):
+                os.remove(tmpName)
+            return False
+        self.evict(keep=cacheFile)
+        return True
+
+    def evict(self, keep: str | None = None) -> int:
+        """Delete the least recently used entries.
+
+        Deletes the .npz files with the oldest modification time
+        (updated every time an entry is loaded) until the cache is not
+        bigger than _maxBytes.
+
+        Parameters
+        ----------
+        keep: str | None
+            a .npz file that is never deleted, e.g. the one just saved
+
+        Returns
+        -------
+        freed: int
+            the number of bytes deleted
+
+        Other parameters
+        ----------------
+        entries: list[tuple]
+            the (modification time, size, path) of the .npz files in
+            the cache, from the oldest to the newest
+        total: int
+            the size of the cache, in bytes
+        """
+        entries: list[tuple]
+        try:
+            with os.scandir(self._cacheDir) as it:
+                entries = sorted((e.stat().st_mtime_ns, e.stat().st_size,
+                                  e.path) for e in it
+                                 if e.name.endswith('.npz'))
+        except OSError:
+            return 0
+        total: int
+        total = sum(entry[1] for entry in entries)
+        freed: int
+        freed = 0
+        for mtime, size, path in entries:
+            if total - freed <= self._maxBytes:
+                break
+            if keep is not None and (os.path.abspath(path)
+                                     == os.path.abspath(keep)):
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            freed = freed + size
+        return freed
@@ -13,13 +13,54 @@ Description:
 
 License: GLP  
 Contact: broblesher@gmail.com  
-Dependencies: os, _io, pandas, matplotlip.pyplot, numpy, numpy.typing
+Dependencies: os, io, re, json, mmap, multiprocessing, _io,
+    collections.abc, concurrent.futures, pandas, matplotlip.pyplot, numpy,
+    numpy.typing, QENSData
 """
 # Import statements
 import os
+import io
+import re
+import json
+import mmap
+import multiprocessing
 import _io
+from collections.abc import Callable, Iterator
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import numpy as np
+import numpy.typing as npt
+from loadWindow.QENSData import QENSData
+
+# Expresiones regulares para encontrar las cabeceras de cada bloque de Q
+# (en bytes). Cada una guarda la Q en el grupo 'q' (o el intervalo de Q en
+# 'qmin' y 'qmax'). En IN5 no hay una cabecera fija: la Q está en las
+# líneas con 6 elementos.
+# [^\S\n] es cualquier espacio en blanco que no sea un salto de línea.
+Q_HEADER_PATTERNS: dict[str, re.Pattern] = {
+    # IN16B: # q(Angstrom^-1) = 0.5
+    "IN16B": re.compile(
+        rb'#[^\S\n]+q\(Angstrom\^-1\)[^\S\n]+\S+[^\S\n]+(?P<q>\S+)'),
+    # FOCUS: #Group Value: 0.5
+    "FOCUS": re.compile(rb'#Group[^\S\n]+Value:[^\S\n]+(?P<q>\S+)'),
+    # LET: # Integration over |Q|,0.4,0.6 (la Q es el punto medio)
+    "LET": re.compile(
+        rb'[^\S\n]Integration[^\S\n]+\S+[^\S\n]+[^,\s]*,(?P<qmin>[^,\s]+),'
+        rb'(?P<qmax>[^,\s]+)'),
+}
+# Número de ficheros de LET a partir del cual se leen en paralelo, y
+# número máximo de procesos para leerlos
+LET_SERIAL_FILES: int = 4
+LET_MAX_WORKERS: int = 8
+# Los ficheros más grandes que MMAP_MIN_BYTES se leen con mmap, por trozos
+# de MMAP_CHUNK_BYTES
+MMAP_MIN_BYTES: int = 64 * 1024 ** 2
+MMAP_CHUNK_BYTES: int = 8 * 1024 ** 2
+# Bytes del principio del fichero que se miran para reconocer su formato
+SNIFF_BYTES: int = 4096
+# Extensión de los ficheros de cada formato de exportación
+EXPORT_EXTENSIONS: dict[str, str] = {'csv': '.csv', 'parquet': '.parquet',
+                                     'hdf5': '.h5', 'npz': '.npz'}
 
 
 class FuncionesLeer:
@@ -28,6 +69,14 @@ class FuncionesLeer:
     A class used to colect the methos to read QENS data from text file,
     transform the data into a matrix, and write it to a csv file.
 
+    Attributes
+    ----------
+    progress: Callable[[int, int], None] | None
+        called by the long parsers with the work done and the total
+        work (the bytes read of a big file, or the LET files read), to
+        show the progress. It can raise an exception to stop the
+        parsing. None (default) to not report the progress
+
     Methods
     -------
     fileNameDropLET(iFileName)
@@ -44,23 +93,111 @@ class FuncionesLeer:
         Parses the IN16B data files
     leer_de_FOCUS(iFile:, qvalue,energy, scatInt, err)
         Parses the FOCUS data files
-    leer_de_LET(iFileName)
-        Parses the LET data files
-    read_from_ifile(iFile, instrument)
+    list_txt_files(path, useIndex)
+        Lists the .txt files in a folder, without subfolders
+    find_LET_files(iFileName, useIndex)
+        Finds the files of the same LET measurement
+    leer_fichero_LET(fileName, engine)
+        Parses one of the LET data files
+    leer_de_LET(iFileName, engine, maxWorkers, useIndex, dtype)
+        Parses the LET data files, in parallel if there are many
+    line_layout(buf)
+        Finds the limits and the number of elements of every line
+    data_lines(buf)
+        Finds the end of every line and whether it is a data line
+    lines_to_array(buf, starts, ends, lines)
+        Converts the selected data lines to an array in bulk
+    parse_q_blocks(buf, instrument)
+        Converts the data lines of a file, or a piece of it, in bulk
+    leer_con_numpy(iFile, instrument, dtype)
+        Parses the IN5, IN16B, FOCUS and LET data files with NumPy
+    stream_q_groups(iFile, instrument, chunkSize, dtype)
+        Yields the data of the file one Q group at a time
+    join_q_group(q, pieces, dtype)
+        Joins the pieces of the data of a Q group
+    leer_mmap(iFile, instrument, chunkSize, dtype)
+        Parses the data files in chunks, from a memory map of the file
+    cast_groups(energy, scatInt, err, dtype)
+        Converts the data of each Q group to arrays of a given type
+    register_parser(name, sniff, parse, last)
+        Adds a data format to the registry of parsers
+    sniff_header(head, instrument)
+        Checks if a file starts like the files with Q headers
+    sniff_IN5(head, instrument)
+        Checks if a file starts like the IN5 files
+    detect_instrument(fileName)
+        Finds the instrument of a data file from its first bytes
+    leer_tabla(iFile, instrument, engine, dtype)
+        Parses the IN5, IN16B and FOCUS data files
+    leer_LET_ifile(iFile, instrument, engine, dtype)
+        Parses the LET data files from one of the files already open
+    read_from_ifile(iFile, instrument, engine, dtype)
         Reads from input files and saves the data in lists
-    data_to_pandas_df(fileName, qvalue, energy, scatInt, err)
+    data_to_pandas_df(fileName, qvalue, energy, scatInt, err, engine, dtype)
         Saves S(Q, E) data in a pandas DataFrame.
-    chi_from_S(temp, qvalue, dfS)
+    bose_factor(energy, temp)
+        Calculates the factor to go from S(Q, E) to Chi(Q, E)
+    chi_from_S(temp, qvalue, dfS, engine)
         Calculates Chi(Q, E) from S(Q, E) at a given T
+    chi_blocks(energy, chi)
+        Orders the susceptibilities in the E-, Chi-, E+, Chi+ layout
+    chi_labels(dfS, nq)
+        Returns the column labels of the Chi(Q, E) DataFrame
+    chi_from_S_numpy(temp, qvalue, dfS)
+        Calculates Chi(Q, E) for all the Q groups at once
+    chi_from_data(temp, data)
+        Calculates Chi(Q, E) for all the Q groups of a QENSData
+    chi_from_S_batch(temps, qvalues, dfSs)
+        Calculates Chi(Q, E) of a series of datasets (e.g. a T scan)
     save_data_to_csv(oFileName, dfS)
         Saves the data in the S(Q, E) pandas.DataFrame to a csv file.
     save_chi_data_to_csv(oFileName, dfchiSorted)
         Saves the data in the Chi(Q, E) pandas.DataFrame to a csv file.
+    export_labels(df)
+        Returns unique column labels to export a DataFrame
+    import_labels(names)
+        Returns the original labels of the exported columns
+    save_data_to_parquet(oFileName, df, metadata, compression)
+        Saves a S(Q, E) or Chi(Q, E) DataFrame to a Parquet file
+    save_data_to_hdf5(oFileName, df, metadata, complevel)
+        Saves a S(Q, E) or Chi(Q, E) DataFrame to a HDF5 file
+    save_data_to_npz(oFileName, df, metadata)
+        Saves a S(Q, E) or Chi(Q, E) DataFrame to a NPZ file
+    export_format(fileName)
+        Returns the format of an exported file, from its extension
+    read_exported_header(fileName)
+        Reads the column labels of an exported file
+    read_exported(fileName, groups)
+        Reads the S(Q, E) data of some Q groups from an exported file
     """
 
+    # Índice de las carpetas con datos de LET, compartido por todas las
+    # instancias para reutilizarlo entre cargas: para cada carpeta guardo
+    # su fecha de modificación y sus ficheros .txt
+    _dirIndex: dict[str, tuple[int, list[str]]] = {}
+    # Registro de los formatos que se saben leer: para cada instrumento,
+    # la función que reconoce sus ficheros por sus primeros bytes
+    # ('sniff') y la que los lee ('parse'). Se prueban en el orden en que
+    # se registran, y al final los que tienen 'last' (ver register_parser
+    # al final del módulo)
+    _parsers: dict[str, dict] = {}
+
     def __init__(self):
         """Class constructor."""
         print('FuncionesLeer constructor')
+        self.progress: Callable[[int, int], None] | None
+        self.progress = None
+
+    def __getstate__(self) -> dict:
+        """Return the state to pickle, without the progress callback.
+
+        The instance is sent to the processes that parse the LET files,
+        and the callback (e.g. a method of a thread) cannot be pickled.
+        """
+        state: dict
+        state = self.__dict__.copy()
+        state['progress'] = None
+        return state
 
     def fileNameDropLET(self, iFileName: str) -> str:
         """Trim LET files names.
@@ -289,13 +426,97 @@ class FuncionesLeer:
                     err[numq - 1].append(float(elements[2]))
         return qvalue, energy, scatInt, err
 
-    def leer_de_LET(self, iFileName: str) -> tuple:
-        """Parse the LET data files.
+    def list_txt_files(self, path: str, useIndex: bool = True) -> list[str]:
+        """List the .txt files in a folder, without subfolders.
+
+        The folder is read with a single os.scandir pass. If useIndex
+        is True, the list is saved in the _dirIndex of the class and
+        reused while the modification time of the folder is the same.
+
+        Parameters
+        ----------
+        path: str
+            the folder
+        useIndex: bool
+            whether to use and update the cached index of the folder
+
+        Returns
+        -------
+        names: list[str]
+            the sorted names of the .txt files in the folder
+
+        Other parameters
+        ----------------
+        mtime: int
+            the modification time of the folder, in ns. It changes
+            when files are added or removed
+        entries: os.ScandirIterator
+            the entries of the folder
+        """
+        mtime: int
+        mtime = os.stat(path).st_mtime_ns
+        if useIndex and path in self._dirIndex and \
+                self._dirIndex[path][0] == mtime:
+            return self._dirIndex[path][1]
+        names: list[str]
+        with os.scandir(path) as entries:
+            names = sorted(e.name for e in entries
+                           if e.name.endswith('.txt') and e.is_file())
+        if useIndex:
+            self._dirIndex[path] = (mtime, names)
+        return names
+
+    def find_LET_files(self, iFileName: str,
+                       useIndex: bool = True) -> list[str]:
+        """Find the files of the same LET measurement.
+
+        They are the .txt files in the same folder (not in its
+        subfolders) whose name starts with the name given by
+        fileNameDropLET, followed by a parenthesis.
 
         Parameters
         ----------
         iFileName: str
-            the input filename, with path
+            one of the files of the measurement, with path
+        useIndex: bool
+            whether to use the cached index of the folder, see
+            list_txt_files
+
+        Returns
+        -------
+        files: list[str]
+            the files of the measurement, with path
+
+        Other parameters
+        ----------------
+        path: str
+            the path where the files are
+        pattern: re.Pattern
+            the compiled pattern of the names of the files
+        """
+        path: str
+        path = os.path.dirname(iFileName)
+        pattern: re.Pattern
+        pattern = re.compile(
+            re.escape(self.fileNameDropLET(iFileName)) + r'\(.*\.txt$')
+        files: list[str]
+        files = [os.path.join(path, f)
+                 for f in self.list_txt_files(path or '.', useIndex)
+                 if pattern.match(f)]
+        return files
+
+    def leer_fichero_LET(self, fileName: str,
+                         engine: str = 'numpy') -> tuple:
+        """Parse one of the LET data files.
+
+        Parameters
+        ----------
+        fileName: str
+            the LET data file, with path
+        engine: str
+            'numpy' (default) to parse the numeric lines in bulk,
+            'reference' to parse the file line by line, or 'mmap' to
+            parse them from a memory map of the file
 
         Returns
         -------
@@ -304,20 +525,10 @@ class FuncionesLeer:
         energy: list[list[float]]
         scatInt: list[list[float]]
         err: list[list[float]]
+        If the file can not be opened, the lists are empty.
 
         Other parameters
         ----------------
-        qvalue: list[float]
-            the array with the Q values
-        energy: list[list[float]]
-            the array with the arays of measured energies,
-            for earch Q
-        scatInt: list[list[float]]
-            the array with the arays of measured intensities,
-            for earch Q
-        err: list[list[float]]
-            the array with the arays of measured errors,
-            for earch Q
         line: str
             to read de file line by line
         elements: list[str]
@@ -332,17 +543,6 @@ class FuncionesLeer:
             the Q of the currently reading input file
         numq: int
             to Q iterator (contador de Q, para cambiar de Q)
-        filenames: list[str]
-            list with al the files in the folder
-        dirs: list[str]
-            list with the subdirectories in the folder
-        root: str
-            # me imagino que el path?
-        f: str
-        files: list[str]
-            the array where I save the file names that I want to read from
-        path: str
-            the path where the files are
         iFile: _io.TextIOWrapper
             the object with the input file open
         """
@@ -363,54 +563,170 @@ class FuncionesLeer:
         qcurr: float  # la Q corespondiente al fichero q está leyendo
         numq: int  # es el contador que voy a usar para cambiar de Q
         numq = 0  # Pongo el contador de Q a cero
-        # Lo primero que tengo que hacer es buscar los ficheros que me
-        # interesan en la carpeta
-        filenames: list[str]  # la lista de todos los archivos en la carpeta
-        dirs: list[str]  # la lista de subdirectorios en la carpeta
-        root: str  # me imagino que el path?
-        f: str
-        files: list[str]
-        files = []
-        path: str
-        path = os.path.dirname(iFileName)
-        fileName = self.fileNameDropLET(iFileName)
-        for (root, dirs, filenames) in os.walk(path):
-            for f in filenames:
-                if fileName in f and '.txt' in f:
-                    files.append(f)
 
         iFile: _io.TextIOWrapper
-        for f in files:
-            try:
-                iFile = self.open_iFile(path + '/' + f)
-            except IOError:  # as error:
-                pass
-                # pongo algo más? qué quiero que haga si no consigue
-                # abrir un fichero?
-            else:
-                for line in iFile.readlines():
-                    elements = line.split()  # Divido la línea en elementos
-                    if (len(elements) != 0):  # Si la línea leída no está vacía
-                        # Para LET la Q está en la línea que empieza así:
-                        if (elements[1] == "Integration"):
-                            qlist = elements[3].split(",")
-                            qmin = float(qlist[1])
-                            qmax = float(qlist[2])
-                            qcurr = qmin + (qmax - qmin) / 2
-                            # añado la Q a la lista correspondiente
-                            qvalue.append(qcurr)
-                            # añado una lista vacía a E, S(Q,E) y err
-                            energy.append([])
-                            scatInt.append([])
-                            err.append([])
-                            numq = numq + 1  # Sumo uno al contador de Q
-                        # Si hay elementos y no empiezan por #, son los datos
-                        if (elements[0] != "#"):
-                            # Añado los valores a la lista correspondiente
-                            energy[numq - 1].append(float(elements[0]))
-                            scatInt[numq - 1].append(float(elements[1]))
-                            err[numq - 1].append(float(elements[2]))
+        try:
+            iFile = self.open_iFile(fileName)
+        except IOError:  # as error:
+            pass
+            # pongo algo más? qué quiero que haga si no consigue
+            # abrir un fichero?
+        else:
+            if engine in ('numpy', 'mmap'):
+                if engine == 'numpy':
+                    qvalue, energy, scatInt, err = self.leer_con_numpy(
+                        iFile, "LET")
+                else:
+                    qvalue, energy, scatInt, err = self.leer_mmap(
+                        iFile, "LET")
                 self.close_iFile(iFile)
+                return qvalue, energy, scatInt, err
+            for line in iFile.readlines():
+                elements = line.split()  # Divido la línea en elementos
+                if (len(elements) != 0):  # Si la línea leída no está vacía
+                    # Para LET la Q está en la línea que empieza así:
+                    if (elements[1] == "Integration"):
+                        qlist = elements[3].split(",")
+                        qmin = float(qlist[1])
+                        qmax = float(qlist[2])
+                        qcurr = qmin + (qmax - qmin) / 2
+                        # añado la Q a la lista correspondiente
+                        qvalue.append(qcurr)
+                        # añado una lista vacía a E, S(Q,E) y err
+                        energy.append([])
+                        scatInt.append([])
+                        err.append([])
+                        numq = numq + 1  # Sumo uno al contador de Q
+                    # Si hay elementos y no empiezan por #, son los datos
+                    if (elements[0] != "#"):
+                        # Añado los valores a la lista correspondiente
+                        energy[numq - 1].append(float(elements[0]))
+                        scatInt[numq - 1].append(float(elements[1]))
+                        err[numq - 1].append(float(elements[2]))
+            self.close_iFile(iFile)
+        return qvalue, energy, scatInt, err
+
+    def leer_de_LET(self, iFileName: str, engine: str = 'numpy',
+                    maxWorkers: int | None = None,
+                    useIndex: bool = True,
+                    dtype: npt.DTypeLike | None = None) -> tuple:
+        """Parse the LET data files.
+
+        A LET measurement is split in several files, one per Q
+        interval. When there are more than LET_SERIAL_FILES files, they
+        are parsed concurrently in a pool of processes (started with
+        spawn, as this can be called from a thread), and the results
+        are merged in Q order. The progress is reported after each file
+        (see the progress attribute).
+
+        Parameters
+        ----------
+        iFileName: str
+            the input filename, with path
+        engine: str
+            'numpy' (default), 'reference' or 'mmap', see
+            leer_fichero_LET
+        maxWorkers: int | None
+            the maximum number of processes used to parse the files.
+            If None, it is the number of CPUs, up to LET_MAX_WORKERS.
+            If 1, the files are parsed one after another
+        useIndex: bool
+            whether to reuse the cached index of the folder, see
+            find_LET_files
+        dtype: npt.DTypeLike | None
+            the type of the returned arrays (e.g. np.float32 to save
+            memory), or None to keep the output of the parser
+
+        Returns
+        -------
+        A tuple with the values:
+        qvalue: list[float]
+        energy: list[list[float]]
+        scatInt: list[list[float]]
+        err: list[list[float]]
+
+        Other parameters
+        ----------------
+        qvalue: list[float]
+            the array with the Q values
+        energy: list[list[float]]
+            the array with the arays of measured energies,
+            for earch Q
+        scatInt: list[list[float]]
+            the array with the arays of measured intensities,
+            for earch Q
+        err: list[list[float]]
+            the array with the arays of measured errors,
+            for earch Q
+        files: list[str]
+            the array where I save the file names that I want to read from
+        results: list[tuple]
+            the (qvalue, energy, scatInt, err) tuple of each file
+        order: list[int]
+            the indexes that sort the Q values in ascending order
+
+        See Also
+        --------
+        find_LET_files
+        leer_fichero_LET
+        """
+        qvalue: list[float]
+        energy: list[list[float]]
+        scatInt: list[list[float]]
+        err: list[list[float]]
+        qvalue = []
+        energy = []
+        scatInt = []
+        err = []
+
+        # Lo primero que tengo que hacer es buscar los ficheros que me
+        # interesan en la carpeta
+        files: list[str]
+        files = self.find_LET_files(iFileName, useIndex)
+
+        if maxWorkers is None:
+            maxWorkers = min(os.cpu_count() or 1, LET_MAX_WORKERS)
+        results: list[tuple]
+        # Si hay pocos ficheros, no merece la pena arrancar los procesos
+        results = []
+        if len(files) <= LET_SERIAL_FILES or maxWorkers <= 1:
+            for f in files:
+                results.append(self.leer_fichero_LET(f, engine))
+                if self.progress is not None:
+                    self.progress(len(results), len(files))
+        else:
+            # Con spawn y no fork: hacer fork de un proceso con hilos
+            # (p.ej. si se llama desde el LoadWorker de Qt) no es seguro
+            with ProcessPoolExecutor(
+                    max_workers=min(maxWorkers, len(files)),
+                    mp_context=multiprocessing.get_context('spawn')) \
+                    as executor:
+                try:
+                    for result in executor.map(self.leer_fichero_LET, files,
+                                               [engine] * len(files)):
+                        results.append(result)
+                        if self.progress is not None:
+                            self.progress(len(results), len(files))
+                except BaseException:
+                    # Si se para (p.ej. desde progress), no leo el resto
+                    executor.shutdown(cancel_futures=True)
+                    raise
+
+        for result in results:
+            qvalue.extend(result[0])
+            energy.extend(result[1])
+            scatInt.extend(result[2])
+            err.extend(result[3])
+        # Ordeno todo por Q, porque los ficheros no vienen en orden
+        order: list[int]
+        order = sorted(range(len(qvalue)), key=qvalue.__getitem__)
+        qvalue = [qvalue[i] for i in order]
+        energy = [energy[i] for i in order]
+        scatInt = [scatInt[i] for i in order]
+        err = [err[i] for i in order]
+        if dtype is not None:
+            energy, scatInt, err = self.cast_groups(
+                energy, scatInt, err, dtype)
         return qvalue, energy, scatInt, err
 
     def leer_de_FOCUS(self, iFile: _io.TextIOWrapper, qvalue: list[float],
@@ -476,190 +792,971 @@ class FuncionesLeer:
                     err[numq - 1].append(float(elements[2]))
         return qvalue, energy, scatInt, err
 
-    def read_from_ifile(self, iFile: _io.TextIOWrapper,
-                        instrument: str) -> tuple:
-        """Read from input files and saves the data in lists.
+    def line_layout(self, buf: bytes) -> tuple:
+        """Find the limits and the number of elements of every line.
 
-        Calls a diferent parsing function depending on the input
-        instrument. **This fuction does not work with LET data.**
+        Works on the raw bytes of the file with vectorized NumPy
+        operations, without splitting the lines in Python.
 
         Parameters
         ----------
-        iFile: _io.TextIOWrapper
-            object with the open input file
-        instrument: str
-            name of the instrument where the data was recorded
+        buf: bytes
+            the complete content of the input file
 
         Returns
         -------
         A tuple with the values:
-        qvalue: list[float]
-        energy: list[list[float]]
-        scatInt: list[list[float]]
-        err: list[list[float]]
+        starts: npt.NDArray
+            the position in buf where each line starts
+        ends: npt.NDArray
+            the position in buf where each line ends (its '\\n')
+        nelem: npt.NDArray
+            the number of elements (separated by blanks) in each line
+        comment: npt.NDArray
+            True for the lines whose first element starts with '#'
 
         Other parameters
         ----------------
-        qvalue: list[float]
-            the array with the Q values
-        energy: list[list[float]]
-            the array with the arays of measured energies,
-            for earch Q
-        scatInt: list[list[float]]
-            the array with the arays of measured intensities,
-            for earch Q
-        err: list[list[float]]
-            the array with the arays of measured errors,
-            for earch Q
-
-        See Also
-        --------
-        leer_de_IN5
-        leer_de_IN16B
-        leer_de_FOCUS
+        b: npt.NDArray
+            the bytes of buf as an uint8 array, without copying them
+        blank: npt.NDArray
+            True for the blank characters (spaces, tabs, '\\r', '\\n')
+        elemStart: npt.NDArray
+            the positions in buf where an element starts
+        elemLine: npt.NDArray
+            the line of each element
+        first: npt.NDArray
+            True for the first element of each line
         """
-        qvalue: list[float]  # Para guardar los valores de Q
-        energy: list[list[float]]  # Para guardar la energía dispersada
-        scatInt: list[list[float]]  # Para guardar S(Q,E)
-        err: list[list[float]]  # Para guardar el error experimental en S(Q,E)
-
-        # Inicializo las variables a listas vacías
-        qvalue = []
-        energy = []
-        scatInt = []
-        err = []
-
-        match instrument:
-            case "IN5":
-                qvalue, energy, scatInt, err = self.leer_de_IN5(
-                    iFile, qvalue, energy, scatInt, err)
-            case "IN16B":
-                qvalue, energy, scatInt, err = self.leer_de_IN16B(
-                    iFile, qvalue, energy, scatInt, err)
-            case "FOCUS":
-                qvalue, energy, scatInt, err = self.leer_de_FOCUS(
-                    iFile, qvalue, energy, scatInt, err)
-
-        return qvalue, energy, scatInt, err
-
-    def data_to_pandas_df(self, fileName: str, qvalue: list[float],
-                          energy: list[list[float]],
-                          scatInt: list[list[float]],
-                          err: list[list[float]]) -> pd.DataFrame:
-        """Save S(Q, E) data in a pandas DataFrame.
+        b: npt.NDArray
+        b = np.frombuffer(buf, dtype=np.uint8)
+        ends: npt.NDArray
+        ends = np.flatnonzero(b == ord('\n'))
+        # Si el fichero no acaba en salto de línea, la última línea acaba
+        # en el final del fichero
+        if b.size != 0 and b[-1] != ord('\n'):
+            ends = np.append(ends, b.size)
+        starts: npt.NDArray
+        starts = np.concatenate(([0], ends[:-1] + 1))
+        # Un elemento empieza donde hay un caracter no blanco precedido de
+        # un blanco (o al principio del fichero)
+        blank: npt.NDArray
+        blank = b <= ord(' ')
+        elemStart: npt.NDArray
+        elemStart = np.flatnonzero(~blank[1:] & blank[:-1]) + 1
+        if b.size != 0 and not blank[0]:
+            elemStart = np.concatenate(([0], elemStart))
+        elemLine: npt.NDArray
+        elemLine = np.searchsorted(ends, elemStart)
+        nelem: npt.NDArray
+        nelem = np.bincount(elemLine, minlength=ends.size)
+        # Miro si el primer elemento de cada línea empieza por #
+        first: npt.NDArray
+        first = np.ones(elemLine.size, dtype=bool)
+        first[1:] = elemLine[1:] != elemLine[:-1]
+        comment: npt.NDArray
+        comment = np.zeros(ends.size, dtype=bool)
+        comment[elemLine[first]] = b[elemStart[first]] == ord('#')
+        return starts, ends, nelem, comment
+
+    def data_lines(self, buf: bytes) -> tuple:
+        """Find the end of every line and whether it is a data line.
+
+        A data line is a line that is not blank and does not start
+        with '#' (after the blanks), the same lines that np.loadtxt
+        reads. Only the first characters of each line are looked at,
+        with vectorized NumPy operations.
 
         Parameters
         ----------
-        fileName: str
-            the name to the input file, to asing it to the
-            intensity column
-        qvalue: list[float]
-            the array with the Q values
-        energy: list[list[float]]
-            the array with the array of energies for each Q
-        scatInt: list[list[float]]
-            the array with the arrays of intensities for each Q
-        err: list[list[float]])
-            the array with the arrays of errors in the intensity,
-            for each Q
+        buf: bytes
+            the complete content of the input file
 
         Returns
         -------
-        dfS: pd.DataFrame
-            DataFrame to save S(Q, E)
+        A tuple with the values:
+        ends: npt.NDArray
+            the position in buf where each line ends (its '\\n')
+        isData: npt.NDArray
+            True for the data lines
 
         Other parameters
         ----------------
-        energyS: pd.Series
-            a series to save the energy array for a Q, to concatenate
-            to dfS
-        scatIntS: pd.Series
-            a series to save the scattered intensity array for a Q,
-            to concatenate to dfS
-        errS: pd.Series
-            a series to save the measured error array for a Q, to
-            concatenate to dfS
-        i: int
-            iterator
-        q: float
-            iterator, to go over qvalue
-        scatIntLabel: str
-            to write the intensity column label
-        qstr: str
-            to write the intensity column label
-
-        See Also
-        --------
-        pandas.DataFrame.concat
-        pandas.Series.replace
+        b: npt.NDArray
+            the bytes of buf as an uint8 array, without copying them
+        pos: npt.NDArray
+            the position of the first character of each line that is
+            not blank (its end if the line is blank)
+        active: npt.NDArray
+            the lines whose pos is still a blank character
         """
-        dfS: pd.DataFrame
-        dfS = pd.DataFrame()
-        # declaro estas series porque para que las columnas tengan el
-        # mismo nombre tengo que usar concat
-        energyS: pd.Series
-        scatIntS: pd.Series
-        errS: pd.Series
-
-        i: int
-        q: float
-        scatIntLabel: str
-        qstr: str
+        b: npt.NDArray
+        b = np.frombuffer(buf, dtype=np.uint8)
+        ends: npt.NDArray
+        ends = np.flatnonzero(b == ord('\n'))
+        # Si el fichero no acaba en salto de línea, la última línea acaba
+        # en el final del fichero
+        if b.size != 0 and b[-1] != ord('\n'):
+            ends = np.append(ends, b.size)
+        pos: npt.NDArray
+        pos = np.concatenate(([0], ends[:-1] + 1))
+        # Avanzo a la vez en todas las líneas que empiezan por blancos,
+        # hasta el primer caracter que no lo es (son pocas vueltas)
+        active: npt.NDArray
+        active = np.flatnonzero(pos < ends)
+        while active.size != 0:
+            active = active[b[pos[active]] <= ord(' ')]
+            pos[active] += 1
+            active = active[pos[active] < ends[active]]
+        isData: npt.NDArray
+        isData = pos < ends
+        isData[isData] = b[pos[isData]] != ord('#')
+        return ends, isData
+
+    def lines_to_array(self, buf: bytes, starts: npt.NDArray,
+                       ends: npt.NDArray, lines: npt.NDArray) -> npt.NDArray:
+        """Convert the selected data lines to an array in bulk.
+
+        The selected lines are gathered in runs of consecutive lines
+        and converted to floats with a single np.loadtxt call, that
+        takes the first 3 elements of each line. Used for IN5, whose
+        files have other lines between the data lines.
 
-        for i, q in enumerate(qvalue):
-            energyS = pd.Series(energy[i], name="E (meV)")
-            # redondeo el valor de Q a 2 decimales
-            qstr = "_" + str(round(qvalue[i], 2)) + "A-1"
-            scatIntLabel = os.path.basename(fileName)[:-4] + qstr
-            scatIntS = pd.Series(scatInt[i], name=scatIntLabel)
-            errS = pd.Series(err[i], name="err")
-            # En IN5 a veces hay valores del error < 0. Los convierto a 0
-            errS = errS.replace(-1, 0)
-            dfS = pd.concat([dfS, energyS, scatIntS, errS], axis=1, names=[
-                            energyS.name, scatIntS.name, errS.name])
+        Parameters
+        ----------
+        buf: bytes
+            the complete content of the input file
+        starts: npt.NDArray
+            the position in buf where each line starts
+        ends: npt.NDArray
+            the position in buf where each line ends
+        lines: npt.NDArray
+            the indexes of the lines to convert, in ascending order
 
-        return dfS
+        Returns
+        -------
+        data: npt.NDArray
+            the (n, 3) array with the E, S(Q, E) and err columns
 
-    def chi_from_S(self, temp: float, qvalue: list[float],
-                   dfS: pd.DataFrame) -> pd.DataFrame:
-        """Calculate the susceptibility.
+        Raises
+        ------
+        ValueError
+            if a line has less than 3 elements or one of them is not a
+            number
 
-        Calculate the corresponding susceptibility of a given
-        scattered intensity S(Q, E) pandas.DataFrame. For each
-        Q value it saves E+, Chi+, E-, Chi-
+        Other parameters
+        ----------------
+        breaks: npt.NDArray
+            the positions in lines where a run of consecutive lines ends
+        runFirst: npt.NDArray
+            the first line of each run
+        runLast: npt.NDArray
+            the last line of each run
+        """
+        if lines.size == 0:
+            return np.empty((0, 3))
+        breaks: npt.NDArray
+        breaks = np.flatnonzero(np.diff(lines) != 1)
+        runFirst: npt.NDArray
+        runLast: npt.NDArray
+        runFirst = lines[np.concatenate(([0], breaks + 1))]
+        runLast = lines[np.concatenate((breaks, [lines.size - 1]))]
+        # Junto los trozos del fichero con líneas de datos, incluido su
+        # salto de línea para que no se junten las líneas
+        return np.loadtxt(io.BytesIO(b''.join(
+            [bytes(buf[starts[i]:ends[j]]) + b'\n'
+             for i, j in zip(runFirst, runLast)])),
+            usecols=(0, 1, 2), ndmin=2)
+
+    def parse_q_blocks(self, buf: bytes, instrument: str) -> tuple:
+        """Convert the data lines of a file, or a piece of it, in bulk.
+
+        For IN16B, FOCUS and LET, the headers of the Q blocks are found
+        with a regular expression, all the data lines are converted with
+        a single np.loadtxt call (in C), and the number of data lines of
+        each block is counted from the lines where the headers are. For
+        IN5, whose Q headers are the lines with 6 elements, the lines
+        with 3 elements are converted (see lines_to_array).
 
         Parameters
         ----------
-        temp: float
-            the temperature at which the data was recorded
-        qvalue: list[float]
-            the array with the Q values
-        dfS: pd.DataFrame
-            the pandas.DataFrame with S(Q, E)
+        buf: bytes
+            the content of the input file, or a piece of it that ends at
+            the end of a line
+        instrument: str
+            name of the instrument where the data was recorded
 
         Returns
         -------
-        dfchiSorted: pandas.DataFrame
+        A tuple with the values:
+        qvalue: list[float]
+            the Q value of each block
+        counts: npt.NDArray
+            the number of rows of data before the first header (first
+            element) and in each block
+        data: npt.NDArray
+            the (n, 3) array with the E, S(Q, E) and err of all the rows
+
+        Raises
+        ------
+        ValueError
+            if a data line has less than 3 elements or one of them is
+            not a number
 
         Other parameters
         ----------------
-        energyM: pd.Series
-            to save the energies E < 0
-        energyP: pd.Series
-            to save the energies E > 0
-        chiSM: pd.Series
-            to save the calculated susceptibilities for E<0
-        chiSP: pd.Series
-            to save the calculated susceptibilities for E>0
-        kb: float  # Boltzmann constant: 8.617333262 x 10-5 eV K-1
-        factSusS: pd.Series
-            to save the factor
-        dfchiM: pd.DataFrame
-            to save (E, Chi) for E<0, because once taken the absolute
+        headerLines: npt.NDArray
+            the indexes of the header lines
+        dataLines: npt.NDArray
+            the indexes of the data lines
+        dataBlock: npt.NDArray
+            the index of the Q block of each data line, plus 1 (0 for
+            the data lines above the first header)
+        header: re.Match
+            a match of the header regular expression
+        qmin: float
+            the minimum Q of the Q interval, in the LET headers
+        qmax: float
+            the maximum Q of the Q interval, in the LET headers
+        """
+        qvalue: list[float]
+        qvalue = []
+        headerLines: npt.NDArray
+        dataLines: npt.NDArray
+        data: npt.NDArray
+        if instrument == "IN5":
+            # Para IN5, si son 6 elementos, el primero es la Q, y si
+            # son 3, son E, S(Q, E) y err
+            starts, ends, nelem, _ = self.line_layout(buf)
+            headerLines = np.flatnonzero(nelem == 6)
+            for i in headerLines:
+                qvalue.append(float(bytes(buf[starts[i]:ends[i]]).split()[0]))
+            dataLines = np.flatnonzero(nelem == 3)
+            data = self.lines_to_array(buf, starts, ends, dataLines)
+        else:
+            ends: npt.NDArray
+            isData: npt.NDArray
+            ends, isData = self.data_lines(buf)
+            headerPos: list[int]
+            headerPos = []
+            header: re.Match
+            for header in Q_HEADER_PATTERNS[instrument].finditer(buf):
+                headerPos.append(header.start())
+                if 'q' in header.groupdict():
+                    qvalue.append(float(header.group('q')))
+                else:
+                    qmin = float(header.group('qmin'))
+                    qmax = float(header.group('qmax'))
+                    qvalue.append(qmin + (qmax - qmin) / 2)
+            headerLines = np.searchsorted(ends, headerPos).astype(np.intp)
+            dataLines = np.flatnonzero(isData)
+            data = np.empty((0, 3))
+            if dataLines.size != 0:
+                # np.loadtxt se salta las líneas en blanco y las que
+                # empiezan por #, así que lee justo las líneas de datos
+                data = np.loadtxt(io.BytesIO(buf), comments='#',
+                                  usecols=(0, 1, 2), ndmin=2)
+            if data.shape[0] != dataLines.size:
+                raise ValueError('The data lines could not be found')
+        # A cada línea de datos le toca el bloque de la última cabecera
+        # anterior (0 para las que están antes de la primera cabecera)
+        dataBlock: npt.NDArray
+        dataBlock = np.searchsorted(headerLines, dataLines, side='right')
+        if instrument == "IN5":
+            # hay una linea chunga que no sé que es y empieza por 0
+            # la descarto
+            dataBlock = dataBlock[data[:, 0] != 0]
+            data = data[data[:, 0] != 0]
+        return qvalue, np.bincount(dataBlock, minlength=len(qvalue) + 1), \
+            data
+
+    def leer_con_numpy(self, iFile: _io.TextIOWrapper, instrument: str,
+                       dtype: npt.DTypeLike | None = None) -> tuple:
+        """Parse the IN5, IN16B, FOCUS and LET data files with NumPy.
+
+        Vectorized alternative to leer_de_IN5, leer_de_IN16B,
+        leer_de_FOCUS and the line-by-line leer_fichero_LET. The file
+        is read at once, all the numeric lines are converted in bulk
+        and split in Q blocks with the number of lines of each block
+        (see parse_q_blocks), instead of converting the values line by
+        line. Files bigger than MMAP_MIN_BYTES are read with leer_mmap.
+
+        Parameters
+        ----------
+        iFile: _io.TextIOWrapper
+            the object with the input file open
+        instrument: str
+            name of the instrument where the data was recorded
+        dtype: npt.DTypeLike | None
+            the type of the returned arrays (e.g. np.float32 to save
+            memory), or None to keep float64
+
+        Returns
+        -------
+        A tuple with the values:
+        qvalue: list[float]
+        energy: list[npt.NDArray]
+        scatInt: list[npt.NDArray]
+        err: list[npt.NDArray]
+
+        Raises
+        ------
+        ValueError
+            if a data line has less than 3 elements or one of them is
+            not a number
+
+        Other parameters
+        ----------------
+        buf: bytes
+            the complete content of the input file
+        counts: npt.NDArray
+            the number of rows before the first header and in each block
+        data: npt.NDArray
+            the (n, 3) array with the E, S(Q, E) and err of all the Q
+        blocks: list[npt.NDArray]
+            data, split in Q blocks
+
+        See Also
+        --------
+        parse_q_blocks
+        leer_mmap
+        """
+        # Los ficheros grandes los leo por trozos con mmap
+        if os.fstat(iFile.fileno()).st_size > MMAP_MIN_BYTES:
+            return self.leer_mmap(iFile, instrument, dtype=dtype)
+        buf: bytes
+        buf = iFile.buffer.read()
+        qvalue: list[float]
+        counts: npt.NDArray
+        data: npt.NDArray
+        qvalue, counts, data = self.parse_q_blocks(buf, instrument)
+        # Las líneas antes de la primera cabecera no valen
+        blocks: list[npt.NDArray]
+        blocks = np.split(data, np.cumsum(counts)[:-1])[1:]
+        energy: list[npt.NDArray]
+        scatInt: list[npt.NDArray]
+        err: list[npt.NDArray]
+        energy = [block[:, 0] for block in blocks]
+        scatInt = [block[:, 1] for block in blocks]
+        err = [block[:, 2] for block in blocks]
+        if dtype is not None:
+            energy, scatInt, err = self.cast_groups(
+                energy, scatInt, err, dtype)
+        return qvalue, energy, scatInt, err
+
+    def stream_q_groups(self, iFile: _io.TextIOWrapper, instrument: str,
+                        chunkSize: int = MMAP_CHUNK_BYTES,
+                        dtype: npt.DTypeLike | None = None
+                        ) -> Iterator[tuple]:
+        """Yield the data of the file one Q group at a time.
+
+        The file is mapped with mmap and processed in chunks of about
+        chunkSize bytes (ending at a line end). The headers are found
+        directly in the mapped bytes and only the numeric lines are
+        converted. Each Q group is yielded as soon as the header of the
+        next one is found, so the file does not need to fit in memory.
+        The progress is reported after each chunk (see the progress
+        attribute).
+
+        Parameters
+        ----------
+        iFile: _io.TextIOWrapper
+            the object with the input file open
+        instrument: str
+            name of the instrument where the data was recorded
+        chunkSize: int
+            the approximate size of the chunks, in bytes
+        dtype: npt.DTypeLike | None
+            the type of the yielded arrays (e.g. np.float32 to save
+            memory), or None to keep float64
+
+        Yields
+        ------
+        A tuple with the values:
+        q: float
+        energy: npt.NDArray
+        scatInt: npt.NDArray
+        err: npt.NDArray
+
+        Other parameters
+        ----------------
+        mm: mmap.mmap
+            the memory map of the file
+        qPending: float | None
+            the Q of the last block found, that can continue in the
+            next chunk
+        piecesPending: list[npt.NDArray]
+            the (n, 3) pieces of the data of that Q
+        pos: int
+            the position in the file where the current chunk starts
+        end: int
+            the position in the file where the current chunk ends
+        chunk: memoryview
+            the bytes of the current chunk, without copying them
+        chunkQ: list[float]
+            the Q values of the blocks that start in the current chunk
+        counts: npt.NDArray
+            the number of rows before the first header of the chunk and
+            in each block
+        data: npt.NDArray
+            the (n, 3) data of the current chunk
+        parts: list[npt.NDArray]
+            data split in Q blocks. The first one is the continuation
+            of the pending block
+        """
+        if os.fstat(iFile.fileno()).st_size == 0:
+            return
+        qPending: float | None
+        qPending = None
+        piecesPending: list[npt.NDArray]
+        piecesPending = []
+        mm: mmap.mmap
+        with mmap.mmap(iFile.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos: int
+            end: int
+            chunk: memoryview
+            chunkQ: list[float]
+            counts: npt.NDArray
+            data: npt.NDArray
+            parts: list[npt.NDArray]
+            pos = 0
+            while pos < len(mm):
+                # El trozo acaba al final de una línea
+                end = mm.find(b'\n', min(pos + chunkSize, len(mm)) - 1) + 1
+                if end == 0:
+                    end = len(mm)
+                chunk = memoryview(mm)[pos:end]
+                try:
+                    chunkQ, counts, data = self.parse_q_blocks(chunk,
+                                                               instrument)
+                finally:
+                    # Si no, mmap no se puede cerrar y el error que sale
+                    # es un BufferError en vez del del trozo
+                    chunk.release()
+                # Las líneas antes de la primera cabecera del trozo son
+                # del bloque que venía del trozo anterior
+                parts = np.split(data, np.cumsum(counts)[:-1])
+                piecesPending.append(parts[0])
+                for q, part in zip(chunkQ, parts[1:]):
+                    # Al empezar un bloque nuevo, el anterior está completo
+                    if qPending is not None:
+                        yield self.join_q_group(qPending, piecesPending,
+                                                dtype)
+                    qPending = q
+                    piecesPending = [part]
+                del data, parts
+                # Libero las páginas del trozo ya leído, para que no
+                # cuenten en la memoria del proceso
+                if hasattr(mmap, 'MADV_DONTNEED'):
+                    mm.madvise(mmap.MADV_DONTNEED,
+                               pos - pos % mmap.PAGESIZE,
+                               end - pos + pos % mmap.PAGESIZE)
+                pos = end
+                if self.progress is not None:
+                    self.progress(pos, len(mm))
+        if qPending is not None:
+            yield self.join_q_group(qPending, piecesPending, dtype)
+
+    def join_q_group(self, q: float, pieces: list[npt.NDArray],
+                     dtype: npt.DTypeLike | None = None) -> tuple:
+        """Join the pieces of the data of a Q group.
+
+        Parameters
+        ----------
+        q: float
+            the Q value of the group
+        pieces: list[npt.NDArray]
+            the (n, 3) pieces of the E, S(Q, E) and err data of the group
+        dtype: npt.DTypeLike | None
+            the type of the returned arrays, or None to keep float64
+
+        Returns
+        -------
+        A tuple with the values:
+        q: float
+        energy: npt.NDArray
+        scatInt: npt.NDArray
+        err: npt.NDArray
+        """
+        data: npt.NDArray
+        if len(pieces) == 1:
+            data = pieces[0]
+        else:
+            data = np.concatenate(pieces + [np.empty((0, 3))])
+        if dtype is not None:
+            # Cada columna en su propio array contiguo del tipo pedido
+            return (q, data[:, 0].astype(dtype), data[:, 1].astype(dtype),
+                    data[:, 2].astype(dtype))
+        return q, data[:, 0], data[:, 1], data[:, 2]
+
+    def leer_mmap(self, iFile: _io.TextIOWrapper, instrument: str,
+                  chunkSize: int = MMAP_CHUNK_BYTES,
+                  dtype: npt.DTypeLike | None = None) -> tuple:
+        """Parse the data files in chunks, from a memory map of the file.
+
+        Same result as leer_con_numpy, but the file is not read into
+        memory, see stream_q_groups. The peak memory is close to the
+        size of the final arrays plus the temporary arrays of one chunk.
+
+        Parameters
+        ----------
+        iFile: _io.TextIOWrapper
+            the object with the input file open
+        instrument: str
+            name of the instrument where the data was recorded
+        chunkSize: int
+            the approximate size of the chunks, in bytes
+        dtype: npt.DTypeLike | None
+            the type of the returned arrays (e.g. np.float32 to save
+            memory), or None to keep float64
+
+        Returns
+        -------
+        A tuple with the values:
+        qvalue: list[float]
+        energy: list[npt.NDArray]
+        scatInt: list[npt.NDArray]
+        err: list[npt.NDArray]
+
+        Other parameters
+        ----------------
+        group: tuple
+            the q, energy, scatInt and err of one Q group
+        """
+        qvalue: list[float]
+        energy: list[npt.NDArray]
+        scatInt: list[npt.NDArray]
+        err: list[npt.NDArray]
+        qvalue = []
+        energy = []
+        scatInt = []
+        err = []
+        group: tuple
+        for group in self.stream_q_groups(iFile, instrument, chunkSize,
+                                          dtype):
+            qvalue.append(group[0])
+            energy.append(group[1])
+            scatInt.append(group[2])
+            err.append(group[3])
+        return qvalue, energy, scatInt, err
+
+    def cast_groups(self, energy: list, scatInt: list, err: list,
+                    dtype: npt.DTypeLike) -> tuple:
+        """Convert the data of each Q group to arrays of a given type.
+
+        Parameters
+        ----------
+        energy: list
+            the energies of each Q group
+        scatInt: list
+            the intensities of each Q group
+        err: list
+            the errors of each Q group
+        dtype: npt.DTypeLike
+            the type of the arrays, e.g. np.float32
+
+        Returns
+        -------
+        A tuple with the values:
+        energy: list[npt.NDArray]
+        scatInt: list[npt.NDArray]
+        err: list[npt.NDArray]
+        """
+        return tuple([np.array(group, dtype=dtype) for group in values]
+                     for values in (energy, scatInt, err))
+
+    @classmethod
+    def register_parser(cls, name: str, sniff: Callable,
+                        parse: Callable, last: bool = False) -> None:
+        """Add a data format to the registry of parsers.
+
+        New formats can be read (and detected) by registering them,
+        without changing read_from_ifile.
+
+        Parameters
+        ----------
+        name: str
+            the name of the instrument (or format)
+        sniff: Callable
+            function(funcionesLeer, head, name) -> bool, that says if a
+            file whose first bytes are head has this format. It should
+            only look at head, to be cheap
+        parse: Callable
+            function(funcionesLeer, iFile, name, engine, dtype) -> tuple,
+            that reads the open file and returns qvalue, energy, scatInt,
+            err (with arrays of type dtype, if it is not None)
+        last: bool
+            whether the format is only detected if no other format
+            matches, for the formats without headers that could match
+            the files of other formats (e.g. IN5)
+        """
+        cls._parsers[name] = {"sniff": sniff, "parse": parse, "last": last}
+
+    def sniff_header(self, head: bytes, instrument: str) -> bool:
+        """Check if a file starts like the files with Q headers.
+
+        Valid for the instruments with a header line before each Q
+        block (IN16B, FOCUS and LET).
+
+        Parameters
+        ----------
+        head: bytes
+            the first bytes of the file
+        instrument: str
+            the name of the instrument
+
+        Returns
+        -------
+        True if there is a Q header of the instrument in head
+        """
+        return Q_HEADER_PATTERNS[instrument].search(head) is not None
+
+    def sniff_IN5(self, head: bytes, instrument: str) -> bool:
+        """Check if a file starts like the IN5 files.
+
+        The IN5 files have no comments, a line with 6 elements (that
+        starts with the Q) before each block, and data lines with 3
+        elements.
+
+        Parameters
+        ----------
+        head: bytes
+            the first bytes of the file
+        instrument: str
+            the name of the instrument
+
+        Returns
+        -------
+        True if head looks like the beginning of an IN5 file
+        """
+        nelem: npt.NDArray
+        comment: npt.NDArray
+        _, _, nelem, comment = self.line_layout(head)
+        return bool(not comment.any() and (nelem == 6).any()
+                    and (nelem == 3).any())
+
+    def detect_instrument(self, fileName: str) -> str | None:
+        """Find the instrument of a data file from its first bytes.
+
+        Only the first SNIFF_BYTES of the file are read. The formats are
+        tried in the order they were registered, and those registered
+        with last=True after all the others.
+
+        Parameters
+        ----------
+        fileName: str
+            the data file, with path included
+
+        Returns
+        -------
+        The name of the instrument, or None if the format is unknown
+
+        Other parameters
+        ----------------
+        head: bytes
+            the first bytes of the file, cut at the last complete line
+        """
+        head: bytes
+        with open(fileName, "rb") as f:
+            head = f.read(SNIFF_BYTES)
+        # Quito la última línea si está cortada
+        if len(head) == SNIFF_BYTES and b'\n' in head:
+            head = head[:head.rindex(b'\n') + 1]
+
+        name: str
+        # sorted es estable: los "last" van al final, en su orden
+        for name, parser in sorted(self._parsers.items(),
+                                   key=lambda item: item[1]["last"]):
+            if parser["sniff"](self, head, name):
+                return name
+        return None
+
+    def leer_tabla(self, iFile: _io.TextIOWrapper, instrument: str,
+                   engine: str = 'numpy',
+                   dtype: npt.DTypeLike | None = None) -> tuple:
+        """Parse the IN5, IN16B and FOCUS data files.
+
+        Parameters
+        ----------
+        iFile: _io.TextIOWrapper
+            object with the open input file
+        instrument: str
+            name of the instrument where the data was recorded
+        engine: str
+            'numpy', 'reference' or 'mmap' (see read_from_ifile)
+        dtype: npt.DTypeLike | None
+            the type of the returned arrays (e.g. np.float32 to save
+            memory), or None to keep the output of
+            the parser
+
+        Returns
+        -------
+        A tuple with the values:
+        qvalue: list[float]
+        energy: list[list[float]]
+        scatInt: list[list[float]]
+        err: list[list[float]]
+        """
+        if engine == 'numpy':
+            return self.leer_con_numpy(iFile, instrument, dtype)
+        if engine == 'mmap':
+            return self.leer_mmap(iFile, instrument, dtype=dtype)
+
+        result: tuple
+        match instrument:
+            case "IN5":
+                result = self.leer_de_IN5(iFile, [], [], [], [])
+            case "IN16B":
+                result = self.leer_de_IN16B(iFile, [], [], [], [])
+            case "FOCUS":
+                result = self.leer_de_FOCUS(iFile, [], [], [], [])
+            case _:
+                return [], [], [], []
+        if dtype is not None:
+            return (result[0], *self.cast_groups(*result[1:], dtype))
+        return result
+
+    def leer_LET_ifile(self, iFile: _io.TextIOWrapper, instrument: str,
+                       engine: str = 'numpy',
+                       dtype: npt.DTypeLike | None = None) -> tuple:
+        """Parse the LET data files from one of the files already open.
+
+        LET saves each Q in its own file, so all the files of the
+        measurement are read (see leer_de_LET).
+
+        Parameters
+        ----------
+        iFile: _io.TextIOWrapper
+            object with one of the LET files open
+        instrument: str
+            name of the instrument ('LET')
+        engine: str
+            'numpy', 'reference' or 'mmap' (see leer_de_LET)
+        dtype: npt.DTypeLike | None
+            the type of the returned arrays (e.g. np.float32 to save
+            memory), or None to keep the output of
+            the parser
+
+        Returns
+        -------
+        A tuple with the values:
+        qvalue: list[float]
+        energy: list[list[float]]
+        scatInt: list[list[float]]
+        err: list[list[float]]
+        """
+        return self.leer_de_LET(iFile.name, engine, dtype=dtype)
+
+    def read_from_ifile(self, iFile: _io.TextIOWrapper,
+                        instrument: str = 'auto',
+                        engine: str = 'numpy',
+                        dtype: npt.DTypeLike | None = None) -> tuple:
+        """Read from input files and saves the data in lists.
+
+        Calls the parser registered for the input instrument. With
+        instrument='auto' the instrument is found from the first bytes
+        of the file (see detect_instrument).
+
+        Parameters
+        ----------
+        iFile: _io.TextIOWrapper
+            object with the open input file
+        instrument: str
+            name of the instrument where the data was recorded, or
+            'auto' (default) to detect it
+        engine: str
+            'numpy' (default) to convert all the numeric lines with a
+            single np.loadtxt call, about twice as fast as the
+            line-by-line parsers (see benchmarks/bench_loading.py),
+            'reference' to use the line-by-line parsers, or 'mmap' to
+            parse them in chunks from a memory map of the file, for
+            files bigger than the memory
+        dtype: npt.DTypeLike | None
+            the type of the returned arrays, e.g. np.float32 to halve
+            the memory of big datasets, or None (default) to keep the
+            output of the parser
+
+        Returns
+        -------
+        A tuple with the values:
+        qvalue: list[float]
+        energy: list[list[float]]
+        scatInt: list[list[float]]
+        err: list[list[float]]
+
+        Raises
+        ------
+        ValueError
+            if instrument is 'auto' and the format is not recognized
+
+        See Also
+        --------
+        register_parser
+        detect_instrument
+        leer_tabla
+        leer_LET_ifile
+        """
+        if instrument == 'auto':
+            detected: str | None
+            detected = self.detect_instrument(iFile.name)
+            if detected is None:
+                raise ValueError('Unknown data format: ' + iFile.name)
+            instrument = detected
+
+        # Si el instrumento no está registrado devuelvo listas vacías
+        if instrument not in self._parsers:
+            return [], [], [], []
+        return self._parsers[instrument]["parse"](
+            self, iFile, instrument, engine, dtype)
+
+    def data_to_pandas_df(self, fileName: str, qvalue: list[float],
+                          energy: list[list[float]],
+                          scatInt: list[list[float]],
+                          err: list[list[float]],
+                          engine: str = 'numpy',
+                          dtype: npt.DTypeLike = np.float64) -> pd.DataFrame:
+        """Save S(Q, E) data in a pandas DataFrame.
+
+        The DataFrame has three columns (E, S(Q, E), err) for each Q,
+        padded with NaN at the end of the shorter Q groups.
+
+        Parameters
+        ----------
+        fileName: str
+            the name to the input file, to asing it to the
+            intensity column
+        qvalue: list[float]
+            the array with the Q values
+        energy: list[list[float]]
+            the array with the array of energies for each Q
+        scatInt: list[list[float]]
+            the array with the arrays of intensities for each Q
+        err: list[list[float]])
+            the array with the arrays of errors in the intensity,
+            for each Q
+        engine: str
+            'numpy' (default) to build the DataFrame in one step from a
+            QENSData, or 'reference' to concatenate the columns of each
+            Q one after another
+        dtype: npt.DTypeLike
+            the type of the values in the DataFrame: np.float64
+            (default), or np.float32 to halve its memory
+
+        Returns
+        -------
+        dfS: pd.DataFrame
+            DataFrame to save S(Q, E)
+
+        Other parameters
+        ----------------
+        energyS: pd.Series
+            a series to save the energy array for a Q, to concatenate
+            to dfS
+        scatIntS: pd.Series
+            a series to save the scattered intensity array for a Q,
+            to concatenate to dfS
+        errS: pd.Series
+            a series to save the measured error array for a Q, to
+            concatenate to dfS
+        i: int
+            iterator
+        q: float
+            iterator, to go over qvalue
+        scatIntLabel: str
+            to write the intensity column label
+        qstr: str
+            to write the intensity column label
+
+        See Also
+        --------
+        QENSData.to_dataframe
+        pandas.DataFrame.concat
+        pandas.Series.replace
+        """
+        dfS: pd.DataFrame
+        i: int
+        q: float
+        scatIntLabel: str
+        qstr: str
+
+        if engine == 'numpy':
+            return QENSData.from_lists(
+                fileName, qvalue, energy, scatInt, err,
+                dtype=dtype).to_dataframe()
+
+        dfS = pd.DataFrame()
+        # declaro estas series porque para que las columnas tengan el
+        # mismo nombre tengo que usar concat
+        energyS: pd.Series
+        scatIntS: pd.Series
+        errS: pd.Series
+
+        for i, q in enumerate(qvalue):
+            energyS = pd.Series(energy[i], name="E (meV)")
+            # redondeo el valor de Q a 2 decimales
+            qstr = "_" + str(round(qvalue[i], 2)) + "A-1"
+            scatIntLabel = os.path.basename(fileName)[:-4] + qstr
+            scatIntS = pd.Series(scatInt[i], name=scatIntLabel)
+            errS = pd.Series(err[i], name="err")
+            # En IN5 a veces hay valores del error < 0. Los convierto a 0
+            errS = errS.replace(-1, 0)
+            dfS = pd.concat([dfS, energyS, scatIntS, errS], axis=1, names=[
+                            energyS.name, scatIntS.name, errS.name])
+
+        if np.dtype(dtype) != np.float64:
+            dfS = dfS.astype(dtype)
+        return dfS
+
+    def chi_from_S(self, temp: float, qvalue: list[float],
+                   dfS: pd.DataFrame, engine: str = 'numpy') -> pd.DataFrame:
+        """Calculate the susceptibility.
+
+        Calculate the corresponding susceptibility of a given
+        scattered intensity S(Q, E) pandas.DataFrame. For each
+        Q value it saves E+, Chi+, E-, Chi-
+
+        Parameters
+        ----------
+        temp: float
+            the temperature at which the data was recorded
+        qvalue: list[float]
+            the array with the Q values
+        dfS: pd.DataFrame
+            the pandas.DataFrame with S(Q, E)
+        engine: str
+            'numpy' (default) to compute all the Q groups at once, see
+            chi_from_S_numpy, or 'reference' to go Q by Q
+
+        Returns
+        -------
+        dfchiSorted: pandas.DataFrame
+
+        Other parameters
+        ----------------
+        energyM: pd.Series
+            to save the energies E < 0
+        energyP: pd.Series
+            to save the energies E > 0
+        chiSM: pd.Series
+            to save the calculated susceptibilities for E<0
+        chiSP: pd.Series
+            to save the calculated susceptibilities for E>0
+        kb: float  # Boltzmann constant: 8.617333262 x 10-5 eV K-1
+        factSusS: pd.Series
+            to save the factor
+        dfchiM: pd.DataFrame
+            to save (E, Chi) for E<0, because once taken the absolute
             value, they need to be sorted in ascending order
         dfchiSorted: pd.DataFrame
             to save the susceptivilities
+
+        See Also
+        --------
+        chi_from_S_numpy
         """
+        if engine == 'numpy':
+            return self.chi_from_S_numpy(temp, qvalue, dfS)
+
         # Quiero probar a guardar la susceptibilidad en E+ Chi+ E- Chi-,
         # para cada Q.
         energyM: pd.Series
@@ -703,6 +1800,310 @@ class FuncionesLeer:
 
         return dfchiSorted
 
+    def bose_factor(self, energy: npt.NDArray,
+                    temp: float | npt.NDArray) -> npt.NDArray:
+        """Calculate the factor to go from S(Q, E) to Chi(Q, E).
+
+        For E < 0 the factor is pi * (exp(|E| / kb / T) - 1), and for
+        E > 0 it is pi * (1 - exp(-E / kb / T)). For E = 0 it is NaN.
+
+        Parameters
+        ----------
+        energy: npt.NDArray
+            the energies, in meV. Can have any shape
+        temp: float | npt.NDArray
+            the temperature, in K. Must broadcast with energy
+
+        Returns
+        -------
+        factor: npt.NDArray
+            the factor for each energy
+
+        Other parameters
+        ----------------
+        kb: float  # Boltzmann constant: 8.617333262 x 10-5 eV K-1
+        """
+        kb: float
+        kb = 8.6173332e-5  # eV K-1
+        factor: npt.NDArray
+        with np.errstate(invalid='ignore', over='ignore'):
+            factor = np.where(
+                energy < 0,
+                np.pi * (np.exp(np.abs(energy) / kb / 1000 / temp) - 1),
+                np.where(energy > 0,
+                         np.pi * (1 - np.exp(- energy / kb / 1000 / temp)),
+                         np.nan))
+        return factor
+
+    def chi_blocks(self, energy: npt.NDArray,
+                   chi: npt.NDArray) -> npt.NDArray:
+        """Order the susceptibilities in the E-, Chi-, E+, Chi+ layout.
+
+        The E < 0 part of every Q is ordered by |E| and the E > 0 part
+        is kept in its order, with one argsort for all the Q groups.
+        The order only depends on the energies, so it is shared by all
+        the datasets in chi.
+
+        Parameters
+        ----------
+        energy: npt.NDArray
+            the (rows, Q) matrix with the energies
+        chi: npt.NDArray
+            the (datasets, rows, Q) susceptibilities of one or more
+            datasets measured with those energies
+
+        Returns
+        -------
+        block: npt.NDArray
+            the (datasets, nrows, 4 * Q) array with E-, Chi-, E+, Chi+
+            for each Q, padded with NaN
+
+        Other parameters
+        ----------------
+        rows: npt.NDArray
+            the row number of each energy
+        keyM: npt.NDArray
+            to sort the E < 0 by |E|, with the rest at the end
+        keyP: npt.NDArray
+            to keep the E > 0 in their order, with the rest at the end
+        nrows: int
+            the number of rows of the result
+        order: npt.NDArray
+            the order of the rows for each Q
+        valid: npt.NDArray
+            False for the ordered rows that go to the end (NaN)
+        """
+        rows: npt.NDArray
+        rows = np.arange(energy.shape[0], dtype=np.float64)[:, np.newaxis]
+        # Las E<0 se ordenan por |E| y las E>0 se dejan como están. Lo que
+        # no toca se va al final con inf
+        keyM: npt.NDArray
+        keyP: npt.NDArray
+        keyM = np.where(energy < 0, np.abs(energy), np.inf)
+        keyP = np.where(energy > 0, rows, np.inf)
+        nrows: int
+        nrows = int(max(np.sum(energy < 0, axis=0).max(initial=0),
+                        np.sum(energy > 0, axis=0).max(initial=0)))
+        block: npt.NDArray
+        block = np.full((chi.shape[0], nrows, 4 * energy.shape[1]), np.nan)
+        order: npt.NDArray
+        valid: npt.NDArray
+        for col, key in ((0, keyM), (2, keyP)):
+            order = np.argsort(key, axis=0, kind='stable')[:nrows]
+            valid = np.isfinite(np.take_along_axis(key, order, axis=0))
+            block[:, :, col::4] = np.where(valid, np.abs(
+                np.take_along_axis(energy, order, axis=0)), np.nan)
+            block[:, :, col + 1::4] = np.where(valid, np.take_along_axis(
+                chi, order[np.newaxis], axis=1), np.nan)
+        return block
+
+    def chi_labels(self, dfS: pd.DataFrame, nq: int) -> list[str]:
+        """Return the column labels of the Chi(Q, E) DataFrame.
+
+        Parameters
+        ----------
+        dfS: pd.DataFrame
+            the pandas.DataFrame with S(Q, E)
+        nq: int
+            the number of Q values
+
+        Returns
+        -------
+        labels: list[str]
+            E- (meV), the S(Q, E) label, E+ (meV) and the S(Q, E) label,
+            for each Q
+        """
+        labels: list[str]
+        labels = []
+        for i in range(nq):
+            labels.extend(['E- (meV)', dfS.columns[3 * i + 1],
+                           'E+ (meV)', dfS.columns[3 * i + 1]])
+        return labels
+
+    def chi_from_S_numpy(self, temp: float, qvalue: list[float],
+                         dfS: pd.DataFrame) -> pd.DataFrame:
+        """Calculate the susceptibility of all the Q groups at once.
+
+        Vectorized version of chi_from_S. The Bose factor is applied
+        to the whole (E, S) matrix in one operation, and the result is
+        ordered for all the Q groups at once in a single preallocated
+        array, with the same E-, Chi-, E+, Chi+ layout.
+
+        Parameters
+        ----------
+        temp: float
+            the temperature at which the data was recorded
+        qvalue: list[float]
+            the array with the Q values
+        dfS: pd.DataFrame
+            the pandas.DataFrame with S(Q, E)
+
+        Returns
+        -------
+        dfchiSorted: pandas.DataFrame
+
+        Other parameters
+        ----------------
+        nq: int
+            the number of Q values
+        energy: npt.NDArray
+            the (rows, Q) matrix with the energies
+        chi: npt.NDArray
+            the (rows, Q) matrix with the susceptibilities
+
+        See Also
+        --------
+        bose_factor
+        chi_blocks
+        """
+        nq: int
+        nq = len(qvalue)
+        energy: npt.NDArray
+        chi: npt.NDArray
+        energy = dfS.iloc[:, 0:3 * nq:3].to_numpy(dtype=np.float64)
+        chi = self.bose_factor(energy, temp) * \
+            dfS.iloc[:, 1:3 * nq:3].to_numpy(dtype=np.float64)
+        dfchiSorted: pd.DataFrame
+        dfchiSorted = pd.DataFrame(
+            self.chi_blocks(energy, chi[np.newaxis])[0],
+            columns=self.chi_labels(dfS, nq))
+        return dfchiSorted
+
+    def chi_from_data(self, temp: float, data: QENSData) -> pd.DataFrame:
+        """Calculate the susceptibility of all the Q groups of a dataset.
+
+        As chi_from_S_numpy, but from a QENSData instead of the S(Q, E)
+        DataFrame.
+
+        Parameters
+        ----------
+        temp: float
+            the temperature at which the data was recorded
+        data: QENSData
+            the S(Q, E) data
+
+        Returns
+        -------
+        dfchiSorted: pandas.DataFrame
+
+        Other parameters
+        ----------------
+        energy: npt.NDArray
+            the (rows, Q) matrix with the energies
+        scatInt: npt.NDArray
+            the (rows, Q) matrix with the intensities
+        labels: list[str]
+            the labels of the columns of the Chi(Q, E) DataFrame
+        """
+        energy: npt.NDArray
+        scatInt: npt.NDArray
+        energy, scatInt, _ = data.padded()
+        labels: list[str]
+        labels = []
+        label: str
+        for label in data.labels:
+            labels.extend(['E- (meV)', label, 'E+ (meV)', label])
+        dfchiSorted: pd.DataFrame
+        dfchiSorted = pd.DataFrame(
+            self.chi_blocks(energy, (self.bose_factor(energy, temp)
+                                     * scatInt)[np.newaxis])[0],
+            columns=labels)
+        return dfchiSorted
+
+    def chi_from_S_batch(self, temps: list[float],
+                         qvalues: list[list[float]],
+                         dfSs: list[pd.DataFrame]) -> pd.DataFrame:
+        """Calculate the susceptibility of a series of datasets.
+
+        For instance, for a temperature scan. The datasets with the
+        same energy grid are computed together: the Bose factor is
+        applied to all of them in one broadcasted operation, and they
+        share the ordering of the energies. The results are put side
+        by side, in the input order, so the returned DataFrame can be
+        written at once with save_chi_data_to_csv. The temperature is
+        added to the Chi labels, e.g. 'sample_0.5A-1 (50 K)', so
+        that datasets of files with the same name can be told apart.
+
+        Parameters
+        ----------
+        temps: list[float]
+            the temperature at which each dataset was recorded
+        qvalues: list[list[float]]
+            the Q values of each dataset
+        dfSs: list[pd.DataFrame]
+            the S(Q, E) pandas.DataFrame of each dataset
+
+        Returns
+        -------
+        dfchiBatch: pandas.DataFrame
+            the Chi(Q, E) of all the datasets, with the E-, Chi-, E+,
+            Chi+ columns of each Q of each dataset
+
+        Other parameters
+        ----------------
+        energies: list[npt.NDArray]
+            the (rows, Q) energy matrix of each dataset
+        groups: list[list[int]]
+            the indexes of the datasets that share the energy grid
+        scatInt: npt.NDArray
+            the (datasets, rows, Q) intensities of a group
+        chi: npt.NDArray
+            the (datasets, rows, Q) susceptibilities of a group
+        blocks: list[npt.NDArray]
+            the Chi(Q, E) array of each dataset
+        labels: list[str]
+            the Chi(Q, E) labels of a dataset, with its temperature
+        frames: list[pd.DataFrame]
+            the Chi(Q, E) DataFrame of each dataset
+
+        See Also
+        --------
+        chi_from_S_numpy
+        """
+        energies: list[npt.NDArray]
+        energies = [dfS.iloc[:, 0:3 * len(q):3].to_numpy(dtype=np.float64)
+                    for q, dfS in zip(qvalues, dfSs)]
+        # Agrupo los datasets que tienen las mismas energías
+        groups: list[list[int]]
+        groups = []
+        for i, energy in enumerate(energies):
+            for group in groups:
+                if np.array_equal(energies[group[0]], energy, equal_nan=True):
+                    group.append(i)
+                    break
+            else:
+                groups.append([i])
+
+        scatInt: npt.NDArray
+        chi: npt.NDArray
+        blocks: list[npt.NDArray]
+        blocks = [np.empty(0)] * len(dfSs)
+        for group in groups:
+            scatInt = np.stack([
+                dfSs[i].iloc[:, 1:3 * len(qvalues[i]):3].to_numpy(
+                    dtype=np.float64) for i in group])
+            chi = self.bose_factor(
+                energies[group[0]][np.newaxis],
+                np.array([temps[i] for i in group])[:, np.newaxis,
+                                                    np.newaxis]) * scatInt
+            for i, block in zip(group,
+                                self.chi_blocks(energies[group[0]], chi)):
+                blocks[i] = block
+
+        labels: list[str]
+        frames: list[pd.DataFrame]
+        frames = []
+        for temp, block, q, dfS in zip(temps, blocks, qvalues, dfSs):
+            # Añado la temperatura a las Chi: puede haber ficheros con el
+            # mismo nombre (p.ej. en carpetas distintas)
+            labels = self.chi_labels(dfS, len(q))
+            labels[1::2] = [f'{label} ({temp:g} K)'
+                            for label in labels[1::2]]
+            frames.append(pd.DataFrame(block, columns=labels))
+        dfchiBatch: pd.DataFrame
+        dfchiBatch = pd.concat(frames, axis=1)
+        return dfchiBatch
+
     def save_data_to_csv(self, oFileName: str, dfS: pd.DataFrame) -> bool:
         """Export S(Q, E) pandas.DataFrame to csv.
 
@@ -767,3 +2168,255 @@ class FuncionesLeer:
                            index=False)
 
         return True
+
+    def export_labels(self, df: pd.DataFrame) -> list[str]:
+        """Return unique column labels to export a DataFrame.
+
+        The labels of the DataFrames are repeated (E and err for each
+        Q), but the binary formats need unique names. The position of
+        each column is added in front of its label, so that the order
+        and the labels can be recovered (see import_labels).
+
+        Parameters
+        ----------
+        df: pd.DataFrame
+            the S(Q, E) or Chi(Q, E) data
+
+        Returns
+        -------
+        names: list[str]
+            'position:label' for each column
+        """
+        return [f'{i}:{label}' for i, label in enumerate(df.columns)]
+
+    def import_labels(self, names: list[str]) -> list[str]:
+        """Return the original labels of the exported columns.
+
+        Parameters
+        ----------
+        names: list[str]
+            the labels written by export_labels
+
+        Returns
+        -------
+        labels: list[str]
+            the labels without the position of the column
+        """
+        return [name.split(':', 1)[1] for name in names]
+
+    def save_data_to_parquet(self, oFileName: str, df: pd.DataFrame,
+                             metadata: dict | None = None,
+                             compression: str = 'zstd') -> bool:
+        """Export a S(Q, E) or Chi(Q, E) pandas.DataFrame to Parquet.
+
+        Needs pyarrow. The columns keep their order and labels (see
+        export_labels), and the metadata (e.g. instrument, temperature,
+        source file) is saved in the file.
+
+        Parameters
+        ----------
+        oFileName: str
+            the output file
+        df: pd.DataFrame
+            the data to be exported
+        metadata: dict | None
+            information about the data, with values that can be written
+            to JSON
+        compression: str
+            the compression codec of the Parquet file
+        """
+        out: pd.DataFrame
+        out = df.set_axis(self.export_labels(df), axis=1)
+        out.attrs = dict(metadata or {})
+        out.to_parquet(oFileName, compression=compression, index=False)
+        return True
+
+    def save_data_to_hdf5(self, oFileName: str, df: pd.DataFrame,
+                          metadata: dict | None = None,
+                          complevel: int = 5) -> bool:
+        """Export a S(Q, E) or Chi(Q, E) pandas.DataFrame to HDF5.
+
+        Needs PyTables. The data is written in 'table' format, as a
+        chunked and compressed dataset under the key 'data', with the
+        metadata in the attributes of the dataset.
+
+        Parameters
+        ----------
+        oFileName: str
+            the output file
+        df: pd.DataFrame
+            the data to be exported
+        metadata: dict | None
+            information about the data (e.g. instrument, temperature,
+            source file)
+        complevel: int
+            the zlib compression level, from 0 to 9
+        """
+        out: pd.DataFrame
+        out = df.set_axis(self.export_labels(df), axis=1)
+        with pd.HDFStore(oFileName, mode='w', complevel=complevel,
+                         complib='zlib') as store:
+            store.put('data', out, format='table', index=False)
+            store.get_storer('data').attrs.metadata = dict(metadata or {})
+        return True
+
+    def save_data_to_npz(self, oFileName: str, df: pd.DataFrame,
+                         metadata: dict | None = None) -> bool:
+        """Export a S(Q, E) or Chi(Q, E) pandas.DataFrame to NPZ.
+
+        Each column is saved as a compressed array named as in
+        export_labels, so the columns can be read one by one. The
+        metadata is saved as JSON in the '__metadata__' array.
+
+        Parameters
+        ----------
+        oFileName: str
+            the output file (NumPy adds '.npz' if it is missing)
+        df: pd.DataFrame
+            the data to be exported
+        metadata: dict | None
+            information about the data, with values that can be written
+            to JSON (e.g. instrument, temperature, source file)
+        """
+        values: npt.NDArray
+        # Guardo los valores con su tipo (float32 o float64)
+        values = df.to_numpy()
+        arrays: dict[str, npt.NDArray]
+        arrays = {name: values[:, i]
+                  for i, name in enumerate(self.export_labels(df))}
+        arrays['__metadata__'] = np.array(json.dumps(metadata or {}))
+        np.savez_compressed(oFileName, **arrays)
+        return True
+
+    def export_format(self, fileName: str) -> str:
+        """Return the format of an exported file, from its extension.
+
+        Parameters
+        ----------
+        fileName: str
+            the exported file
+
+        Returns
+        -------
+        'parquet', 'hdf5', 'npz' or 'csv' (for any other extension)
+        """
+        extension: str
+        extension = os.path.splitext(fileName)[1].lower()
+        if extension == '.hdf5':
+            return 'hdf5'
+        fmt: str
+        for fmt in EXPORT_EXTENSIONS:
+            if EXPORT_EXTENSIONS[fmt] == extension:
+                return fmt
+        return 'csv'
+
+    def read_exported_header(self, fileName: str) -> pd.DataFrame:
+        """Read the column labels of an exported file.
+
+        Only the header (or the schema) of the file is read, not the
+        data.
+
+        Parameters
+        ----------
+        fileName: str
+            a file written by save_data_to_csv, save_data_to_parquet,
+            save_data_to_hdf5 or save_data_to_npz
+
+        Returns
+        -------
+        dfS: pd.DataFrame
+            an empty DataFrame with the columns of the file
+
+        Other parameters
+        ----------------
+        names: list[str]
+            the labels of the columns in the file
+        """
+        names: list[str]
+        match self.export_format(fileName):
+            case 'csv':
+                with open(fileName, 'r') as iFile:
+                    names = iFile.readline().rstrip('\r\n').split('\t')
+                return pd.DataFrame(columns=names)
+            case 'parquet':
+                import pyarrow.parquet as pq
+                names = pq.ParquetFile(fileName).schema_arrow.names
+            case 'hdf5':
+                names = list(pd.read_hdf(fileName, 'data', stop=0).columns)
+            case 'npz':
+                with np.load(fileName) as npz:
+                    names = [name for name in npz.files
+                             if name != '__metadata__']
+        return pd.DataFrame(columns=self.import_labels(names))
+
+    def read_exported(self, fileName: str,
+                      groups: list[int] | None = None) -> pd.DataFrame:
+        """Read S(Q, E) data from an exported file.
+
+        Only the columns of the selected Q groups are read, and they are
+        read directly as float64.
+
+        Parameters
+        ----------
+        fileName: str
+            a file written by save_data_to_csv, save_data_to_parquet,
+            save_data_to_hdf5 or save_data_to_npz
+        groups: list[int] | None
+            the indexes of the Q groups to read, or None to read all of
+            them
+
+        Returns
+        -------
+        dfS: pd.DataFrame
+            the E, S(Q, E) and err columns of the selected Q groups
+
+        Other parameters
+        ----------------
+        labels: list[str]
+            the labels of all the columns in the file
+        positions: list[int]
+            the positions of the columns to be read
+        names: list[str]
+            the names of the columns to be read in the binary files
+        """
+        labels: list[str]
+        labels = list(self.read_exported_header(fileName).columns)
+        if groups is None:
+            groups = list(range(len(labels) // 3))
+        positions: list[int]
+        positions = [3 * g + c for g in groups for c in range(3)]
+        names: list[str]
+        names = [f'{i}:{labels[i]}' for i in positions]
+
+        dfS: pd.DataFrame
+        match self.export_format(fileName):
+            case 'csv':
+                # Los nombres se repiten, así que leo sin cabecera y los
+                # pongo después
+                dfS = pd.read_csv(fileName, sep='\t', header=None,
+                                  skiprows=1, usecols=positions,
+                                  dtype=np.float64, engine='c')
+                # usecols devuelve las columnas en el orden del fichero
+                dfS = dfS[positions]
+            case 'parquet':
+                dfS = pd.read_parquet(fileName, columns=names)
+            case 'hdf5':
+                dfS = pd.read_hdf(fileName, 'data', columns=names)
+            case 'npz':
+                with np.load(fileName) as npz:
+                    dfS = pd.DataFrame(
+                        {name: npz[name] for name in names})
+        dfS = dfS.set_axis([labels[i] for i in positions], axis=1)
+        return dfS.astype(np.float64)
+
+
+# Formatos conocidos. IN5 no tiene cabeceras, así que se prueba después de
+# todos los demás, también de los que se registren más tarde
+FuncionesLeer.register_parser(
+    "IN16B", FuncionesLeer.sniff_header, FuncionesLeer.leer_tabla)
+FuncionesLeer.register_parser(
+    "FOCUS", FuncionesLeer.sniff_header, FuncionesLeer.leer_tabla)
+FuncionesLeer.register_parser(
+    "LET", FuncionesLeer.sniff_header, FuncionesLeer.leer_LET_ifile)
+FuncionesLeer.register_parser(
+    "IN5", FuncionesLeer.sniff_IN5, FuncionesLeer.leer_tabla, last=True)
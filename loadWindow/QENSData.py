@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""QENSData class.
+
+Filename: QENSData.py  
+Author: Beatriz Robles Hernández  
+Date: 2026-10-18  
+Version: 1.0  
+Description:
+    This module contains a class to keep the S(Q, E) data of a
+    measurement in contiguous arrays, with the points of all the Q
+    groups one after another (as in a CSR matrix), instead of in a
+    wide pandas DataFrame padded with NaN.
+
+License: GLP  
+Contact: broblesher@gmail.com  
+Dependencies: os, pandas, numpy, numpy.typing
+"""
+# Import statements
+import os
+import pandas as pd
+import numpy as np
+import numpy.typing as npt
+
+
+class QENSData:
+    """QENSData class.
+
+    The S(Q, E) data of a measurement. The energies, intensities and
+    errors of all the Q groups are stored one after another in three
+    contiguous arrays, and the points of the Q group i are those from
+    offsets[i] to offsets[i + 1]. The data of a Q group is returned
+    as views of these arrays, without copying it. pandas DataFrames
+    are only built to read or write files.
+
+    Attributes
+    ----------
+    qvalue: npt.NDArray
+        the Q values
+    offsets: npt.NDArray
+        the position of the first point of each Q group, and the total
+        number of points at the end
+    energy: npt.NDArray
+        the energies of all the Q groups
+    scatInt: npt.NDArray
+        the intensities of all the Q groups
+    err: npt.NDArray
+        the errors in the intensity of all the Q groups
+    labels: list[str]
+        the label of the intensity of each Q group, as in the columns of
+        the S(Q, E) DataFrame
+    metadata: dict
+        information about the data (e.g. instrument, temperature,
+        source file)
+
+    Methods
+    -------
+    from_lists(fileName, qvalue, energy, scatInt, err, metadata)
+        Creates the dataset from the lists returned by the parsers
+    from_dataframe(dfS, metadata)
+        Creates the dataset from a S(Q, E) DataFrame
+    group(i)
+        Returns the energy, intensity and error of a Q group
+    sizes()
+        Returns the number of points of each Q group
+    qlist()
+        Returns the Q values as str, as in the Q comboBox
+    padded(dtype)
+        Returns the data as (points, Q) matrices padded with NaN
+    nrows()
+        Returns the number of points of the longest Q group
+    valid()
+        Returns the mask of the points that are not padding
+    to_dataframe()
+        Returns the S(Q, E) DataFrame
+    """
+
+    def __init__(self, qvalue: npt.ArrayLike, offsets: npt.ArrayLike,
+                 energy: npt.ArrayLike, scatInt: npt.ArrayLike,
+                 err: npt.ArrayLike, labels: list[str] | None = None,
+                 metadata: dict | None = None,
+                 dtype: npt.DTypeLike = np.float64):
+        """Class constructor.
+
+        Parameters
+        ----------
+        qvalue: npt.ArrayLike
+            the Q values
+        offsets: npt.ArrayLike
+            the position of the first point of each Q group, and the
+            total number of points at the end
+        energy: npt.ArrayLike
+            the energies of all the Q groups, one after another
+        scatInt: npt.ArrayLike
+            the intensities of all the Q groups, one after another
+        err: npt.ArrayLike
+            the errors of all the Q groups, one after another
+        labels: list[str] | None
+            the label of the intensity of each Q group. If None, the
+            labels are made from the Q values
+        metadata: dict | None
+            information about the data
+        dtype: npt.DTypeLike
+            the type of the energy, intensity and error arrays:
+            np.float64 (default), or np.float32 to halve the memory
+
+        Raises
+        ------
+        ValueError
+            if the sizes of the arrays do not match
+        """
+        self.qvalue = np.asarray(qvalue, dtype=np.float64)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.energy = np.ascontiguousarray(energy, dtype=dtype)
+        self.scatInt = np.ascontiguousarray(scatInt, dtype=dtype)
+        self.err = np.ascontiguousarray(err, dtype=dtype)
+        if (self.offsets.size != self.qvalue.size + 1
+                or not self.energy.size == self.scatInt.size
+                == self.err.size == self.offsets[-1]):
+            raise ValueError('The sizes of the arrays do not match')
+        if labels is None:
+            labels = [str(round(q, 2)) + "A-1" for q in self.qvalue]
+        self.labels = list(labels)
+        self.metadata = dict(metadata or {})
+
+    @classmethod
+    def from_lists(cls, fileName: str, qvalue: list[float],
+                   energy: list[list[float]], scatInt: list[list[float]],
+                   err: list[list[float]],
+                   metadata: dict | None = None,
+                   dtype: npt.DTypeLike = np.float64) -> 'QENSData':
+        """Create the dataset from the lists returned by the parsers.
+
+        The labels are made as in FuncionesLeer.data_to_pandas_df, and
+        the errors equal to -1 are set to 0.
+
+        Parameters
+        ----------
+        fileName: str
+            the name of the input file, for the labels
+        qvalue: list[float]
+            the Q values
+        energy: list[list[float]]
+            the energies of each Q group
+        scatInt: list[list[float]]
+            the intensities of each Q group
+        err: list[list[float]]
+            the errors of each Q group
+        metadata: dict | None
+            information about the data
+        dtype: npt.DTypeLike
+            the type of the arrays (see the constructor)
+
+        Returns
+        -------
+        The QENSData with the data
+        """
+        offsets: npt.NDArray
+        offsets = np.zeros(len(qvalue) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(e) for e in energy], dtype=np.int64)
+        data: QENSData
+        data = cls(qvalue, offsets,
+                   np.concatenate(energy, dtype=dtype) if energy else [],
+                   np.concatenate(scatInt, dtype=dtype) if scatInt else [],
+                   np.concatenate(err, dtype=dtype) if err else [],
+                   [os.path.basename(fileName)[:-4] + "_"
+                    + str(round(q, 2)) + "A-1" for q in qvalue],
+                   metadata, dtype)
+        # En IN5 a veces hay valores del error < 0. Los convierto a 0
+        data.err[data.err == -1] = 0
+        return data
+
+    @classmethod
+    def from_dataframe(cls, dfS: pd.DataFrame,
+                       metadata: dict | None = None,
+                       dtype: npt.DTypeLike = np.float64) -> 'QENSData':
+        """Create the dataset from a S(Q, E) DataFrame.
+
+        The DataFrame has three columns (E, S(Q, E), err) for each Q,
+        padded with NaN, as made by FuncionesLeer.data_to_pandas_df or
+        read from an exported file. The Q values are read from the
+        labels of the intensity columns.
+
+        Parameters
+        ----------
+        dfS: pd.DataFrame
+            the S(Q, E) data
+        metadata: dict | None
+            information about the data
+        dtype: npt.DTypeLike
+            the type of the arrays (see the constructor)
+
+        Returns
+        -------
+        The QENSData with the data
+
+        Other parameters
+        ----------------
+        block: npt.NDArray
+            the values of the DataFrame
+        valid: npt.NDArray
+            the (Q, rows) mask of the points that are not padding
+        """
+        labels: list[str]
+        labels = [str(label) for label in dfS.columns[1::3]]
+        block: npt.NDArray
+        block = dfS.to_numpy(dtype=np.float64)
+        # Traspuestas, para tener los puntos de cada Q seguidos
+        valid: npt.NDArray
+        valid = ~np.isnan(block[:, 0::3].T)
+        offsets: npt.NDArray
+        offsets = np.zeros(len(labels) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(valid.sum(axis=1))
+        return cls([float(label[label.rfind('_') + 1:-3])
+                    for label in labels], offsets,
+                   block[:, 0::3].T[valid], block[:, 1::3].T[valid],
+                   block[:, 2::3].T[valid], labels, metadata, dtype)
+
+    def __len__(self) -> int:
+        """Return the number of Q groups."""
+        return self.qvalue.size
+
+    def group(self, i: int) -> tuple:
+        """Return the energy, intensity and error of a Q group.
+
+        The arrays are views of the data, not copies.
+
+        Parameters
+        ----------
+        i: int
+            the index of the Q group
+
+        Returns
+        -------
+        A tuple with the values:
+        energy: npt.NDArray
+        scatInt: npt.NDArray
+        err: npt.NDArray
+        """
+        start: int
+        stop: int
+        start, stop = self.offsets[i], self.offsets[i + 1]
+        return (self.energy[start:stop], self.scatInt[start:stop],
+                self.err[start:stop])
+
+    def sizes(self) -> npt.NDArray:
+        """Return the number of points of each Q group."""
+        return np.diff(self.offsets)
+
+    def qlist(self) -> list[str]:
+        """Return the Q values as str, as in the Q comboBox.
+
+        Returns
+        -------
+        qlist: list[str]
+            the Q values rounded to 2 decimals, as in the labels
+        """
+        return [str(round(q, 2)) for q in self.qvalue]
+
+    def padded(self, dtype: npt.DTypeLike = np.float64) -> tuple:
+        """Return the data as (points, Q) matrices padded with NaN.
+
+        The matrices are float64 by default, also when the data is
+        stored as float32, so that the calculations with them are done
+        in float64.
+
+        Parameters
+        ----------
+        dtype: npt.DTypeLike
+            the type of the matrices
+
+        Returns
+        -------
+        A tuple with the values:
+        energy: npt.NDArray
+        scatInt: npt.NDArray
+        err: npt.NDArray
+        """
+        sizes: npt.NDArray
+        sizes = self.sizes()
+        matrices: list[npt.NDArray]
+        matrices = []
+        values: npt.NDArray
+        for values in (self.energy, self.scatInt, self.err):
+            matrix = np.full((self.nrows(), len(self)), np.nan, dtype=dtype)
+            # Una copia por Q, de un trozo contiguo de los datos
+            for i in range(len(self)):
+                matrix[:sizes[i], i] = values[self.offsets[i]:
+                                              self.offsets[i + 1]]
+            matrices.append(matrix)
+        return tuple(matrices)
+
+    def nrows(self) -> int:
+        """Return the number of points of the longest Q group."""
+        return int(self.sizes().max(initial=0))
+
+    def valid(self) -> npt.NDArray:
+        """Return the (Q, points) mask of the points that are not padding.
+
+        Returns
+        -------
+        valid: npt.NDArray
+            True for the first sizes()[i] points of each Q group i
+        """
+        return np.arange(self.nrows()) < self.sizes()[:, np.newaxis]
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Return the S(Q, E) DataFrame.
+
+        The DataFrame has three columns (E, S(Q, E), err) for each Q,
+        padded with NaN at the end of the shorter Q groups, as the one
+        made by FuncionesLeer.data_to_pandas_df, with the type of the
+        data.
+
+        Returns
+        -------
+        dfS: pd.DataFrame
+            the S(Q, E) data
+        """
+        sizes: npt.NDArray
+        sizes = self.sizes()
+        block: npt.NDArray
+        block = np.full((self.nrows(), 3 * len(self)), np.nan,
+                        dtype=self.energy.dtype)
+        # Una copia por columna, de un trozo contiguo de los datos
+        for i in range(len(self)):
+            start, stop = self.offsets[i], self.offsets[i + 1]
+            block[:sizes[i], 3 * i] = self.energy[start:stop]
+            block[:sizes[i], 3 * i + 1] = self.scatInt[start:stop]
+            block[:sizes[i], 3 * i + 2] = self.err[start:stop]
+        labels: list[str]
+        labels = []
+        label: str
+        for label in self.labels:
+            labels.extend(["E (meV)", label, "err"])
+        return pd.DataFrame(block, columns=labels, copy=False)
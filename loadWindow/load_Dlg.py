@@ -9,29 +9,193 @@ Version: 1.0
 Description:
     This script runs an GUI window to read QENS data files recorded
     in different facilities, organizes it as a matrix saves it to
-    a Pandas DataFrame.
+    a Pandas DataFrame. The files are read in a worker thread, so the
+    window is not blocked while loading big files.
 
 License: GLP  
 Contact: broblesher@gmail.com  
-Dependencies: os, sys, _io, pandas, FuncionesLeer, PyQt5, load_win_ui
+Dependencies: os, sys, _io, FuncionesLeer, FuncionesCache, QENSData,
+    PyQt5, load_win_ui
 """
 # Import statements
 import os
 import sys
 import _io
-import pandas as pd
 # Como he convertido en módulo esta app, importo los archivos así,
 # incluyendo el nombre del módulo. ¡Ojo! Si quiero ejecutar este archivo,
 # no me funciona.
 from loadWindow import FuncionesLeer as fl  #
+from loadWindow import FuncionesCache as fc  #
+from loadWindow.QENSData import QENSData  #
 from loadWindow.load_win_ui import Ui_Dialog_QENSload  #
 
 
 from PyQt5.QtWidgets import (
-    QApplication, QDialog, QFileDialog)  # QMainWindow, QMessageBox,
-from PyQt5.QtCore import QDateTime  # , Qt
+    QApplication, QDialog, QFileDialog, QLabel,
+    QProgressBar)  # QMainWindow, QMessageBox,
+from PyQt5.QtCore import QDateTime, QSize, QThread, pyqtSignal  # , Qt
 # from PyQt5.QtGui import QColor
 
+# Tiempo máximo que se espera a que acabe el LoadWorker al cerrar el
+# diálogo, en ms. Se cancela en cuanto acaba el trozo que está leyendo
+WORKER_WAIT_MS: int = 5000
+
+
+class LoadCancelled(Exception):
+    """Raised in the LoadWorker thread when the loading is cancelled."""
+
+
+class LoadWorker(QThread):
+    """LoadWorker class.
+
+    A thread to read the data files and build the QENSData without
+    blocking the GUI. The results are sent to the dialog with signals.
+    The files are parsed in chunks (the 'mmap' engine of
+    FuncionesLeer), so the progress is reported and the loading can be
+    cancelled after each chunk.
+
+    Attributes
+    ----------
+    progress: pyqtSignal(int, str)
+        emitted with the percentage done and the current step
+    loaded: pyqtSignal(object)
+        emitted with the QENSData when the data is loaded
+    failed: pyqtSignal(str)
+        emitted with the error message if the data cannot be loaded,
+        or if the loading is cancelled
+
+    Methods
+    -------
+    run()
+        Reads the data files and builds the QENSData
+    report(done, total)
+        Emits the progress of the parsing, and stops it if cancelled
+    """
+
+    progress = pyqtSignal(int, str)
+    loaded = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, iFileName: str, instrument: str,
+                 cache: fc.FuncionesCache, parent=None):
+        """Class constructor.
+
+        Parameters
+        ----------
+        iFileName: str
+            the input file name, with path
+        instrument: str
+            the instrument where the data was recorded
+        cache: FuncionesCache
+            the binary cache of the parsed data files
+        """
+        super().__init__(parent)
+        self._iFileName = iFileName
+        self._instrument = instrument
+        self._cache = cache
+        # Uno propio, para no compartir el callback de progreso
+        self._funcionesLeer = fl.FuncionesLeer()
+        self._funcionesLeer.progress = self.report
+
+    def report(self, done: int, total: int):
+        """Emit the progress of the parsing, and stop it if cancelled.
+
+        Parameters
+        ----------
+        done: int
+            the work done (bytes or files read)
+        total: int
+            the total work
+
+        Raises
+        ------
+        LoadCancelled
+            if the loading has been cancelled (requestInterruption)
+        """
+        if self.isInterruptionRequested():
+            raise LoadCancelled()
+        # La lectura va del 5 al 90 %
+        self.progress.emit(5 + 85 * done // max(total, 1), 'Reading')
+
+    def run(self):
+        """Read the data files and build the QENSData.
+
+        Other parameters
+        ----------------
+        files: list[str]
+            the data files to be read (several for LET)
+        cached: tuple | None
+            the data of the files in the cache, or None if they are not
+            in the cache
+        iFile: _io.TextIOWrapper
+            to save the opened input file
+        fileName: str
+            the name used for the labels of the columns
+        """
+        try:
+            self.progress.emit(0, 'Looking for the files')
+            files: list[str]
+            if (self._instrument != 'LET'):
+                files = [self._iFileName]
+            else:
+                files = self._funcionesLeer.find_LET_files(self._iFileName)
+            # Miro primero si ya tengo los datos de estos ficheros en la
+            # caché, para no tener que leerlos otra vez
+            cached: tuple | None
+            cached = self._cache.load(files, self._instrument)
+            self.report(0, 1)
+            if cached is not None:
+                qvalue, energy, scatInt, err = cached
+            elif (self._instrument != 'LET'):
+                iFile: _io.TextIOWrapper
+                # LLamo a la función que abre el fichero con las medidas
+                iFile = self._funcionesLeer.open_iFile(self._iFileName)
+                try:
+                    # Llamo a la función que me guarda los datos en listas,
+                    # por trozos para ir mostrando el progreso y poder
+                    # cancelar en medio
+                    qvalue, energy, scatInt, err = self._funcionesLeer.\
+                        read_from_ifile(iFile, self._instrument, 'mmap')
+                finally:
+                    # Y cierro el archivo de datos
+                    self._funcionesLeer.close_iFile(iFile)
+            else:
+                qvalue, energy, scatInt, err = self._funcionesLeer.\
+                    leer_de_LET(self._iFileName)
+            self.report(1, 1)
+            if cached is None:
+                self.progress.emit(90, 'Saving to the cache')
+                self._cache.save(files, self._instrument, qvalue, energy,
+                                 scatInt, err)
+
+            fileName: str
+            fileName = self._iFileName
+            if (self._instrument == 'LET'):
+                # corto el nombre del archivo y lo junto con el path otra
+                # vez para poder nombrar las columnas en los data frames
+                fileName = os.path.dirname(self._iFileName) + \
+                    self._funcionesLeer.fileNameDropLET(self._iFileName)
+            self.progress.emit(95, 'Sorting the data')
+            # Guardo S(Q,E) en un QENSData, sin pasar por un DataFrame
+            data: QENSData
+            data = QENSData.from_lists(
+                fileName, qvalue, energy, scatInt, err,
+                {'instrument': self._instrument, 'source': files[0]})
+            if self.isInterruptionRequested():
+                raise LoadCancelled()
+        except LoadCancelled:
+            self.failed.emit('Loading cancelled')
+        except (OSError, ValueError) as error:
+            self.failed.emit(str(getattr(error, 'strerror', None)
+                                 or error))
+        except Exception as error:
+            # Cualquier otro error de los parsers (p.ej. un fichero
+            # cortado), para que el diálogo no se quede esperando
+            self.failed.emit(type(error).__name__ + ': ' + str(error))
+        else:
+            self.progress.emit(100, 'Done')
+            self.loaded.emit(data)
+
 
 class DLG(QDialog, Ui_Dialog_QENSload):
     """DLG window class.
@@ -56,8 +220,19 @@ class DLG(QDialog, Ui_Dialog_QENSload):
     _funcionesLeer: FuncionesLeer
         an instance to the class [FuncionesLeer][QENS_to_csv_pkg.FuncionesLeer]
         to read and write from/to the input/output files
-    _dfS: pd.DataFrame
-        the pandas data frame where the sorted QENS data is loaded
+    _cache: FuncionesCache
+        an instance to the class FuncionesCache, to keep the parsed
+        data files in a binary cache
+    _data: QENSData
+        the dataset where the sorted QENS data is loaded
+    _worker: LoadWorker | None
+        the thread that is loading the data, or None
+    _loadText: str
+        the text of the Load button, that is Cancel while loading
+    progressBar: QProgressBar
+        to show the progress of the loading
+    label_status: QLabel
+        to show the current step of the loading, or the last message
 
     Methods
     -------
@@ -70,8 +245,16 @@ class DLG(QDialog, Ui_Dialog_QENSload):
     updateRadioSelection()
         Checks the radio buttons
     sortAndSave()
-        Sorts the input data in a matrix form
-        and saves it to a pandas dataframe
+        Checks the input and starts loading the data in a LoadWorker,
+        or cancels the loading if it is running
+    showProgress(percent, step)
+        Shows the progress of the loading
+    dataLoaded(data)
+        Keeps the loaded data and closes the dialog
+    loadFailed(msg)
+        Shows why the data could not be loaded
+    reject()
+        Cancels the loading when the dialog is closed
     """
 
     def __init__(self, parent=None):
@@ -99,8 +282,12 @@ class DLG(QDialog, Ui_Dialog_QENSload):
             the last message shown in the log section
         _current_date: str
             the date shown in the last message in the log section
-        _dfS: pandas.DataFrame
-            the data frame where the sorted QENS data is loaded
+        _cache: FuncionesCache
+            the binary cache of the parsed data files
+        _data: QENSData
+            the dataset where the sorted QENS data is loaded
+        _worker: LoadWorker | None
+            the thread that is loading the data, or None
 
         """
         super().__init__(parent)
@@ -111,8 +298,22 @@ class DLG(QDialog, Ui_Dialog_QENSload):
         self._iFileName = ''
         self._defaultPath = os.path.expanduser('~')
         self._funcionesLeer = fl.FuncionesLeer()
-        self._dfS = pd.DataFrame()
+        self._cache = fc.FuncionesCache()
+        self._data = QENSData.from_lists('', [], [], [], [])
         self._last_msg = ''
+        self._worker: LoadWorker | None
+        self._worker = None
+        # El botón Load ya no cierra el diálogo: se cierra cuando llegan
+        # los datos del LoadWorker (ver dataLoaded)
+        self.pushButton_Load.clicked.disconnect(self.accept)
+        self._loadText = self.pushButton_Load.text()
+        self.progressBar = QProgressBar(self)
+        self.progressBar.setRange(0, 100)
+        self.progressBar.hide()
+        self.label_status = QLabel(self)
+        self.verticalLayout_1.addWidget(self.progressBar)
+        self.verticalLayout_1.addWidget(self.label_status)
+        self.setMaximumSize(QSize(1000, 200))
 
     def set_iFile_DisplayText(self, text: str):
         """Set the input display's text.
@@ -175,10 +376,16 @@ class DLG(QDialog, Ui_Dialog_QENSload):
 
     # Función que se ejecuta cuando pulso load
     def sortAndSave(self) -> bool:  # -> tuple
-        """Sort input data and save to a pandas dataframe.
+        """Check the input and start loading the data in a LoadWorker.
 
         Check if all the conditions meet to sort and save the data,
-        and if so, proceeds.
+        and if so, starts a LoadWorker to read the files. The dialog
+        is accepted when the data arrives (see dataLoaded). If the data
+        is already being loaded, the loading is cancelled.
+
+        Returns
+        -------
+        True if the loading has started, False otherwise
 
         Other parameters
         ----------------
@@ -188,95 +395,131 @@ class DLG(QDialog, Ui_Dialog_QENSload):
             to save the current date and time when displaying a msg
         _last_msg: str
             to save the last message displayed in the log textBrowser
-        qvalue: list[float]
-            to save the Q values
-        energy: list[list[float]]
-            to save the Energy array for each Q
-        scatInt: list[list[float]]
-            to save the scattered intensity for each Q
-        err: list[list[float]]
-            to save the measured error in the intensity for each Q
-        iFile: _io.TextIOWrapper
-            to save the opened input file
-        path: str
-            to save the path
-        _dfS: pandas.DataFrame
-            to save the S(Q, E) in a matrix form
+        detected: str | None
+            the instrument found from the first bytes of the file, if no
+            instrument is selected, or None if the format is unknown
 
         Raises
         ------
         OSError
             if the path or the file does not exist
         """
+        # Si ya está cargando, el botón es Cancel
+        if self._worker is not None:
+            self.label_status.setText('Cancelling...')
+            self._worker.requestInterruption()
+            return False
+
         # Lo primero debería comprobar que los valores de los edit de
         # los files existen.
         self._iFileName = self.display_iFile_Text()
 
-        # Necesito comprobar que algún radio button está seleccionado
-        if self._rb_value == 'unchecked':
-            self._current_date = QDateTime.currentDateTime().\
-                toString('hh:mm:ss')
-            self._last_msg = self._current_date + ': Select instrument\n'
-            # self.textBrowser_log.setTextColor(QColor(255, 51, 0))
-            # self.textBrowser_log.insertPlainText(self._last_msg)
-            return False  # , self._last_msg, self._dfS
-
+        detected: str | None
+        detected = None
         try:
             self._funcionesLeer.check_path(self._iFileName)
+            # Si no se ha seleccionado el instrumento, miro el formato
+            # del fichero. Si se ha seleccionado, se respeta
+            if self._rb_value == 'unchecked':
+                detected = self._funcionesLeer.detect_instrument(
+                    self._iFileName)
         except IOError as error:
-            self._current_date = QDateTime.currentDateTime().\
-                toString('hh:mm:ss')
-            self._last_msg = self._current_date + ': ' + \
-                str(error.strerror) + 'Enter a valid input path\n'
-            # self.textBrowser_log.setTextColor(QColor(255, 51, 0))
-            # self.textBrowser_log.insertPlainText(self._last_msg)
+            self.loadFailed(str(error.strerror) + 'Enter a valid input path')
             return False  # , self._last_msg, self._dfS
-        else:
-            # "Declaro" variables para guardar los datos
-            qvalue: list[float]
-            energy: list[list[float]]
-            scatInt: list[list[float]]
-            err: list[list[float]]
+        if self._rb_value == 'unchecked':
+            # Si no se reconoce, necesito que algún radio button esté
+            # seleccionado
+            if detected is None:
+                self.loadFailed('Unknown format: select instrument')
+                return False  # , self._last_msg, self._dfS
+            self._instrument = detected
+
+        # Leo los ficheros en otro hilo, para no bloquear la ventana
+        self._worker = LoadWorker(self._iFileName, self._instrument,
+                                  self._cache, self)
+        self._worker.progress.connect(self.showProgress)
+        self._worker.loaded.connect(self.dataLoaded)
+        self._worker.failed.connect(self.loadFailed)
+        self._worker.finished.connect(self._worker.deleteLater)
+        self.pushButton_Load.setText('Cancel')
+        self.progressBar.setValue(0)
+        self.progressBar.show()
+        self._worker.start()
+        return True
 
-            if (self._instrument != 'LET'):
-                iFile: _io.TextIOWrapper
-                # LLamo a la función que abre el fichero con las medidas
-                try:
-                    iFile = self._funcionesLeer.open_iFile(self._iFileName)
-                except OSError as error:
-                    self._current_date = QDateTime.currentDateTime().\
-                        toString('hh:mm:ss')
-                    self._last_msg = self._current_date + ': ' + \
-                        str(error.strerror) + '\n'
-                    # self.textBrowser_log.setTextColor(QColor(255, 51, 0))
-                    # self.textBrowser_log.insertPlainText(self._last_msg)
-                    return False  # , self._last_msg, self._dfS
-                else:
-                    # Llamo a la función que me guarda los datos en listas
-                    qvalue, energy, scatInt, err = self._funcionesLeer.\
-                        read_from_ifile(iFile, self._instrument)
-                    # Y cierro el archivo de datos
-                    self._funcionesLeer.close_iFile(iFile)
-            else:
-                qvalue, energy, scatInt, err = self._funcionesLeer.\
-                    leer_de_LET(self._iFileName)
-                # corto el nombre del archivo y lo junto con el path otra vez
-                # para poder nombrar las columnas en los data frames
-                path: str
-                path = os.path.dirname(self._iFileName)
-                self._iFileName = path + \
-                    self._funcionesLeer.fileNameDropLET(self._iFileName)
+    def showProgress(self, percent: int, step: str):
+        """Show the progress of the loading.
+
+        Parameters
+        ----------
+        percent: int
+            the percentage done
+        step: str
+            the current step of the loading
+        """
+        self.progressBar.setValue(percent)
+        self.label_status.setText(step + '...')
+
+    def dataLoaded(self, data: QENSData):
+        """Keep the loaded data and close the dialog.
 
-            # Defino el Data Frame para guardar S(Q,E)
-            # dfS: pd.DataFrame
-            # Llamo a la función que me guarda los datos en DataFrame de Pandas
-            self._dfS = self._funcionesLeer.data_to_pandas_df(
-                self._iFileName, qvalue, energy, scatInt, err)
-            self._current_date = QDateTime.currentDateTime().\
-                toString('hh:mm:ss')
-            self._last_msg = self._current_date + ': Data succesfully loaded\n'
+        Parameters
+        ----------
+        data: QENSData
+            the S(Q, E) data, sent by the LoadWorker
+        """
+        self._worker = None
+        self._data = data
+        self.pushButton_Load.setText(self._loadText)
+        self.progressBar.hide()
+        self._current_date = QDateTime.currentDateTime().toString('hh:mm:ss')
+        self._last_msg = self._current_date + ': Data succesfully loaded\n'
+        self.label_status.clear()
+        self.accept()
 
-        return True  # , self._last_msg, self._dfS
+    def loadFailed(self, msg: str):
+        """Show why the data could not be loaded.
+
+        The dialog stays open, to try again.
+
+        Parameters
+        ----------
+        msg: str
+            the error message
+        """
+        self._worker = None
+        self.pushButton_Load.setText(self._loadText)
+        self.progressBar.hide()
+        self._current_date = QDateTime.currentDateTime().toString('hh:mm:ss')
+        self._last_msg = self._current_date + ': ' + msg + '\n'
+        self.label_status.setText(msg)
+
+    def reject(self):
+        """Cancel the loading when the dialog is closed.
+
+        Waits up to WORKER_WAIT_MS for the LoadWorker to stop. If it
+        has not stopped yet, it is moved out of the dialog, so that it
+        is not destroyed with the dialog while it is running.
+
+        Other parameters
+        ----------------
+        worker: LoadWorker
+            the worker that was loading the data
+        """
+        if self._worker is not None:
+            worker: LoadWorker
+            worker = self._worker
+            # Ya no quiero nada de él
+            worker.progress.disconnect(self.showProgress)
+            worker.loaded.disconnect(self.dataLoaded)
+            worker.failed.disconnect(self.loadFailed)
+            worker.requestInterruption()
+            self.loadFailed('Loading cancelled')
+            if not worker.wait(WORKER_WAIT_MS):
+                # Lo cuelgo de la aplicación; se borra solo al acabar
+                # (deleteLater)
+                worker.setParent(QApplication.instance())
+        super().reject()
 
 
 # Esta clase es para conectar las señales y los slots
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests of the FourierTransform class.
+
+Filename: test_FourierTransform.py  
+Author: Beatriz Robles Hernández  
+Date: 2026-10-18  
+Version: 1.0  
+Description:
+    Checks I(Q, t) against the analytic transform of a Lorentzian of
+    half width G, that is the exponential decay exp(-G t / hbar), with
+    and without dividing by the resolution. Run them from the root
+    folder of the repository:
+        python -m pytest tests
+
+License: GLP  
+Contact: broblesher@gmail.com  
+Dependencies: pytest, numpy, FourierTransform  
+"""
+# Import statements
+import numpy as np
+import pytest
+from utilities.FourierTransform import HBAR, FourierTransform
+
+# Mallado de energías ancho, para que las colas de la Lorentziana que se
+# pierden en los extremos sean despreciables
+ENERGY = np.linspace(-50, 50, 4001)
+# Tiempos en los que se compara con la exponencial (ps)
+TMAX = 30.0
+
+
+def lorentzian(energy, width, center=0.0):
+    """Return a normalized Lorentzian of half width width (meV)."""
+    return width / np.pi / ((energy - center) ** 2 + width ** 2)
+
+
+@pytest.mark.parametrize('energy', [ENERGY, ENERGY[:3200]],
+                         ids=['symmetric', 'asymmetric'])
+def test_lorentzian(energy):
+    """A Lorentzian transforms to an exponential decay."""
+    width = 0.1
+    fourier = FourierTransform(
+        [0.5], [(energy, lorentzian(energy, width), None)], window=None)
+    times = fourier.time <= TMAX
+    assert fourier.intensity[0, 0] == 1.0
+    np.testing.assert_allclose(
+        fourier.intensity[0, times],
+        np.exp(-width * fourier.time[times] / HBAR), atol=5e-3)
+
+
+def test_lorentzian_resolution():
+    """The complex transforms are divided, also with a shifted resolution.
+
+    The resolution is a Lorentzian centered at E0. A sample centered
+    also at E0 gives exp(-G t / hbar), and a sample centered at E = 0
+    gives exp(-G t / hbar) cos(E0 t / hbar).
+    """
+    width = 0.1
+    resWidth = 0.05
+    center = 0.03
+    fourier = FourierTransform(
+        [0.5, 0.7],
+        [(ENERGY, lorentzian(ENERGY, width + resWidth, center), None),
+         (ENERGY, lorentzian(ENERGY, width + resWidth), None)],
+        resolution=(ENERGY, lorentzian(ENERGY, resWidth, center), None),
+        window=None)
+    times = fourier.time <= TMAX
+    decay = np.exp(-width * fourier.time[times] / HBAR)
+    np.testing.assert_allclose(fourier.intensity[0, times], decay,
+                               atol=5e-3)
+    np.testing.assert_allclose(
+        fourier.intensity[1, times],
+        decay * np.cos(center * fourier.time[times] / HBAR), atol=5e-3)
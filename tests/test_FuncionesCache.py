@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests of the cache of parsed data files.
+
+Filename: test_FuncionesCache.py  
+Author: Beatriz Robles Hernández  
+Date: 2026-10-18  
+Version: 1.0  
+Description:
+    Checks that the entries of FuncionesCache are loaded back as they
+    were saved, and that saving an entry does not delete it. Run them
+    from the root folder of the repository:
+        python -m pytest tests
+
+License: GLP  
+Contact: broblesher@gmail.com  
+Dependencies: pytest, numpy, FuncionesCache
+"""
+# Import statements
+import os
+import numpy as np
+from loadWindow.FuncionesCache import FuncionesCache
+
+
+def data_file(tmp_path, name):
+    """Return the name of a data file to be cached."""
+    fileName = tmp_path / name
+    fileName.write_text(name)
+    return str(fileName)
+
+
+def entry(dtype, size=100):
+    """Return the qvalue, energy, scatInt and err of two Q-values."""
+    arrays = [np.linspace(-1, 1, size, dtype=dtype) for _ in range(2)]
+    return [0.5, 0.6], arrays, arrays, arrays
+
+
+def test_dtype(tmp_path):
+    """float32 data is loaded back as float32."""
+    cache = FuncionesCache(str(tmp_path / 'cache'))
+    fileNames = [data_file(tmp_path, 'a.dat')]
+    assert cache.save(fileNames, 'IN5', *entry(np.float32))
+    qvalue, energy, scatInt, err = cache.load(fileNames, 'IN5')
+    assert qvalue == [0.5, 0.6]
+    assert all(e.dtype == np.float32 for e in energy + scatInt + err)
+    np.testing.assert_array_equal(energy[1], entry(np.float32)[1][1])
+
+
+def test_evict(tmp_path):
+    """The entry just saved is kept, and too big entries are not saved."""
+    cache = FuncionesCache(str(tmp_path / 'cache'), maxBytes=15000)
+    first = [data_file(tmp_path, 'a.dat')]
+    second = [data_file(tmp_path, 'b.dat')]
+    assert cache.save(first, 'IN5', *entry(np.float64, 200))
+    # Las dos entradas no caben: se borra la más antigua, no la nueva
+    assert cache.save(second, 'IN5', *entry(np.float64, 200))
+    assert cache.load(first, 'IN5') is None
+    assert cache.load(second, 'IN5') is not None
+    # Una entrada más grande que la caché no se guarda ni borra las demás
+    big = [data_file(tmp_path, 'c.dat')]
+    assert not cache.save(big, 'IN5', *entry(np.float64, 1000))
+    assert cache.load(big, 'IN5') is None
+    assert cache.load(second, 'IN5') is not None
+    assert not any(name.endswith('.tmp')
+                   for name in os.listdir(tmp_path / 'cache'))
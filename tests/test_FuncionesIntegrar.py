@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests of the ROI areas of FuncionesIntegrar.
+
+Filename: test_FuncionesIntegrar.py  
+Author: Beatriz Robles Hernández  
+Date: 2026-10-18  
+Version: 1.0  
+Description:
+    Checks that the areas calculated with the cumulative sums are the
+    same as integrating each ROI with np.trapezoid. Run them from the
+    root folder of the repository:
+        python -m pytest tests
+
+License: GLP  
+Contact: broblesher@gmail.com  
+Dependencies: pytest, numpy, FuncionesIntegrar
+"""
+# Import statements
+import numpy as np
+import pytest
+from utilities.FuncionesIntegrar import FuncionesMenuIntegrar
+
+
+@pytest.fixture
+def funcionesIntegrar():
+    """Return the FuncionesMenuIntegrar used by the tests."""
+    return FuncionesMenuIntegrar()
+
+
+def spectrum(nanIndex, column=1):
+    """Return a dataDic with a spectrum with NaN at nanIndex.
+
+    The NaN is in the intensity (column 1) or in the error (column 2).
+    """
+    x = np.linspace(-1, 1, 41)
+    y = np.exp(-x ** 2 / 0.1)
+    err = np.sqrt(y) / 10
+    (x, y, err)[column][nanIndex] = np.nan
+    return {'0.5': {'measData': (x, y, err)}}
+
+
+def test_nan_outside_roi(funcionesIntegrar):
+    """A NaN intensity only changes the area of the ROIs with it."""
+    dataDic = spectrum(5)
+    x, y, _ = dataDic['0.5']['measData']
+    areas, _ = funcionesIntegrar.roi_areas(
+        '0.5', dataDic, [[x[10], x[20]], [x[2], x[8]]])
+    assert areas[0] == pytest.approx(np.trapezoid(y[10:20], x[10:20]))
+    assert np.isnan(areas[1])
+
+
+def test_nan_error_outside_roi(funcionesIntegrar):
+    """A NaN error only changes the error of the ROIs with it."""
+    dataDic = spectrum(5, column=2)
+    x, _, err = dataDic['0.5']['measData']
+    _, errors = funcionesIntegrar.roi_areas(
+        '0.5', dataDic, [[x[10], x[20]], [x[2], x[8]]])
+    # Los pesos del trapecio de cada punto de x[10:20]
+    weights = np.zeros(x.size)
+    weights[10:19] += (x[11:20] - x[10:19]) / 2
+    weights[11:20] += (x[11:20] - x[10:19]) / 2
+    assert errors[0] == pytest.approx(
+        np.sqrt(np.sum((weights[10:20] * err[10:20]) ** 2)))
+    assert np.isnan(errors[1])
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests of the parsers of FuncionesLeer.
+
+Filename: test_FuncionesLeer.py  
+Author: Beatriz Robles Hernández  
+Date: 2026-10-18  
+Version: 1.0  
+Description:
+    Checks that the 'numpy' engine gives the same data as the
+    'reference' line-by-line parsers, and that the exported files are
+    read back as they were written. Run them from the root folder of
+    the repository:
+        python -m pytest tests
+
+License: GLP  
+Contact: broblesher@gmail.com  
+Dependencies: json, pytest, numpy, pandas, FuncionesLeer, QENSData
+"""
+# Import statements
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from loadWindow.FuncionesLeer import EXPORT_EXTENSIONS, FuncionesLeer
+from loadWindow.QENSData import QENSData
+
+
+@pytest.fixture
+def funcionesLeer():
+    """Return the FuncionesLeer used by the tests."""
+    return FuncionesLeer()
+
+
+def parse(funcionesLeer, fileName, engine):
+    """Parse an IN16B file with an engine."""
+    with open(fileName, 'r') as iFile:
+        return funcionesLeer.read_from_ifile(iFile, 'IN16B', engine)
+
+
+def test_mixed_columns(funcionesLeer, tmp_path):
+    """Lines with different number of columns are not mixed up."""
+    fileName = tmp_path / 'mixed.dat'
+    fileName.write_text('# q(Angstrom^-1) = 0.5000\n'
+                        '1 2 3\n'
+                        '4 5 6 7 8\n')
+    reference = parse(funcionesLeer, fileName, 'reference')
+    qvalue, energy, scatInt, err = parse(funcionesLeer, fileName, 'numpy')
+    assert qvalue == reference[0]
+    np.testing.assert_array_equal(energy[0], [1, 4])
+    np.testing.assert_array_equal(energy[0], reference[1][0])
+    np.testing.assert_array_equal(scatInt[0], reference[2][0])
+    np.testing.assert_array_equal(err[0], reference[3][0])
+
+
+def test_lines_to_array_mixed(funcionesLeer):
+    """Each line gives its first 3 elements, whatever its length."""
+    buf = b'1 2 3\n4 5 6 7 8\n'
+    starts, ends, _, _ = funcionesLeer.line_layout(buf)
+    data = funcionesLeer.lines_to_array(buf, starts, ends,
+                                        np.arange(starts.size))
+    np.testing.assert_array_equal(data, [[1, 2, 3], [4, 5, 6]])
+
+
+@pytest.mark.parametrize('engine', ['numpy', 'mmap'])
+def test_layout(funcionesLeer, tmp_path, engine):
+    """Comments, blank lines and indented lines are read as reference."""
+    fileName = tmp_path / 'layout.dat'
+    fileName.write_bytes(b'# file header\n'
+                         b'# q(Angstrom^-1) = 0.5000\n'
+                         b'# x y e\n'
+                         b'1 2 3\r\n'
+                         b'\n'
+                         b'   4 5 6\n'
+                         b'   # comment\n'
+                         b'# q(Angstrom^-1) = 0.7000\n'
+                         b'\t7 8 9\n'
+                         b'10 11 12')
+    reference = parse(funcionesLeer, fileName, 'reference')
+    result = parse(funcionesLeer, fileName, engine)
+    assert result[0] == reference[0] == [0.5, 0.7]
+    for values, expected in zip(result[1:], reference[1:]):
+        for group, expectedGroup in zip(values, expected):
+            np.testing.assert_array_equal(group, expectedGroup)
+
+
+def test_malformed(funcionesLeer, tmp_path):
+    """A value that is not a number raises ValueError, as in reference."""
+    fileName = tmp_path / 'malformed.dat'
+    fileName.write_text('# q(Angstrom^-1) = 0.5000\n'
+                        '1 2 3\n'
+                        '4 x 6\n')
+    with pytest.raises(ValueError):
+        parse(funcionesLeer, fileName, 'reference')
+    with pytest.raises(ValueError):
+        parse(funcionesLeer, fileName, 'numpy')
+    with pytest.raises(ValueError):
+        parse(funcionesLeer, fileName, 'mmap')
+
+
+@pytest.fixture
+def dfS():
+    """Return a S(Q, E) DataFrame of 3 Q groups, one of them shorter."""
+    return QENSData.from_lists(
+        'sample.dat', [0.2, 0.45, 0.7],
+        [[-2.0, -1.0, 0.0, 1.0, 2.0], [-1.0, 0.0, 1.0, 2.0],
+         [-2.5, -1.5, 0.0, 1.5, 2.5]],
+        [[1.0, 2.0, 3.0, 4.0, 5.0], [6.0, np.nan, 8.0, 9.0],
+         [10.0, 11.0, 12.0, 13.0, 14.0]],
+        [[0.1, 0.2, 0.3, 0.4, 0.5], [0.6, 0.7, 0.8, 0.9],
+         [1.0, 1.1, 1.2, 1.3, 1.4]]).to_dataframe()
+
+
+def read_metadata(fileName, fmt):
+    """Read the metadata of an exported file with the library of its format."""
+    match fmt:
+        case 'parquet':
+            return pd.read_parquet(fileName).attrs
+        case 'hdf5':
+            with pd.HDFStore(fileName, mode='r') as store:
+                return store.get_storer('data').attrs.metadata
+        case 'npz':
+            with np.load(fileName) as npz:
+                return json.loads(str(npz['__metadata__']))
+
+
+@pytest.mark.parametrize('fmt', list(EXPORT_EXTENSIONS))
+def test_export_round_trip(funcionesLeer, dfS, tmp_path, fmt):
+    """The exported data is read back in the same order, with its metadata."""
+    fileName = str(tmp_path / ('sample' + EXPORT_EXTENSIONS[fmt]))
+    metadata = {'instrument': 'IN16B', 'temperature': 50.0,
+                'source': 'sample.dat'}
+    if fmt == 'csv':
+        assert funcionesLeer.save_data_to_csv(fileName, dfS.copy())
+    else:
+        save = getattr(funcionesLeer, 'save_data_to_' + fmt)
+        assert save(fileName, dfS, metadata)
+        assert read_metadata(fileName, fmt) == metadata
+    assert funcionesLeer.export_format(fileName) == fmt
+    header = funcionesLeer.read_exported_header(fileName)
+    assert list(header.columns) == list(dfS.columns)
+    pd.testing.assert_frame_equal(funcionesLeer.read_exported(fileName),
+                                  dfS)
+    # Solo algunos grupos, en el orden pedido
+    pd.testing.assert_frame_equal(
+        funcionesLeer.read_exported(fileName, [2, 0]),
+        dfS.iloc[:, [6, 7, 8, 0, 1, 2]].reset_index(drop=True))
+
+
+@pytest.mark.parametrize('dtype, rtol', [(np.float64, 1e-12),
+                                         (np.float32, 1e-5)])
+def test_chi_from_S_numpy(funcionesLeer, dfS, dtype, rtol):
+    """The numpy engine gives the same Chi as the reference one."""
+    qvalue = [0.2, 0.45, 0.7]
+    # Los grupos tienen distinto tamaño, así que hay filas de NaN al final
+    assert dfS.iloc[-1].isna().any()
+    dfS = dfS.astype(dtype)
+    dfchi = funcionesLeer.chi_from_S(50.0, qvalue, dfS, 'numpy')
+    dfchiRef = funcionesLeer.chi_from_S(50.0, qvalue, dfS, 'reference')
+    assert list(dfchi.columns) == list(dfchiRef.columns)
+    assert dfchi.shape == dfchiRef.shape
+    np.testing.assert_allclose(dfchi.to_numpy(dtype=np.float64),
+                               dfchiRef.to_numpy(dtype=np.float64),
+                               rtol=rtol, equal_nan=True)
+
+
+def test_chi_from_S_batch(funcionesLeer, dfS):
+    """The batch gives the Chi of each dataset, with unique labels."""
+    qvalue = [0.2, 0.45, 0.7]
+    # Otra rejilla de energías, con el mismo nombre de fichero
+    dfS2 = dfS.copy()
+    dfS2.iloc[:, 0::3] *= 1.5
+    temps = [10.0, 50.0, 100.0]
+    dfSs = [dfS, dfS, dfS2]
+    dfchiBatch = funcionesLeer.chi_from_S_batch(temps, [qvalue] * 3, dfSs)
+    assert dfchiBatch.shape[1] == 3 * 4 * len(qvalue)
+    # Chi- y Chi+ de cada Q comparten la etiqueta
+    chiLabels = list(dfchiBatch.columns[1::4])
+    assert len(set(chiLabels)) == len(chiLabels)
+    assert list(dfchiBatch.columns[3::4]) == chiLabels
+    assert chiLabels[0] == 'sample_0.2A-1 (10 K)'
+    for i, (temp, dfS_i) in enumerate(zip(temps, dfSs)):
+        dfchi = funcionesLeer.chi_from_S(temp, qvalue, dfS_i)
+        block = dfchiBatch.iloc[:, 4 * len(qvalue) * i:
+                                4 * len(qvalue) * (i + 1)]
+        np.testing.assert_allclose(block.to_numpy()[:len(dfchi)],
+                                   dfchi.to_numpy(), equal_nan=True)
+        assert block.iloc[len(dfchi):].isna().all(axis=None)
+
+
+# El principio de un fichero de cada instrumento
+SAMPLE_HEADERS = {
+    'IN16B': '# file header\n# q(Angstrom^-1) = 0.2000\n# x y e\n'
+             '-3.000000e-02 9.818743e-01 4.703173e-02\n',
+    'FOCUS': '#Group Value: 0.4000\n#comment\n'
+             '-3.000000e+00\t5.506063e-02\t9.434857e-02\n',
+    'LET': '# Integration over |Q|,0.20,0.30\n# E S err\n'
+           '-2.00000  5.118216e-01  9.504637e-02\n',
+    'IN5': '   403    1    0    0\n title line for q\n'
+           '  0.3000  0.0  1.2  20.0  0.0  0.0\n'
+           '  0.0000  1.0000  0.0000\n'
+           '  -5.00000  6.369617e-01  4.097352e-03\n',
+}
+
+
+@pytest.mark.parametrize('instrument', list(SAMPLE_HEADERS))
+def test_detect_instrument(funcionesLeer, tmp_path, instrument):
+    """Each instrument is detected from the beginning of its files."""
+    fileName = tmp_path / 'sample.dat'
+    fileName.write_text(SAMPLE_HEADERS[instrument])
+    assert funcionesLeer.detect_instrument(str(fileName)) == instrument
+
+
+def test_detect_unknown(funcionesLeer, tmp_path):
+    """A file of an unknown format is not detected."""
+    fileName = tmp_path / 'sample.dat'
+    fileName.write_text('some text\nthat is not data\n')
+    assert funcionesLeer.detect_instrument(str(fileName)) is None
+
+
+def test_IN5_last(funcionesLeer, tmp_path):
+    """A file with a Q header and lines of 6 and 3 elements is not IN5."""
+    fileName = tmp_path / 'sample.dat'
+    fileName.write_text(SAMPLE_HEADERS['IN16B']
+                        + '0.3 0.0 1.2 20.0 0.0 0.0\n1 2 3\n')
+    assert funcionesLeer.detect_instrument(str(fileName)) == 'IN16B'
+
+
+def test_register_parser(funcionesLeer, tmp_path, monkeypatch):
+    """A registered format is detected and read, and IN5 stays the last."""
+    monkeypatch.setattr(FuncionesLeer, '_parsers',
+                        dict(FuncionesLeer._parsers))
+
+    def parse(funcionesLeer, iFile, instrument, engine, dtype):
+        return [0.5], [np.array([1.0])], [np.array([2.0])], \
+            [np.array([3.0])]
+
+    FuncionesLeer.register_parser(
+        'TEST', lambda funcionesLeer, head, name: b'0.3000' in head, parse)
+    # El fichero de IN5 también parece del formato nuevo, que se prueba
+    # antes aunque se haya registrado después
+    fileName = tmp_path / 'sample.dat'
+    fileName.write_text(SAMPLE_HEADERS['IN5'])
+    assert funcionesLeer.detect_instrument(str(fileName)) == 'TEST'
+    with open(fileName, 'r') as iFile:
+        qvalue, energy, _, _ = funcionesLeer.read_from_ifile(iFile)
+    assert qvalue == [0.5]
+    np.testing.assert_array_equal(energy[0], [1.0])
+    # Los demás formatos se siguen reconociendo
+    fileName.write_text(SAMPLE_HEADERS['LET'])
+    assert funcionesLeer.detect_instrument(str(fileName)) == 'LET'
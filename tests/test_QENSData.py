@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests of the QENSData container.
+
+Filename: test_QENSData.py  
+Author: Beatriz Robles Hernández  
+Date: 2026-10-18  
+Version: 1.0  
+Description:
+    Checks that the S(Q, E) data of Q groups with different number of
+    points is kept when going from the parser lists to a QENSData, to
+    the S(Q, E) DataFrame and back. Run them from the root folder of
+    the repository:
+        python -m pytest tests
+
+License: GLP  
+Contact: broblesher@gmail.com  
+Dependencies: pytest, numpy, QENSData
+"""
+# Import statements
+import numpy as np
+import pytest
+from loadWindow.QENSData import QENSData
+
+
+def ragged_lists():
+    """Return the qvalue, energy, scatInt and err of 3 ragged Q groups."""
+    qvalue = [0.2, 0.45, 0.7]
+    energy = [[-1.0, 0.0, 1.0], [-2.0, -1.0, 0.0, 1.0, 2.0], [0.5]]
+    scatInt = [[1.0, 2.0, 3.0], [4.0, 5.0, 6.0, 7.0, 8.0], [9.0]]
+    err = [[0.1, -1.0, 0.3], [0.4, 0.5, 0.6, 0.7, 0.8], [-1.0]]
+    return qvalue, energy, scatInt, err
+
+
+@pytest.fixture
+def data():
+    """Return the QENSData of the ragged Q groups."""
+    return QENSData.from_lists('/data/sample.dat', *ragged_lists(),
+                               {'instrument': 'IN16B'})
+
+
+def test_from_lists(data):
+    """The groups are the lists, and the labels are made from the Qs."""
+    qvalue, energy, scatInt, err = ragged_lists()
+    assert len(data) == 3
+    np.testing.assert_array_equal(data.sizes(), [3, 5, 1])
+    assert data.nrows() == 5
+    assert data.qlist() == ['0.2', '0.45', '0.7']
+    assert data.labels == ['sample_0.2A-1', 'sample_0.45A-1',
+                           'sample_0.7A-1']
+    for i in range(len(data)):
+        group = data.group(i)
+        np.testing.assert_array_equal(group[0], energy[i])
+        np.testing.assert_array_equal(group[1], scatInt[i])
+        # Las vistas no copian los datos
+        assert np.shares_memory(group[0], data.energy)
+
+
+def test_err_sentinel(data):
+    """The errors equal to -1 are set to 0, and the others are kept."""
+    np.testing.assert_array_equal(data.group(0)[2], [0.1, 0, 0.3])
+    np.testing.assert_array_equal(data.group(2)[2], [0])
+    assert (data.err >= 0).all()
+
+
+def test_padded(data):
+    """The (points, Q) matrices are padded with NaN at the end."""
+    energy, scatInt, err = data.padded()
+    assert energy.shape == scatInt.shape == err.shape == (5, 3)
+    assert energy.dtype == np.float64
+    np.testing.assert_array_equal(energy[:, 1], [-2, -1, 0, 1, 2])
+    np.testing.assert_array_equal(scatInt[:3, 0], [1, 2, 3])
+    assert np.isnan(scatInt[3:, 0]).all()
+    assert np.isnan(err[1:, 2]).all()
+    np.testing.assert_array_equal(data.valid().sum(axis=1), [3, 5, 1])
+
+
+def test_dataframe_round_trip(data):
+    """Going to the S(Q, E) DataFrame and back keeps the data."""
+    dfS = data.to_dataframe()
+    assert dfS.shape == (5, 9)
+    assert list(dfS.columns[1::3]) == data.labels
+    assert list(dfS.columns[0::3]) == ['E (meV)'] * 3
+    assert dfS.iloc[:, 0].isna().sum() == 2
+    back = QENSData.from_dataframe(dfS, data.metadata)
+    np.testing.assert_allclose(back.qvalue, data.qvalue)
+    np.testing.assert_array_equal(back.offsets, data.offsets)
+    np.testing.assert_array_equal(back.energy, data.energy)
+    np.testing.assert_array_equal(back.scatInt, data.scatInt)
+    np.testing.assert_array_equal(back.err, data.err)
+    assert back.labels == data.labels
+    assert back.metadata == {'instrument': 'IN16B'}
+
+
+def test_float32():
+    """float32 data is stored as float32, and padded gives float64."""
+    data = QENSData.from_lists('sample.dat', *ragged_lists(),
+                               dtype=np.float32)
+    assert data.energy.dtype == data.scatInt.dtype == data.err.dtype \
+        == np.float32
+    assert data.group(1)[1].dtype == np.float32
+    assert data.to_dataframe().dtypes.eq(np.float32).all()
+    assert data.padded()[0].dtype == np.float64
+    assert data.padded(np.float32)[0].dtype == np.float32
+    np.testing.assert_array_equal(data.group(0)[2],
+                                  np.float32([0.1, 0, 0.3]))
+    back = QENSData.from_dataframe(data.to_dataframe(), dtype=np.float32)
+    np.testing.assert_array_equal(back.scatInt, data.scatInt)
+
+
+def test_sizes_do_not_match():
+    """The arrays must have the number of points of the offsets."""
+    with pytest.raises(ValueError):
+        QENSData([0.5], [0, 3], [1.0, 2.0], [1.0, 2.0], [1.0, 2.0])
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests of the command line converter.
+
+Filename: test_QENS_convert.py  
+Author: Beatriz Robles Hernández  
+Date: 2026-10-18  
+Version: 1.0  
+Description:
+    Checks how QENS_convert expands the input files, groups the files
+    of a LET measurement in one job, and the exit code of the script.
+    Run them from the root folder of the repository:
+        python -m pytest tests
+
+License: GLP  
+Contact: broblesher@gmail.com  
+Dependencies: pytest, QENS_convert, FuncionesLeer  
+"""
+# Import statements
+import pytest
+from QENS_convert import expand_inputs, main, plan_jobs
+from loadWindow.FuncionesLeer import FuncionesLeer
+
+# Un fichero de IN16B con dos Q
+IN16B_TEXT = ('# q(Angstrom^-1) = 0.2000\n'
+              '-1.0 1.0 0.1\n0.0 2.0 0.1\n1.0 3.0 0.1\n'
+              '# q(Angstrom^-1) = 0.4000\n'
+              '-1.0 4.0 0.1\n0.0 5.0 0.1\n1.0 6.0 0.1\n')
+# Un fichero de una Q de LET
+LET_TEXT = ('# Integration over |Q|,0.20,0.30\n# E S err\n'
+            '-1.0 1.0 0.1\n0.0 2.0 0.1\n1.0 3.0 0.1\n')
+
+
+@pytest.fixture
+def funcionesLeer(capsys):
+    """Return the FuncionesLeer used by the tests."""
+    funcionesLeer = FuncionesLeer()
+    capsys.readouterr()
+    return funcionesLeer
+
+
+def test_expand_inputs(tmp_path):
+    """The patterns are expanded in order, without repetitions."""
+    for name in ['b.dat', 'a.dat', 'c.txt']:
+        (tmp_path / name).write_text(IN16B_TEXT)
+    fileNames = expand_inputs([str(tmp_path / 'c.txt'),
+                               str(tmp_path / '*.dat'),
+                               str(tmp_path / 'a.dat'),
+                               str(tmp_path / 'missing.dat')])
+    assert fileNames == [str(tmp_path / name) for name in
+                         ['c.txt', 'a.dat', 'b.dat', 'missing.dat']]
+
+
+def test_plan_jobs(funcionesLeer, tmp_path):
+    """The files of a LET measurement are converted in one job."""
+    (tmp_path / 'other').mkdir()
+    fileNames = [str(tmp_path / name) for name in
+                 ['run_(1).txt', 'run_(2).txt', 'other/run_(1).txt',
+                  'in16b.dat', 'unknown.dat', 'missing.dat']]
+    for fileName in fileNames[:3]:
+        with open(fileName, 'w') as oFile:
+            oFile.write(LET_TEXT)
+    with open(fileNames[3], 'w') as oFile:
+        oFile.write(IN16B_TEXT)
+    with open(fileNames[4], 'w') as oFile:
+        oFile.write('some text\n')
+    # La misma medida en otra carpeta es otra medida
+    assert plan_jobs(funcionesLeer, fileNames, 'auto') == [
+        (fileNames[0], 'LET'), (fileNames[2], 'LET'),
+        (fileNames[3], 'IN16B'), (fileNames[4], None),
+        (fileNames[5], None)]
+    # Con el instrumento dado no se detecta nada
+    assert plan_jobs(funcionesLeer, fileNames[3:], 'IN16B') == [
+        (fileName, 'IN16B') for fileName in fileNames[3:]]
+
+
+def test_main(tmp_path, capsys):
+    """All the files are converted, and only the results are printed."""
+    for name in ['a.dat', 'b.dat']:
+        (tmp_path / name).write_text(IN16B_TEXT)
+    assert main([str(tmp_path / '*.dat'), '-t', '50', '-j', '1']) == 0
+    for name in ['a.csv', 'a_Chi.csv', 'b.csv', 'b_Chi.csv']:
+        assert (tmp_path / name).is_file()
+    out = capsys.readouterr().out
+    assert 'FuncionesLeer constructor' not in out
+    assert out.splitlines()[-1] == '2 of 2 files converted'
+
+
+def test_main_scan(tmp_path):
+    """With one temperature per file, the Chi is saved in one file."""
+    for name in ['a.dat', 'b.dat']:
+        (tmp_path / name).write_text(IN16B_TEXT)
+    assert main([str(tmp_path / '*.dat'), '-t', '10', '50', '-j', '1',
+                 '-o', str(tmp_path / 'out')]) == 0
+    assert sorted(p.name for p in (tmp_path / 'out').iterdir()) == [
+        'a.csv', 'a_scan_Chi.csv', 'b.csv']
+
+
+def test_main_failed(tmp_path, capsys):
+    """The exit code is 1 if any file is not converted."""
+    (tmp_path / 'a.dat').write_text(IN16B_TEXT)
+    assert main([str(tmp_path / 'a.dat'), str(tmp_path / 'missing.dat'),
+                 '-j', '1']) == 1
+    captured = capsys.readouterr()
+    assert 'missing.dat' in captured.err
+    assert captured.out.splitlines()[-1] == '1 of 2 files converted'
+    # Hay que dar una temperatura, o una por fichero
+    assert main([str(tmp_path / 'a.dat'), str(tmp_path / 'missing.dat'),
+                 '-t', '10', '20', '30']) == 1
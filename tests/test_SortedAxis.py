@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests of the SortedAxis class.
+
+Filename: test_SortedAxis.py  
+Author: Beatriz Robles Hernández  
+Date: 2026-10-18  
+Version: 1.0  
+Description:
+    Checks that SortedAxis.nearest finds the same points as
+    FuncionesMenuIntegrar.find_nearest, for axes in ascending and
+    descending order, with NaN padding at the end, and for values out
+    of the axis or halfway between two points. Run them from the root
+    folder of the repository:
+        python -m pytest tests
+
+License: GLP  
+Contact: broblesher@gmail.com  
+Dependencies: pytest, numpy, SortedAxis, FuncionesIntegrar  
+"""
+# Import statements
+import numpy as np
+import pytest
+from utilities.FuncionesIntegrar import FuncionesMenuIntegrar
+from utilities.SortedAxis import SortedAxis
+
+# Puntos del eje, puntos medios (empates) y valores fuera del eje
+VALUES = np.array([-2.0, -1.75, -0.1, 0.0, 0.25, 0.3, 1.25, 2.0,
+                   -10.0, 10.0])
+
+
+def find_nearest(x, values):
+    """Return the index of the nearest point with find_nearest."""
+    funcionesIntegrar = FuncionesMenuIntegrar()
+    return np.array([funcionesIntegrar.find_nearest(x, value)
+                     for value in values])
+
+
+@pytest.mark.parametrize('x', [np.linspace(-2, 2, 9),
+                               np.linspace(2, -2, 9)],
+                         ids=['ascending', 'descending'])
+def test_nearest(x):
+    """The nearest points are the same as with find_nearest."""
+    axis = SortedAxis(x)
+    assert axis.order == (1 if x[0] < x[-1] else -1)
+    np.testing.assert_array_equal(axis.nearest(VALUES),
+                                  find_nearest(x, VALUES))
+
+
+@pytest.mark.parametrize('x', [np.linspace(-2, 2, 9),
+                               np.linspace(2, -2, 9)],
+                         ids=['ascending', 'descending'])
+def test_nearest_nan_padding(x):
+    """The NaN at the end of the axis are left out."""
+    axis = SortedAxis(np.concatenate([x, [np.nan, np.nan]]))
+    assert axis.order != 0
+    np.testing.assert_array_equal(axis.x, x)
+    np.testing.assert_array_equal(axis.nearest(VALUES),
+                                  find_nearest(x, VALUES))
+
+
+def test_nearest_ties():
+    """Halfway between two points, the first in the axis is returned."""
+    assert SortedAxis([0.0, 0.5, 1.0]).nearest(0.25) == 0
+    assert SortedAxis([1.0, 0.5, 0.0]).nearest(0.25) == 1
+    # Con puntos repetidos, también el primero
+    assert SortedAxis([0.0, 1.0, 1.0, 2.0]).nearest(1.2) == 1
+    assert SortedAxis([2.0, 1.0, 1.0, 0.0]).nearest(0.8) == 1
+
+
+def test_nearest_out_of_range():
+    """The values out of the axis go to its first or last point."""
+    axis = SortedAxis([-1.0, 0.0, 1.0, np.nan])
+    np.testing.assert_array_equal(axis.nearest([-5.0, 5.0]), [0, 2])
+    axis = SortedAxis([1.0, 0.0, -1.0, np.nan])
+    np.testing.assert_array_equal(axis.nearest([-5.0, 5.0]), [2, 0])
+
+
+def test_nearest_unsorted():
+    """An unsorted axis compares each value with all the points."""
+    x = np.array([0.0, 2.0, 1.0, -1.0])
+    axis = SortedAxis(x)
+    assert axis.order == 0
+    np.testing.assert_array_equal(axis.nearest(VALUES),
+                                  find_nearest(x, VALUES))
+
+
+def test_nearest_shapes():
+    """A number gives an int, a NaN gives 0, and an empty axis fails."""
+    axis = SortedAxis([0.0, 1.0, 2.0])
+    assert isinstance(axis.nearest(1.4), int)
+    assert axis.nearest(np.nan) == 0
+    assert axis.nearest([[0.1, 1.9]]).shape == (1, 2)
+    with pytest.raises(ValueError):
+        SortedAxis([np.nan, np.nan]).nearest(1.0)
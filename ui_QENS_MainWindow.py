@@ -47,6 +47,8 @@ class Ui_MainWindow(object):
         self.actionIntegrate.setObjectName(u"actionIntegrate")
         self.actionFourier_transform = QAction(MainWindow)
         self.actionFourier_transform.setObjectName(u"actionFourier_transform")
+        self.actionSQE_map = QAction(MainWindow)
+        self.actionSQE_map.setObjectName(u"actionSQE_map")
         self.centralwidget = QtWidgets.QWidget(MainWindow)
         self.centralwidget.setObjectName(u"centralwidget")
         self.gridLayout = QtWidgets.QGridLayout(self.centralwidget)
@@ -334,6 +336,7 @@ class Ui_MainWindow(object):
         self.menuLoad_data.addAction(self.actionFrom_csv)
         self.menuAnalysis.addAction(self.actionIntegrate)
         self.menuAnalysis.addAction(self.actionFourier_transform)
+        self.menuAnalysis.addAction(self.actionSQE_map)
         self.toolBar.addAction(self.actionFrom_source)
         self.toolBar.addAction(self.actionFrom_csv)
         self.toolBar.addSeparator()
@@ -359,6 +362,8 @@ class Ui_MainWindow(object):
         self.actionFourier_transform.setText(
             QtCore.QCoreApplication.translate(
                 "MainWindow", u"Fourier transform", None))
+        self.actionSQE_map.setText(QtCore.QCoreApplication.translate(
+            "MainWindow", u"S(Q, E) map", None))
         self.groupBox_area.setTitle(QtCore.QCoreApplication.translate(
             "MainWindow", u"Area under curve", None))
         self.groupBox_ROI5.setTitle(QtCore.QCoreApplication.translate(
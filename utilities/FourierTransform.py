@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""FourierTransform class.
+
+Filename: FourierTransform.py  
+Author: Beatriz Robles Hernández  
+Date: 2026-10-18  
+Version: 1.0  
+Description:
+    This module contains a class to calculate the intermediate
+    scattering function I(Q, t) from the S(Q, E) data of all the
+    Q-values, with a single FFT for all of them. It does not need the
+    GUI.
+
+License: GLP  
+Contact: broblesher@gmail.com  
+Dependencies: numpy, numpy.typing
+"""
+# Import statements
+import numpy as np
+import numpy.typing as npt
+
+# Constante de Planck reducida, en meV·ps
+HBAR: float = 0.6582119569
+# Número máximo de puntos del mallado de energías
+FT_MAX_POINTS: int = 4096
+# Donde el módulo de la transformada de la resolución es menor que RES_MIN
+# (relativo a t = 0), no se divide por ella: el resultado sería solo ruido
+RES_MIN: float = 1e-3
+# Funciones ventana de u = E / |E|max, que va de -1 a 1
+WINDOWS: dict = {
+    'hann': lambda u: 0.5 + 0.5 * np.cos(np.pi * u),
+    'hamming': lambda u: 0.54 + 0.46 * np.cos(np.pi * u),
+    'blackman': lambda u: (0.42 + 0.5 * np.cos(np.pi * u)
+                           + 0.08 * np.cos(2 * np.pi * u)),
+    None: np.ones_like}
+
+
+class FourierTransform:
+    """FourierTransform class.
+
+    The intermediate scattering function I(Q, t) of each Q-value,
+    calculated as the Fourier transform of S(Q, E) normalized to 1 at
+    t = 0. The intensities of all the Q-values are interpolated onto
+    the same uniform energy grid (0 outside the energy range of each
+    one), multiplied by a window function centered at E = 0 to reduce
+    the ringing due to the ends of the data, and transformed with a
+    single np.fft.rfft along the energy axis of the (Q, E) matrix. If
+    the resolution is given, it is transformed in the same way and the
+    complex transform of S(Q, E) is divided by it, before taking the
+    real part (so that the phases of a resolution that is not centered
+    at E = 0 cancel out). The transform is calculated when the object
+    is created.
+
+    Attributes
+    ----------
+    qvalue: npt.NDArray
+        the Q-values
+    energy: npt.NDArray
+        the uniform energy grid (meV)
+    time: npt.NDArray
+        the Fourier times (ps)
+    intensity: npt.NDArray
+        the (Q, t) values of I(Q, t), the real part of the transform
+        divided by its value at t = 0 (NaN where the resolution is too
+        small to divide by it)
+
+    Methods
+    -------
+    regrid(groups)
+        Interpolates the intensity of some Q-values onto the energy grid
+    transform(matrix)
+        Calculates the complex Fourier transform of each row
+    """
+
+    def __init__(self, qvalue: npt.ArrayLike, groups: list[tuple],
+                 resolution: list[tuple] | tuple | None = None,
+                 window: str | None = 'hann',
+                 npoints: int = FT_MAX_POINTS):
+        """Class constructor.
+
+        Parameters
+        ----------
+        qvalue: npt.ArrayLike
+            the Q-value of each group
+        groups: list[tuple]
+            the energy, intensity and error arrays of each Q-value (see
+            QENSData.group)
+        resolution: list[tuple] | tuple | None
+            the energy, intensity and error arrays of the resolution
+            (e.g. a vanadium or low temperature measurement), one for
+            each Q-value or the same for all of them. If None, I(Q, t)
+            is not divided by the resolution
+        window: str | None
+            the window function, centered at E = 0: 'hann' (default),
+            'hamming', 'blackman', or None for no window
+        npoints: int
+            the maximum number of points of the energy grid
+
+        Raises
+        ------
+        ValueError
+            if there is no data, the window is not known, or the number
+            of resolution groups does not match the number of Q-values
+
+        Other parameters
+        ----------------
+        matrix: npt.NDArray
+            the (Q, E) intensities on the energy grid
+        steps: list[float]
+            the typical energy step of each Q-value
+        spectra: npt.NDArray
+            the complex (Q, t) transform of S(Q, E), divided by the one
+            of the resolution
+        """
+        self.qvalue = np.asarray(qvalue, dtype=np.float64)
+        if window not in WINDOWS:
+            raise ValueError('Unknown window: ' + str(window))
+        if isinstance(resolution, tuple):
+            resolution = [resolution] * len(groups)
+        if resolution is not None and len(resolution) != len(groups):
+            raise ValueError('There must be a resolution for each Q-value')
+        energies: list[npt.NDArray]
+        energies = [np.asarray(x, dtype=np.float64) for x, _, _ in groups]
+        energies = [x[~np.isnan(x)] for x in energies]
+        if not any(x.size for x in energies):
+            raise ValueError('There is no data to transform')
+        steps: list[float]
+        steps = [float(np.median(np.diff(np.unique(x))))
+                 for x in energies if np.unique(x).size > 1]
+        low: float
+        high: float
+        low = min(x.min() for x in energies if x.size)
+        high = max(x.max() for x in energies if x.size)
+        size: int
+        size = 1
+        if steps and high > low:
+            size = min(int(round((high - low) / min(steps))) + 1, npoints)
+        self.energy = np.linspace(low, high, size)
+        # La ventana está centrada en E = 0, no en el centro del mallado,
+        # para no atenuar el pico elástico si el mallado no es simétrico
+        self._window = WINDOWS[window](
+            self.energy / max(abs(low), abs(high)))
+        step: float
+        step = self.energy[1] - self.energy[0] if size > 1 else 1.0
+        # Tiempos de la rfft: t_k = 2 pi hbar k / (N dE)
+        self.time = 2 * np.pi * HBAR * np.arange(size // 2 + 1) / (
+            size * step)
+        matrix: npt.NDArray
+        matrix = self.regrid(groups)
+        spectra: npt.NDArray
+        spectra = self.transform(matrix)
+        if resolution is not None:
+            res: npt.NDArray
+            res = self.transform(self.regrid(resolution))
+            # Divido las transformadas complejas, y después tomo la parte
+            # real: dividir solo las partes reales no es lo mismo
+            with np.errstate(divide='ignore', invalid='ignore'):
+                spectra = np.where(
+                    (np.abs(res) >= RES_MIN * np.abs(res[:, :1]))
+                    & (res[:, :1] != 0), spectra / res, np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.intensity = spectra.real / spectra[:, :1].real
+        self.intensity[spectra[:, 0].real == 0] = np.nan
+
+    def regrid(self, groups: list[tuple]) -> npt.NDArray:
+        """Interpolate the intensity of some Q-values onto the energy grid.
+
+        Parameters
+        ----------
+        groups: list[tuple]
+            the energy, intensity and error arrays of each Q-value
+
+        Returns
+        -------
+        matrix: npt.NDArray
+            the (Q, E) intensities on the grid, 0 outside the energy
+            range of each Q-value
+        """
+        matrix: npt.NDArray
+        matrix = np.zeros((len(groups), self.energy.size))
+        i: int
+        for i, (x, y, _) in enumerate(groups):
+            x = np.asarray(x, dtype=np.float64)
+            y = np.asarray(y, dtype=np.float64)
+            valid = ~(np.isnan(x) | np.isnan(y))
+            if not valid.any():
+                continue
+            # np.interp necesita las energías en orden ascendente
+            order = np.argsort(x[valid], kind='stable')
+            matrix[i] = np.interp(self.energy, x[valid][order],
+                                  y[valid][order], left=0.0, right=0.0)
+        return matrix
+
+    def transform(self, matrix: npt.NDArray) -> npt.NDArray:
+        """Calculate the complex Fourier transform of each row.
+
+        All the rows are transformed in a single np.fft.rfft call. The
+        phase due to the start of the energy grid is corrected, so that
+        the transform is the one of S(Q, E) with E = 0 at the origin.
+        It is not normalized: the value at t = 0 is the sum of the row.
+
+        Parameters
+        ----------
+        matrix: npt.NDArray
+            the (Q, E) intensities on the energy grid
+
+        Returns
+        -------
+        spectra: npt.NDArray
+            the complex (Q, t) values of the transform
+        """
+        spectra: npt.NDArray
+        spectra = np.fft.rfft(matrix * self._window, axis=1)
+        # exp(-i E0 t / hbar), por empezar el mallado en E0 y no en 0
+        spectra *= np.exp(-1j * self.energy[0] * self.time / HBAR)
+        return spectra
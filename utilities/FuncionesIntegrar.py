@@ -13,13 +13,18 @@ Description:
 
 License: GLP  
 Contact: broblesher@gmail.com  
-Dependencies: pandas, pyqtgraph, numpy
+Dependencies: pandas, pyqtgraph, numpy, SortedAxis
 """
 
 import pandas as pd
 import pyqtgraph as pg
 import numpy as np
 import numpy.typing as npt
+from utilities.SortedAxis import SortedAxis
+
+# Los espectros con más de LOD_MIN_POINTS puntos se dibujan simplificados
+# según la vista (ver decimate). Los más pequeños se dibujan enteros
+LOD_MIN_POINTS: int = 5000
 
 
 class FuncionesMenuIntegrar:
@@ -32,13 +37,34 @@ class FuncionesMenuIntegrar:
     fillqlist(dfS)
         Takes the Q-values from the column titles from the dfS pandas
         DataFrame and saves them in a list
-    curPlot(pitem, dfS, cur_index)
+    curPlot(pitem, measData, legend)
         Adds to pitem pg.PlotItem the plot of the data in dfS for
         cur_index
+    decimate(x_arr, y_arr, xmin, xmax, nbins)
+        chooses the points of a spectrum to be plotted in a view, with
+        the minimum and maximum of each bin when they are too many
+    detail_index(pitem, x_arr, y_arr)
+        returns the index of the points of a spectrum to be plotted
+    plotDetail(pitem, items, measData)
+        updates the points plotted by curPlot for the current view
     plot_init(plw)
         Creates a pg.PlotIntem y lo añade al plw pg.GraphicsLayoutWidget
     find_nearest(x_arr, x_value)
         finds the nearest value to x_value in the x_arr array
+    cum_trapezoid(measData)
+        computes the cumulative area under the curve, point by point
+    cum_variance(measData)
+        computes the cumulative variance of the area under the curve due
+        to the inner points
+    index_data(cur_qvalue, dataDic)
+        prepares the data of cur_qvalue to calculate the areas of the
+        ROIs: the cumulative area and the SortedAxis of the energies
+    roi_areas(cur_qvalue, dataDic, limits)
+        calculates the areas under the curve of cur_qvalue, and their
+        errors, in several ROIs at once
+    batch_areas(dataDic, limits)
+        calculates the areas in the ROIs for all the Q-values and saves
+        them in dataDic, without the GUI
     set_lrois(cur_qvalue, dataDic, x, lroi_n)
         sets the pg.LinearRegionItem for the lroi_n index for the cur_qvalue,
         adds the item to the pg.PlotItem and saves it to the dataDic
@@ -84,46 +110,193 @@ class FuncionesMenuIntegrar:
             qlist.append(qstr)
         return qlist
 
-    def curPlot(self, pitem: pg.PlotItem, dfS: pd.DataFrame, cur_index: int):
+    def curPlot(self, pitem: pg.PlotItem, measData: tuple,
+                legend: str) -> tuple:
         """Plot the data for the desired Q-value.
 
         Parameters
         ----------
         pitem: pg.PlotItem
             The item that contains the scatter plot to be displayed.
-        dfS: pd.DataFrame
-            Where the imported data is stored.
-        cur_index: int
-            The index of the Q-value to be ploted.
+        measData: tuple
+            The energy, intensity and error arrays of the Q-value to be
+            ploted (see QENSData.group).
+        legend: str
+            The text to be shown as legend in the plot.
+
+        Return
+        ------
+        A tuple with the items added to pitem:
+        err_bar: pg.ErrorBarItem
+        curve: pg.PlotDataItem
 
         Other Parameters
         ----------------
-        legend: str
-            The text to be shown as legend in the plot.
-        x: pd.Series
+        x: npt.NDArray
             The x-values of the data to be plot.
-        y: pd.Series
+        y: npt.NDArray
             The y-values of the data to be plot.
-        height_err: pd.Series
+        height_err: npt.NDArray
             The y error of the data to ble plot.
         err_bar: pg.ErrorBarItem
             The item that contains the y error to add the error bars to the
             plot.
         """
-        legend: str
-        legend = dfS.columns[3 * cur_index + 1]
-        x: pd.Series
-        y: pd.Series
-        height_err: pd.Series
-        x = dfS.iloc[:, 3 * cur_index]
-        y = dfS.iloc[:, 3 * cur_index + 1]
-        height_err = dfS.iloc[:, 3 * cur_index + 2]
+        x: npt.NDArray
+        y: npt.NDArray
+        height_err: npt.NDArray
+        x, y, height_err = measData
+        # Si el espectro es grande, solo dibujo los puntos que se ven
+        idx: slice | npt.NDArray
+        idx = self.detail_index(pitem, x, y)
         pitem.addLegend()
         err_bar: pg.ErrorBarItem
-        err_bar = pg.ErrorBarItem(x=x, y=y, height=height_err, beam=0.05)
+        err_bar = pg.ErrorBarItem(x=x[idx], y=y[idx], height=height_err[idx],
+                                  beam=0.05)
         pitem.addItem(err_bar)
-        pitem.plot(x, y, name=legend, pen=None, symbol='o', symbolPen=None,
-                   symbolSize=10)  # setting pen=None disables line drawing
+        curve: pg.PlotDataItem
+        curve = pitem.plot(x[idx], y[idx], name=legend, pen=None,
+                           symbol='o', symbolPen=None,
+                           symbolSize=10)  # pen=None disables line drawing
+        return err_bar, curve
+
+    def decimate(self, x_arr: npt.NDArray, y_arr: npt.NDArray, xmin: float,
+                 xmax: float, nbins: int) -> npt.NDArray:
+        """Choose the points of a spectrum to be plotted in a view.
+
+        The points between xmin and xmax (and the one just outside at
+        each side) are chosen. If they are more than two per bin, the
+        view is divided in nbins bins of consecutive points, and only
+        the points with the minimum and the maximum intensity of each
+        bin are chosen: the envelope of the spectrum looks the same,
+        with the error bars of the chosen points. The first and last
+        points, and the minimum and maximum of the whole spectrum, are
+        always chosen, so that the autorange of the plot does not
+        change. If the energies are not in ascending order, all the
+        points are chosen.
+
+        Parameters
+        ----------
+        x_arr: npt.NDArray
+            the energies of the spectrum
+        y_arr: npt.NDArray
+            the intensities of the spectrum
+        xmin: float
+            the lower limit of the view
+        xmax: float
+            the upper limit of the view
+        nbins: int
+            the number of bins (e.g. the width of the view in pixels)
+
+        Returns
+        -------
+        idx: npt.NDArray
+            the indices of the chosen points, in ascending order
+
+        Other parameters
+        ----------------
+        first: int
+            the index of the first point of the view
+        stop: int
+            the index after the last point of the view
+        size: int
+            the number of points of each bin
+        rows: npt.NDArray
+            the intensities of the view, one row per bin
+        """
+        npoints: int
+        npoints = x_arr.size
+        if npoints == 0 or not (np.diff(x_arr) >= 0).all():
+            return np.arange(npoints)
+        first: int
+        stop: int
+        first = max(int(np.searchsorted(x_arr, xmin, side='left')) - 1, 0)
+        stop = min(int(np.searchsorted(x_arr, xmax, side='right')) + 1,
+                   npoints)
+        hasnan: bool
+        hasnan = bool(np.isnan(y_arr).any())
+        idx: npt.NDArray
+        if stop - first <= 2 * max(nbins, 1):
+            idx = np.arange(first, stop)
+        else:
+            size: int
+            size = -(-(stop - first) // nbins)
+            nrows: int
+            nrows = -(-(stop - first) // size)
+            # Relleno el último bin repitiendo el último punto de la vista
+            padded: npt.NDArray
+            padded = np.full(nrows * size, y_arr[stop - 1], dtype=np.float64)
+            padded[:stop - first] = y_arr[first:stop]
+            rows: npt.NDArray
+            rows = padded.reshape(nrows, size)
+            starts: npt.NDArray
+            starts = first + size * np.arange(nrows)
+            # Los NaN no cuentan ni como mínimo ni como máximo
+            if hasnan:
+                nan: npt.NDArray
+                nan = np.isnan(rows)
+                idx = np.concatenate(
+                    (starts + np.where(nan, np.inf, rows).argmin(axis=1),
+                     starts + np.where(nan, -np.inf, rows).argmax(axis=1)))
+            else:
+                idx = np.concatenate((starts + rows.argmin(axis=1),
+                                      starts + rows.argmax(axis=1)))
+            idx = np.minimum(idx, stop - 1)
+        ends: list[int]
+        ends = [0, npoints - 1]
+        if not hasnan:
+            ends += [int(y_arr.argmin()), int(y_arr.argmax())]
+        elif not np.isnan(y_arr).all():
+            ends += [int(np.nanargmin(y_arr)), int(np.nanargmax(y_arr))]
+        return np.unique(np.concatenate((idx, ends)))
+
+    def detail_index(self, pitem: pg.PlotItem, x_arr: npt.NDArray,
+                     y_arr: npt.NDArray) -> slice | npt.NDArray:
+        """Return the index of the points to be plotted in pitem.
+
+        All the points (slice(None)) if the spectrum has up to
+        LOD_MIN_POINTS points, or those chosen by decimate for the
+        current view of pitem, with a bin per pixel.
+        """
+        if x_arr.size <= LOD_MIN_POINTS:
+            return slice(None)
+        xmin: float
+        xmax: float
+        xmin, xmax = pitem.vb.viewRange()[0]
+        # Antes de mostrar la ventana la vista aún no tiene tamaño
+        nbins: int
+        nbins = int(pitem.vb.width()) or 1000
+        return self.decimate(x_arr, y_arr, xmin, xmax, nbins)
+
+    def plotDetail(self, pitem: pg.PlotItem, items: tuple, measData: tuple):
+        """Update the points plotted by curPlot for the current view.
+
+        It is called when the view of pitem changes. The spectra with up
+        to LOD_MIN_POINTS points are always plotted whole, so their
+        items are not changed.
+
+        Parameters
+        ----------
+        pitem: pg.PlotItem
+            The item that contains the plot.
+        items: tuple
+            The items returned by curPlot for measData.
+        measData: tuple
+            The energy, intensity and error arrays of the Q-value.
+        """
+        x: npt.NDArray
+        y: npt.NDArray
+        height_err: npt.NDArray
+        x, y, height_err = measData
+        if not items or x.size <= LOD_MIN_POINTS:
+            return
+        idx: npt.NDArray
+        idx = self.detail_index(pitem, x, y)
+        err_bar: pg.ErrorBarItem
+        curve: pg.PlotDataItem
+        err_bar, curve = items
+        err_bar.setData(x=x[idx], y=y[idx], height=height_err[idx])
+        curve.setData(x[idx], y[idx])
 
     def plot_init(self, plw: pg.GraphicsLayoutWidget) -> pg.PlotItem:
         """Create the pg.PlotItem to display the data.
@@ -166,6 +339,126 @@ class FuncionesMenuIntegrar:
         idx = int((np.abs(x_arr - x_value)).argmin())
         return idx
 
+    def cum_trapezoid(self, measData: tuple) -> tuple:
+        """Compute the cumulative area under the curve, point by point.
+
+        The area between the points i and j is cumArea[j] - cumArea[i],
+        the same as np.trapezoid(y[i:j + 1], x[i:j + 1]), so the areas of
+        the ROIs are calculated without integrating again. The intervals
+        with NaN (e.g. a NaN intensity) add 0 to cumArea, so that they
+        do not change the areas of the other ROIs, and are counted in
+        cumNan: the area between i and j is NaN if
+        cumNan[j] - cumNan[i] > 0, as with np.trapezoid.
+
+        Parameters
+        ----------
+        measData: tuple
+            The energy, intensity and error arrays of a Q-value (see
+            QENSData.group).
+
+        Return
+        ------
+        A tuple with the values:
+        cumArea: npt.NDArray
+            the area from the first point to each point, in float64.
+        cumNan: npt.NDArray
+            the number of intervals with NaN from the first point to
+            each point.
+
+        Other Parameters
+        ----------------
+        terms: npt.NDArray
+            the area of each interval between two points.
+        """
+        x: npt.NDArray
+        y: npt.NDArray
+        x = np.asarray(measData[0], dtype=np.float64)
+        y = np.asarray(measData[1], dtype=np.float64)
+        cumArea: npt.NDArray
+        cumNan: npt.NDArray
+        cumArea = np.zeros(x.size)
+        cumNan = np.zeros(x.size, dtype=np.int64)
+        if x.size > 1:
+            terms: npt.NDArray
+            terms = (x[1:] - x[:-1]) * (y[1:] + y[:-1]) / 2
+            np.cumsum(np.isnan(terms), out=cumNan[1:])
+            np.cumsum(np.nan_to_num(terms, nan=0.0), out=cumArea[1:])
+        return cumArea, cumNan
+
+    def cum_variance(self, measData: tuple) -> tuple:
+        """Compute the cumulative variance of the area due to inner points.
+
+        The trapezoid area is a weighted sum of the intensities, so its
+        variance is the sum of weight**2 * err**2. The weight of an inner
+        point k is (x[k + 1] - x[k - 1]) / 2, whatever the ROI, so the
+        variance due to the inner points of the ROI between the points
+        i and j is cumVar[j - 1] - cumVar[i]. Only the two points at the
+        edges have to be added (see roi_areas). As in cum_trapezoid, the
+        points with NaN add 0 to cumVar and are counted in cumNan.
+
+        Parameters
+        ----------
+        measData: tuple
+            The energy, intensity and error arrays of a Q-value (see
+            QENSData.group).
+
+        Return
+        ------
+        A tuple with the values:
+        cumVar: npt.NDArray
+            the variance due to the points from 1 to each point, in
+            float64.
+        cumNan: npt.NDArray
+            the number of points with NaN from 1 to each point.
+
+        Other Parameters
+        ----------------
+        terms: npt.NDArray
+            the variance due to each inner point.
+        """
+        x: npt.NDArray
+        err: npt.NDArray
+        x = np.asarray(measData[0], dtype=np.float64)
+        err = np.asarray(measData[2], dtype=np.float64)
+        cumVar: npt.NDArray
+        cumNan: npt.NDArray
+        cumVar = np.zeros(x.size)
+        cumNan = np.zeros(x.size, dtype=np.int64)
+        if x.size > 2:
+            terms: npt.NDArray
+            terms = ((x[2:] - x[:-2]) / 2 * err[1:-1]) ** 2
+            np.cumsum(np.isnan(terms), out=cumNan[1:-1])
+            np.cumsum(np.nan_to_num(terms, nan=0.0), out=cumVar[1:-1])
+            cumVar[-1] = cumVar[-2]
+            cumNan[-1] = cumNan[-2]
+        return cumVar, cumNan
+
+    def index_data(self, cur_qvalue: str, dataDic: dict):
+        """Prepare the data of a Q-value to calculate the ROI areas.
+
+        Saves in dataDic the cumulative area under the curve
+        ("cumArea" and "cumNanArea", see cum_trapezoid), its cumulative
+        variance ("cumVar" and "cumNanVar", see cum_variance) and the
+        energies as a SortedAxis
+        ("axis"), to find the limits of the ROIs by binary search. It
+        is done once, when the data of the Q-value is loaded.
+
+        Parameters
+        ----------
+        cur_qvalue: str
+            The Q-value, the key of the dataDic dictionary.
+        dataDic: dict
+            Where the data of the Q-values is saved.
+        """
+        (dataDic[cur_qvalue]["cumArea"],
+         dataDic[cur_qvalue]["cumNanArea"]) = self.cum_trapezoid(
+            dataDic[cur_qvalue]["measData"])
+        (dataDic[cur_qvalue]["cumVar"],
+         dataDic[cur_qvalue]["cumNanVar"]) = self.cum_variance(
+            dataDic[cur_qvalue]["measData"])
+        dataDic[cur_qvalue]["axis"] = SortedAxis(
+            dataDic[cur_qvalue]["measData"][0])
+
     def set_lrois(self, cur_qvalue: str, dataDic: dict,
                   lroi_n: int):
         """Set the linear region of interest item and save it to a dict.
@@ -176,8 +469,8 @@ class FuncionesMenuIntegrar:
             The Q-value for which the ROI is going to be set.
         dataDic: dict
             Where the ROI items are going to be saved.
-        x: pd.Series
-            The series with the x-values.
+        x: npt.NDArray
+            The array with the x-values.
         lroi_n: int
             The index of the ROI to be set.
 
@@ -221,17 +514,17 @@ class FuncionesMenuIntegrar:
                 shoverBrush = (255, 0, 255, 127)
                 lcolor = (255, 0, 255, 255)
         # Pongo las lineas verticales del ROI en el plot
-        x = dataDic[cur_qvalue]["measData"].iloc[:, 0]
+        x = dataDic[cur_qvalue]["measData"][0]
         # Si no tengo limites guardados para ese ROI
         if (len(dataDic[cur_qvalue]["lroisLimits"]) == lroi_n):
-            values = [x.iloc[0], x.iloc[-1]]
+            values = [x[0], x[-1]]
             dataDic[cur_qvalue]["lroisLimits"].append(
                 values)
         else:
             values = dataDic[cur_qvalue]["lroisLimits"][lroi_n]
         dataDic[cur_qvalue]["lrois"].append(pg.LinearRegionItem(
             values, brush=sbrush, hoverBrush=shoverBrush,
-            bounds=[x.iloc[0], x.iloc[-1]]))  # =[x.iloc[0], x.iloc[-1]]
+            bounds=[x[0], x[-1]]))  # =[x.iloc[0], x.iloc[-1]]
         dataDic[cur_qvalue]["lrois"][lroi_n].setZValue(10)
         # Add the LinearRegionItem to the ViewBox, but tell the ViewBox to
         # exclude this item when doing auto-range calculations.
@@ -255,6 +548,99 @@ class FuncionesMenuIntegrar:
             color=lcolor,
             movable=True)
 
+    def roi_areas(self, cur_qvalue: str, dataDic: dict,
+                  limits: npt.ArrayLike) -> tuple:
+        """Calculate the areas under the curve in several ROIs at once.
+
+        The limits of all the ROIs are found in one call to
+        SortedAxis.nearest, and the areas are differences of the
+        cumulative area (see index_data). The area of a ROI is the same
+        as np.trapezoid(y[xmin_index:xmax_index], x[xmin_index:xmax_index]),
+        NaN only if there is a NaN inside the ROI.
+        The errors of the areas are propagated from the errors of the
+        intensity in the same way, with the cumulative variance, NaN
+        only if there is a NaN error inside the ROI.
+
+        Parameters
+        ----------
+        cur_qvalue: str
+            The Q-value, the key of the dataDic dictionary.
+        dataDic: dict
+            Where the data of the Q-values is saved.
+        limits: npt.ArrayLike
+            The [xmin, xmax] limits of each ROI.
+
+        Return
+        ------
+        A tuple with the values:
+        areas: npt.NDArray
+            the area under the curve inside each ROI.
+        errors: npt.NDArray
+            the error of each area.
+
+        Other Parameters
+        ----------------
+        first: npt.NDArray
+            The index of the first point of each ROI in the x array.
+        last: npt.NDArray
+            The index of the last point of each ROI in the x array (the
+            same as first if the ROI has less than 2 points).
+        after: npt.NDArray
+            The index of the point after the first one of each ROI.
+        before: npt.NDArray
+            The index of the point before the last one of each ROI.
+        edges: npt.NDArray
+            The variance of the areas due to the first and last points.
+        """
+        # Si no se ha hecho al cargar los datos (sin la GUI)
+        if "axis" not in dataDic[cur_qvalue]:
+            self.index_data(cur_qvalue, dataDic)
+        indices: npt.NDArray
+        indices = dataDic[cur_qvalue]["axis"].nearest(
+            np.asarray(limits, dtype=np.float64).reshape(-1, 2))
+        first: npt.NDArray
+        last: npt.NDArray
+        # El ROI es x[xmin_index:xmax_index], así que el último punto es
+        # el anterior a xmax_index
+        first = indices[:, 0]
+        last = np.maximum(indices[:, 1] - 1, first)
+        cumArea: npt.NDArray
+        cumVar: npt.NDArray
+        cumArea = dataDic[cur_qvalue]["cumArea"]
+        cumVar = dataDic[cur_qvalue]["cumVar"]
+        x: npt.NDArray
+        err: npt.NDArray
+        x = dataDic[cur_qvalue]["measData"][0]
+        err = dataDic[cur_qvalue]["measData"][2]
+        # El punto siguiente al primero y el anterior al último (que son
+        # el primero y el último si el ROI tiene menos de 2 puntos)
+        after: npt.NDArray
+        before: npt.NDArray
+        after = np.minimum(first + 1, last)
+        before = np.maximum(last - 1, first)
+        # Los puntos de los bordes pesan la mitad de su intervalo
+        edges: npt.NDArray
+        edges = (((x[after] - x[first].astype(np.float64)) / 2
+                  * err[first]) ** 2
+                 + ((x[last] - x[before].astype(np.float64)) / 2
+                    * err[last]) ** 2)
+        # Las áreas y las varianzas de los puntos de dentro son restas de
+        # los valores acumulados (0 si el ROI tiene menos de 2 puntos)
+        areas: npt.NDArray
+        areas = cumArea[last] - cumArea[first]
+        # Solo es NaN si tiene algún NaN dentro del ROI
+        cumNan: npt.NDArray
+        cumNan = dataDic[cur_qvalue]["cumNanArea"]
+        areas[cumNan[last] - cumNan[first] > 0] = np.nan
+        # Los errores de los bordes ya son NaN si lo son; los de dentro
+        # se cuentan aparte, como las áreas
+        errors: npt.NDArray
+        errors = np.sqrt(np.maximum(cumVar[before] - cumVar[first] + edges,
+                                    0))
+        cumNan = dataDic[cur_qvalue]["cumNanVar"]
+        errors[cumNan[before] - cumNan[first] > 0] = np.nan
+        return areas, errors
+
     def calcArea(self, cur_qvalue: str, dataDic: dict):
         """Calculate the areas under the curve in the ROIs.
 
@@ -266,50 +652,65 @@ class FuncionesMenuIntegrar:
 
         Other Parameters
         ----------------
-        x: npt.NDArray
-            The complete x array.
-        y: npt.NDArray
-            The complete y array.
-        lroi_n: int
-            The index of ROI to be considered.
-        cur_xmin: float
-            The xmin limit of the ROI.
-        xmin_index: int
-            The index of xmin limit of the ROI y the x array.
-        cur_xmax: float
-            The xmax limit of the ROI.
-        xmax_index: int
-            The index of xmax limit of the ROI y the x array.
-        x_lroi: npt.NDArray
-            The x array chopped to the ROI limits.
-        y_lroi: npt.NDArray
-            The y array chopped to the ROI limits.
-        area: np.float
-            The computed area under the curve inside the ROI.
+        nRois: int
+            The number of ROIs of the Q-value.
+        areas: npt.NDArray
+            The areas under the curve inside the ROIs.
+        errors: npt.NDArray
+            The errors of the areas.
         """
-        # Especifico los valores de x e y
-        x: npt.NDArray
-        y: npt.NDArray
-        cur_xmin: float
-        cur_xmax: float
-        xmin_index: int
-        xmax_index: int
-        x_lroi: npt.NDArray
-        y_lroi: npt.NDArray
-        x = np.array(dataDic[cur_qvalue]["measData"].iloc[:, 0])
-        y = np.array(dataDic[cur_qvalue]["measData"].iloc[:, 1])
-        for lroi_n in range(len(dataDic[cur_qvalue]["lrois"])):
-            # Corto x e y para considerar solo los valores dentro del ROI
-            cur_xmin = dataDic[cur_qvalue]["lroisLimits"][lroi_n][0]
-            xmin_index = self.find_nearest(x, cur_xmin)
-            cur_xmax = dataDic[cur_qvalue]["lroisLimits"][lroi_n][1]
-            xmax_index = self.find_nearest(x, cur_xmax)
-            x_lroi = x[xmin_index:xmax_index]
-            y_lroi = y[xmin_index:xmax_index]
-            # Uso esta función de numpy para calcular el área
-            area = np.trapezoid(y_lroi, x_lroi)
-            # y la guardo en el diccionario
-            dataDic[cur_qvalue]["lareas"].append(area)
+        nRois: int
+        nRois = len(dataDic[cur_qvalue]["lrois"])
+        if nRois == 0:
+            return
+        # Calculo las áreas y sus errores y los guardo en el diccionario
+        areas: npt.NDArray
+        errors: npt.NDArray
+        areas, errors = self.roi_areas(
+            cur_qvalue, dataDic, dataDic[cur_qvalue]["lroisLimits"][:nRois])
+        dataDic[cur_qvalue]["lareas"].extend(areas)
+        dataDic[cur_qvalue].setdefault("lerrors", []).extend(errors)
+
+    def batch_areas(self, dataDic: dict, limits: list | dict):
+        """Calculate the areas in the ROIs for all the Q-values.
+
+        Saves the limits, the areas and the errors of the areas of the
+        ROIs of each Q-value in the "lroisLimits", "lareas" and
+        "lerrors" items of dataDic, as calcArea does for the Q-value
+        shown. It does not need the GUI: dataDic
+        only needs the "measData" of each Q-value.
+
+        Parameters
+        ----------
+        dataDic: dict
+            Where the data of the Q-values is saved.
+        limits: list | dict
+            The [xmin, xmax] limits of each ROI, the same for all the
+            Q-values, or a dict with the limits for each Q-value.
+
+        Other Parameters
+        ----------------
+        qvalue: str
+            The Q-value, the key of the dataDic dictionary.
+        qlimits: npt.NDArray
+            The (ROIs, 2) limits of the ROIs for the Q-value.
+        areas: npt.NDArray
+            The areas under the curve inside the ROIs.
+        errors: npt.NDArray
+            The errors of the areas.
+        """
+        qvalue: str
+        for qvalue in dataDic:
+            qlimits: npt.NDArray
+            qlimits = np.asarray(
+                limits[qvalue] if isinstance(limits, dict) else limits,
+                dtype=np.float64).reshape(-1, 2)
+            dataDic[qvalue]["lroisLimits"] = qlimits.tolist()
+            areas: npt.NDArray
+            errors: npt.NDArray
+            areas, errors = self.roi_areas(qvalue, dataDic, qlimits)
+            dataDic[qvalue]["lareas"] = list(areas)
+            dataDic[qvalue]["lerrors"] = list(errors)
 
     def dict_to_csv(self, dic: dict):
         """Export dictionary to csv.
@@ -327,9 +728,11 @@ class FuncionesMenuIntegrar:
         emin: list
         emax: list
         area: list
+        error: list
         emin_h: str
         emax_h: str
         area_h: str
+        error_h: str
         """
         dfDic: pd.DataFrame
         n_ROIs: pd.Series
@@ -339,12 +742,15 @@ class FuncionesMenuIntegrar:
         emin: list
         emax: list
         area: list
+        error: list
         emin = []
         emax = []
         area = []
+        error = []
         emin_h: str
         emax_h: str
         area_h: str
+        error_h: str
         q_values = pd.Series(
             list(dic.keys()),
             name='Q (' + chr(197) + chr(175) + chr(185) + ')')  # Å-1
@@ -356,23 +762,29 @@ class FuncionesMenuIntegrar:
             emin_h = 'E_min_' + str(roi_index + 1) + ' (meV)'
             emax_h = 'E_max_' + str(roi_index + 1) + ' (meV)'
             area_h = 'Area_' + str(roi_index + 1)
+            error_h = 'err_Area_' + str(roi_index + 1)
             for q_value in dic.keys():
                 if len(dic[q_value]["lareas"]) < roi_index + 1:
                     emin.append(None)
                     emax.append(None)
                     area.append(None)
+                    error.append(None)
                 else:
                     emin.append(dic[q_value]["lroisLimits"][roi_index][0])
                     emax.append(dic[q_value]["lroisLimits"][roi_index][1])
                     area.append(dic[q_value]["lareas"][roi_index])
+                    error.append(dic[q_value]["lerrors"][roi_index])
             dsemin = pd.Series(emin, name=emin_h)
             dsemax = pd.Series(emax, name=emax_h)
             dsarea = pd.Series(area, name=area_h)
-            dfDic = pd.concat([dfDic, dsemin, dsemax, dsarea], axis=1)
+            dserror = pd.Series(error, name=error_h)
+            dfDic = pd.concat([dfDic, dsemin, dsemax, dsarea, dserror],
+                              axis=1)
             emin.clear()
             emax.clear()
             area.clear()
-            del emin_h, emax_h, area_h
+            error.clear()
+            del emin_h, emax_h, area_h, error_h
         dfDic.dropna(axis=1, how='all', inplace=True)  # thresh=thresholdVal,
         dfDic.to_csv('dict_areas.csv', sep='\t', float_format='%.4f',
                      index=False, encoding='utf-8')
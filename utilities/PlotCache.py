@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""PlotCache class.
+
+Filename: PlotCache.py  
+Author: Beatriz Robles Hernández  
+Date: 2026-10-18  
+Version: 1.0  
+Description:
+    This module contains a class to keep the plot items (error bars
+    and points) of the last Q-values shown, so that changing the
+    Q-value only hides some items and shows others, instead of
+    clearing the plot and drawing the data again.
+
+License: GLP  
+Contact: broblesher@gmail.com  
+Dependencies: collections, collections.abc, pyqtgraph
+"""
+# Import statements
+from collections import OrderedDict
+from collections.abc import Callable
+import pyqtgraph as pg
+
+
+class PlotCache:
+    """PlotCache class.
+
+    A LRU cache of the plot items of each Q-value, all of them added to
+    the same pg.PlotItem, but only the ones of the current Q-value
+    visible. When the cache is full, the items of the Q-value shown
+    longest ago are removed from the plot.
+
+    Attributes
+    ----------
+    pitem: pg.PlotItem
+        the plot where the items are shown
+    build: Callable
+        the function that adds the items of a Q-value to the plot and
+        returns them, with the (pitem, measData, legend) parameters and
+        the curve with the points last (see FuncionesMenuIntegrar.curPlot)
+    size: int
+        the maximum number of Q-values in the cache
+    current: str | None
+        the Q-value shown
+
+    Methods
+    -------
+    show(qvalue, measData, legend)
+        Shows the items of a Q-value, hiding the others
+    get(qvalue)
+        Returns the items of a Q-value
+    prefetch(qvalue, measData, legend)
+        Adds the items of a Q-value to the cache, hidden
+    clear()
+        Removes all the items of the cache from the plot
+    """
+
+    def __init__(self, pitem: pg.PlotItem, build: Callable, size: int = 8):
+        """Class constructor.
+
+        Parameters
+        ----------
+        pitem: pg.PlotItem
+            the plot where the items are shown
+        build: Callable
+            the function that adds the items of a Q-value to the plot
+        size: int
+            the maximum number of Q-values in the cache
+        """
+        self.pitem = pitem
+        self.build = build
+        self.size = size
+        self.current: str | None
+        self.current = None
+        self._items: OrderedDict[str, tuple]
+        self._items = OrderedDict()
+
+    def __contains__(self, qvalue: str) -> bool:
+        """Return whether the items of a Q-value are in the cache."""
+        return qvalue in self._items
+
+    def get(self, qvalue: str | None) -> tuple:
+        """Return the items of a Q-value, or () if they are not cached."""
+        if qvalue not in self._items:
+            return ()
+        return self._items[qvalue][1]
+
+    def _add(self, qvalue: str, measData: tuple, legend: str) -> tuple:
+        """Build the items of a Q-value, hidden and out of the legend."""
+        items: tuple
+        items = self.build(self.pitem, measData, legend)
+        self.pitem.legend.removeItem(items[-1])
+        for item in items:
+            item.setVisible(False)
+        self._items[qvalue] = (legend, items)
+        return self._items[qvalue]
+
+    def _evict(self):
+        """Remove from the plot the items of the oldest Q-values."""
+        while len(self._items) > self.size:
+            qvalue: str
+            for qvalue in self._items:
+                if qvalue != self.current:
+                    break
+            for item in self._items.pop(qvalue)[1]:
+                self.pitem.removeItem(item)
+
+    def show(self, qvalue: str, measData: tuple, legend: str):
+        """Show the items of a Q-value, hiding the others.
+
+        The items that are not in the cache (e.g. the ROIs of the
+        previous Q-value) are removed from the plot, as
+        pg.PlotItem.clear does.
+
+        Parameters
+        ----------
+        qvalue: str
+            the Q-value (str), the key of the cache
+        measData: tuple
+            the energy, intensity and error arrays of the Q-value, to
+            build its items if they are not in the cache
+        legend: str
+            the text to be shown as legend in the plot
+
+        Other parameters
+        ----------------
+        cached: set[int]
+            the ids of the items in the cache
+        """
+        if qvalue not in self._items:
+            self._add(qvalue, measData, legend)
+        cached: set[int]
+        cached = {id(item) for _, items in self._items.values()
+                  for item in items}
+        for item in self.pitem.items[:]:
+            if id(item) not in cached:
+                self.pitem.removeItem(item)
+        if self.current in self._items and self.current != qvalue:
+            for item in self._items[self.current][1]:
+                item.setVisible(False)
+        items: tuple
+        legend, items = self._items[qvalue]
+        for item in items:
+            item.setVisible(True)
+        self.pitem.legend.clear()
+        self.pitem.legend.addItem(items[-1], legend)
+        self._items.move_to_end(qvalue)
+        self.current = qvalue
+        self._evict()
+
+    def prefetch(self, qvalue: str, measData: tuple, legend: str):
+        """Add the items of a Q-value to the cache, hidden.
+
+        Does nothing if the Q-value is already in the cache.
+
+        Parameters
+        ----------
+        qvalue: str
+            the Q-value (str), the key of the cache
+        measData: tuple
+            the energy, intensity and error arrays of the Q-value
+        legend: str
+            the text to be shown as legend in the plot
+        """
+        if qvalue in self._items:
+            return
+        self._add(qvalue, measData, legend)
+        self._evict()
+
+    def clear(self):
+        """Remove all the items of the cache from the plot."""
+        for _, items in self._items.values():
+            for item in items:
+                self.pitem.removeItem(item)
+        self._items.clear()
+        self.current = None
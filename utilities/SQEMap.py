@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""SQEMap class.
+
+Filename: SQEMap.py  
+Author: Beatriz Robles Hernández  
+Date: 2026-10-18  
+Version: 1.0  
+Description:
+    This module contains a class to resample the S(Q, E) data of all
+    the Q-values onto a regular (Q, E) grid, once, and show it as a
+    colour map with a single pg.ImageItem.
+
+License: GLP  
+Contact: broblesher@gmail.com  
+Dependencies: numpy, numpy.typing, pyqtgraph, PyQt5, SortedAxis
+"""
+# Import statements
+import numpy as np
+import numpy.typing as npt
+import pyqtgraph as pg
+from PyQt5.QtCore import QRectF
+from utilities.SortedAxis import SortedAxis
+
+# Número máximo de puntos del mallado en cada eje
+MAP_MAX_POINTS: int = 2000
+
+
+class SQEMap:
+    """SQEMap class.
+
+    The S(Q, E) data resampled onto a regular grid. The energy grid
+    goes from the lowest to the highest energy of all the Q-values,
+    with the smallest typical step of them, and the intensity of each
+    Q-value is linearly interpolated onto it (NaN outside its energy
+    range). The Q grid goes from the lowest to the highest Q-value,
+    with the smallest step between them, and each row takes the
+    intensity of the nearest Q-value. The grid is made when the object
+    is created, so it can be plotted again without resampling.
+
+    Attributes
+    ----------
+    energy: npt.NDArray
+        the energies of the grid
+    qvalue: npt.NDArray
+        the Q-values of the grid
+    intensity: npt.NDArray
+        the (Q, E) intensities on the grid (float32, only to be shown)
+
+    Methods
+    -------
+    plot(pitem, log)
+        Adds the colour map to a pg.PlotItem
+    """
+
+    def __init__(self, qvalue: npt.ArrayLike, groups: list[tuple],
+                 npoints: int = MAP_MAX_POINTS):
+        """Class constructor.
+
+        Parameters
+        ----------
+        qvalue: npt.ArrayLike
+            the Q-value of each group
+        groups: list[tuple]
+            the energy, intensity and error arrays of each Q-value (see
+            QENSData.group)
+        npoints: int
+            the maximum number of points of the grid in each axis
+
+        Raises
+        ------
+        ValueError
+            if there is no data
+
+        Other parameters
+        ----------------
+        steps: list[float]
+            the typical energy step of each Q-value
+        rows: npt.NDArray
+            the intensity of each Q-value on the energy grid
+        """
+        qs: npt.NDArray
+        qs = np.asarray(qvalue, dtype=np.float64)
+        clean: list[tuple]
+        clean = []
+        steps: list[float]
+        steps = [np.inf]
+        for x, y, _ in groups:
+            x = np.asarray(x, dtype=np.float64)
+            y = np.asarray(y, dtype=np.float64)
+            valid = ~(np.isnan(x) | np.isnan(y))
+            # np.interp necesita las energías en orden ascendente
+            order = np.argsort(x[valid], kind='stable')
+            clean.append((x[valid][order], y[valid][order]))
+            if np.unique(x[valid]).size > 1:
+                steps.append(float(np.median(np.diff(np.unique(x[valid])))))
+        if not any(x.size for x, _ in clean):
+            raise ValueError('There is no data to make the map')
+        self.energy = self._grid(np.concatenate([x for x, _ in clean]),
+                                 min(steps), npoints)
+        self.qvalue = self._grid(
+            qs, np.diff(np.unique(qs)).min(initial=np.inf), npoints)
+        rows: npt.NDArray
+        rows = np.array([np.interp(self.energy, x, y, left=np.nan,
+                                   right=np.nan)
+                         if x.size else np.full(self.energy.size, np.nan)
+                         for x, y in clean], dtype=np.float32)
+        # Cada fila del mallado es la Q medida más cercana
+        self.intensity = rows[SortedAxis(qs).nearest(self.qvalue)]
+
+    @staticmethod
+    def _grid(values: npt.NDArray, step: float, npoints: int) -> npt.NDArray:
+        """Return a regular grid from the lowest to the highest value."""
+        low: float
+        high: float
+        low, high = float(np.nanmin(values)), float(np.nanmax(values))
+        size: int
+        size = 1
+        if high > low and 0 < step < np.inf:
+            size = min(int(round((high - low) / step)) + 1, npoints)
+        return np.linspace(low, high, size)
+
+    def plot(self, pitem: pg.PlotItem, log: bool = True) -> pg.ImageItem:
+        """Add the colour map to a pg.PlotItem.
+
+        The whole map is a single pg.ImageItem, with a colour bar to
+        change the levels.
+
+        Parameters
+        ----------
+        pitem: pg.PlotItem
+            the plot where the map is shown, with the energy in the x
+            axis and Q in the y axis
+        log: bool
+            whether to show log10 of the intensity (default), as the
+            elastic peak is much higher than the rest
+
+        Returns
+        -------
+        image: pg.ImageItem
+            the item with the map
+
+        Other parameters
+        ----------------
+        values: npt.NDArray
+            the values shown (NaN where there is no data)
+        levels: tuple[float, float]
+            the values for the lowest and highest colours
+        """
+        values: npt.NDArray
+        values = self.intensity
+        if log:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                values = np.log10(np.where(values > 0, values, np.nan))
+        levels: tuple[float, float]
+        levels = (0.0, 1.0)
+        if not np.isnan(values).all():
+            levels = tuple(np.nanpercentile(values, [1, 99.9]))
+        image: pg.ImageItem
+        # ImageItem toma el primer eje como x: la energía
+        image = pg.ImageItem(values.T)
+        x0: float
+        width: float
+        y0: float
+        height: float
+        x0, width = self._edges(self.energy)
+        y0, height = self._edges(self.qvalue)
+        image.setRect(QRectF(x0, y0, width, height))
+        pitem.addItem(image)
+        bar: pg.ColorBarItem
+        bar = pg.ColorBarItem(values=levels, colorMap='viridis',
+                              label='log10 S(Q, E)' if log else 'S(Q, E)')
+        bar.setImageItem(image, insert_in=pitem)
+        return image
+
+    @staticmethod
+    def _edges(axis: npt.NDArray) -> tuple[float, float]:
+        """Return the start and width of the pixels of a regular axis."""
+        step: float
+        step = float(axis[1] - axis[0]) if axis.size > 1 else 1.0
+        return float(axis[0]) - step / 2, step * axis.size
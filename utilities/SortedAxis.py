@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""SortedAxis class.
+
+Filename: SortedAxis.py  
+Author: Beatriz Robles Hernández  
+Date: 2026-10-18  
+Version: 1.0  
+Description:
+    This module contains a class to find the nearest points of an
+    energy axis to given values by binary search, instead of going
+    through the whole axis for each value.
+
+License: GLP  
+Contact: broblesher@gmail.com  
+Dependencies: numpy, numpy.typing
+"""
+# Import statements
+import numpy as np
+import numpy.typing as npt
+
+
+class SortedAxis:
+    """SortedAxis class.
+
+    An axis (e.g. the energies of a Q-value) prepared to find the
+    nearest points to given values. The axis is checked once, when the
+    object is created: the NaN at the end (the padding of the columns
+    of the S(Q, E) DataFrame) are left out, and if the rest is in
+    ascending or descending order, the points are found with
+    np.searchsorted. Otherwise, each value is compared with the whole
+    axis, as FuncionesMenuIntegrar.find_nearest does.
+
+    Attributes
+    ----------
+    x: npt.NDArray
+        the axis, without the NaN at the end
+    order: int
+        1 if the axis is in ascending order, -1 if it is in descending
+        order, and 0 if it is not sorted (or has NaN inside)
+
+    Methods
+    -------
+    nearest(x_values)
+        Returns the index of the nearest point to each value
+    """
+
+    def __init__(self, x_arr: npt.ArrayLike):
+        """Class constructor.
+
+        Parameters
+        ----------
+        x_arr: npt.ArrayLike
+            the axis, that can end with NaN
+
+        Other parameters
+        ----------------
+        notnan: npt.NDArray
+            the indices of the points that are not NaN
+        steps: npt.NDArray
+            the differences between consecutive points
+        """
+        x: npt.NDArray
+        x = np.asarray(x_arr)
+        notnan: npt.NDArray
+        notnan = np.flatnonzero(~np.isnan(x))
+        # El relleno con NaN está al final: me quedo hasta el último número
+        self.x = x[:notnan[-1] + 1] if notnan.size else x[:0]
+        steps: npt.NDArray
+        steps = np.diff(self.x)
+        self.order = 0
+        if not np.isnan(self.x).any():
+            if (steps >= 0).all():
+                self.order = 1
+            elif (steps <= 0).all():
+                self.order = -1
+
+    def nearest(self, x_values: npt.ArrayLike) -> int | npt.NDArray:
+        """Return the index of the nearest point of the axis to each value.
+
+        If a value is halfway between two points, or there are repeated
+        points, the first index in the axis is returned, as in
+        FuncionesMenuIntegrar.find_nearest. A NaN value returns 0.
+
+        Parameters
+        ----------
+        x_values: npt.ArrayLike
+            one value or an array of values
+
+        Returns
+        -------
+        idx: int | npt.NDArray
+            the index of the nearest point (int if x_values is a number,
+            or an array of indices with the shape of x_values)
+
+        Raises
+        ------
+        ValueError
+            if the axis has no points
+
+        Other parameters
+        ----------------
+        xs: npt.NDArray
+            the axis in ascending order (a view of x)
+        left: npt.NDArray
+            the index in xs of the point before each value
+        right: npt.NDArray
+            the index in xs of the point after each value
+        """
+        if self.x.size == 0:
+            raise ValueError('The axis has no points')
+        values: npt.NDArray
+        values = np.asarray(x_values, dtype=np.float64)
+        idx: npt.NDArray
+        if self.order == 0:
+            # Sin orden, comparo cada valor con todo el eje
+            idx = np.array([np.nanargmin(np.abs(self.x - value))
+                            if not np.isnan(value) else 0
+                            for value in values.ravel()],
+                           dtype=np.intp).reshape(values.shape)
+        else:
+            xs: npt.NDArray
+            xs = self.x if self.order == 1 else self.x[::-1]
+            right: npt.NDArray
+            right = np.searchsorted(xs, values)
+            left: npt.NDArray
+            left = np.maximum(right - 1, 0)
+            right = np.minimum(right, xs.size - 1)
+            toLeft: npt.NDArray
+            # En un empate gana el primero en el eje original, que es
+            # left si está en orden ascendente y right si no
+            if self.order == 1:
+                toLeft = values - xs[left] <= xs[right] - values
+            else:
+                toLeft = values - xs[left] < xs[right] - values
+            idx = np.where(toLeft, left, right)
+            # Si el punto está repetido, tomo el primero en el eje original
+            if self.order == 1:
+                idx = np.searchsorted(xs, xs[idx], side='left')
+            else:
+                idx = self.x.size - np.searchsorted(xs, xs[idx],
+                                                    side='right')
+            idx = np.where(np.isnan(values), 0, idx)
+        if idx.ndim == 0:
+            return int(idx)
+        return idx